@@ -0,0 +1,119 @@
+"""
+JSON Baselines for the Benchmark Suites
+=======================================
+A baseline is a JSON file:
+
+  {"suite": "micro", "meta": {python, platform, machine, commit, created},
+   "positions": {name: position hash}, "results": {key: {metric: value, ...}}}
+
+compare() checks one metric of every result against a baseline: a value
+more than `tolerance` (relative) worse than the baseline is a regression.
+Counters that must not change at all (e.g. search node counts) are listed
+in `exact` and reported when they differ.
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from positions import ROOT
+
+
+def machine_info() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MiB (Unix)."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # bytes on macOS, KiB on Linux
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MiB (/proc on Linux, else the peak)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def save_baseline(path: str, suite: str, results: dict, positions: dict = None):
+    data = {"suite": suite, "meta": machine_info(), "positions": positions or {}, "results": results}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, results: dict, metric: str, tolerance: float = 0.15,
+            higher_is_better: bool = False, exact=(), positions: dict = None) -> dict:
+    """
+    Compare results[key][metric] with the baseline for every key present in both.
+    Returns {"rows": [(key, base, new, change), ...], "regressions": [keys],
+    "improvements": [keys], "changed": [(key, counter, base, new)], "missing": [keys],
+    "moved_positions": [names]} where change is new / base - 1 (sign flipped
+    when higher_is_better, so a positive change is always worse).
+    """
+    base_results = baseline["results"]
+    report = {"rows": [], "regressions": [], "improvements": [], "changed": [], "missing": [],
+              "moved_positions": []}
+    if positions is not None:
+        report["moved_positions"] = [name for name, key in positions.items()
+                                     if baseline.get("positions", {}).get(name, key) != key]
+    for key in sorted(results):
+        if key not in base_results:
+            continue
+        base, new = base_results[key].get(metric), results[key].get(metric)
+        if base is None or new is None or base == 0:
+            continue
+        if higher_is_better:
+            change = base / new - 1 if new else float("inf")
+        else:
+            change = new / base - 1
+        report["rows"].append((key, base, new, change))
+        if change > tolerance:
+            report["regressions"].append(key)
+        elif change < -tolerance:
+            report["improvements"].append(key)
+        for counter in exact:
+            if base_results[key].get(counter) != results[key].get(counter):
+                report["changed"].append((key, counter, base_results[key].get(counter), results[key].get(counter)))
+    report["missing"] = sorted(k for k in base_results if k not in results)
+    return report
+
+
+def print_report(report: dict, metric: str, tolerance: float):
+    print(f"{'benchmark':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, base, new, change in report["rows"]:
+        flag = "  REGRESSION" if key in report["regressions"] else ("  faster" if key in report["improvements"] else "")
+        print(f"{key:<36} {base:>12.4g} {new:>12.4g} {change:>+8.1%}{flag}")
+    for key, counter, base, new in report["changed"]:
+        print(f"CHANGED {key}: {counter} {base} -> {new}")
+    for name in report["moved_positions"]:
+        print(f"WARNING: position {name!r} differs from the baseline's; its timings are not comparable")
+    if report["missing"]:
+        print(f"not run: {', '.join(report['missing'])}")
+    print(f"{len(report['regressions'])} regression(s) beyond {tolerance:.0%} in {metric}, "
+          f"{len(report['improvements'])} improvement(s), {len(report['changed'])} changed counter(s)")
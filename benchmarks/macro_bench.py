@@ -0,0 +1,241 @@
+"""
+End-to-End Simulation Benchmark for Dots & Cuts
+===============================================
+Plays a fixed, seeded batch of games through the analysis.py runners, so
+the numbers include everything the microbenchmarks miss (history growth,
+list churn, garbage collection, feature logging):
+
+  random               run_random_simulations        (playout kernel)
+  greedy               run_greedy_simulations
+  greedy_vs_random     run_greedy_vs_random_simulations
+  minimax_vs_minimax   run_minimax_vs_minimax_simulations (v1 vs v1)
+
+Every scenario runs in a fresh process (peak RSS is per scenario) and is
+played twice from the same seed:
+
+  1. timed pass: games/s, plies/s, peak RSS, garbage collections
+  2. phase pass: the engine entry points are wrapped with timers and the
+     time is split into movegen (generate_legal_actions), eval
+     (evaluate_position_v1, compute_features), make (make_move, make_shot),
+     unmake (undo_last_move), is_game_over and other. Nested phases count
+     for the innermost one (the move generation inside the evaluation is
+     movegen). The wrappers cost about a microsecond per call, so the split
+     is taken from this pass only and the throughput from the first.
+     Scenarios played by the playout kernel (random) call none of these
+     functions: they get no phase pass and phase_share None ("n/a").
+
+Both passes must play the same plies; plies and search nodes are exact
+counters in the baseline, so a change in the games themselves is reported.
+
+  python benchmarks/macro_bench.py                                  run and print
+  python benchmarks/macro_bench.py --save baselines/macro.json      store a baseline
+  python benchmarks/macro_bench.py --compare baselines/macro.json   flag regressions
+                                                                    (exit code 1)
+"""
+
+import positions  # noqa: F401  (puts the project on sys.path)
+from baseline import save_baseline, load_baseline, compare, print_report, peak_rss_mb
+import gc
+import multiprocessing
+import os
+import random
+import re
+import sys
+import time
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "macro.json")
+
+# name: (number of games, seed); games are multiplied by --scale
+SCENARIOS = {
+    "random": (2000, 201),
+    "greedy": (200, 202),
+    "greedy_vs_random": (200, 203),
+    "minimax_vs_minimax": (6, 204),
+}
+MINIMAX_DEPTH = 2
+PHASES = ("movegen", "eval", "make", "unmake", "is_game_over")
+# Played by playout.PlayoutKernel, which has its own move generation and make
+KERNEL_SCENARIOS = ("random",)
+
+
+def _phase_targets():
+    """[(owner, attribute, phase)]: the functions and methods timed by the phase pass."""
+    import ai_core
+    import analysis
+    import minimax_ai
+    from dotscuts import GameState
+    return [
+        (ai_core, "generate_legal_actions", "movegen"),
+        (minimax_ai, "evaluate_position_v1", "eval"),
+        (analysis, "compute_features", "eval"),
+        (GameState, "make_move", "make"),
+        (GameState, "make_shot", "make"),
+        (GameState, "undo_last_move", "unmake"),
+        (GameState, "is_game_over", "is_game_over"),
+    ]
+
+
+class PhaseTimer:
+    """
+    Context manager wrapping the _phase_targets with timers. Module-level
+    functions are replaced in every loaded module that imported them by
+    name. times: {phase: seconds}, innermost phase wins.
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self._patched = []
+
+    def _wrap(self, fn, phase):
+        times = self.times
+        stack = self._stack   # [start, time spent in nested phases] of the running timed calls
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            frame = [clock(), 0.0]
+            stack.append(frame)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stack.pop()
+                elapsed = clock() - frame[0]
+                times[phase] += elapsed - frame[1]
+                if stack:
+                    stack[-1][1] += elapsed
+        return timed
+
+    def __enter__(self):
+        self._stack = []
+        for owner, name, phase in _phase_targets():
+            original = getattr(owner, name)
+            wrapped = self._wrap(original, phase)
+            if isinstance(owner, type):
+                self._patched.append((owner, name, original))
+                setattr(owner, name, wrapped)
+                continue
+            for module in list(sys.modules.values()):
+                if getattr(module, name, None) is original:
+                    self._patched.append((module, name, original))
+                    setattr(module, name, wrapped)
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+        return False
+
+
+def _play(name: str, games: int, seed: int) -> dict:
+    """Play one scenario from `seed`; returns {"games", "plies", "nodes"?}."""
+    from dotscuts import setup_standard_game
+    from analysis import (run_random_simulations, run_greedy_simulations, run_greedy_vs_random_simulations,
+                          run_minimax_vs_minimax_simulations, block_print, enable_print)
+    random.seed(seed)
+    if name == "random":
+        summary = run_random_simulations(setup_standard_game(), 1, games)
+    elif name == "greedy":
+        summary = run_greedy_simulations(setup_standard_game(), 1, games)
+    elif name == "greedy_vs_random":
+        summary = run_greedy_vs_random_simulations(games)
+    elif name == "minimax_vs_minimax":
+        block_print()  # minimax_best_move prints a debug line per move
+        try:
+            summary = run_minimax_vs_minimax_simulations(games, MINIMAX_DEPTH)
+        finally:
+            enable_print()
+    else:
+        raise ValueError(f"Unknown scenario: {name}")
+    result = {"games": games, "plies": round(summary["average_moves"] * games)}
+    if "search_stats" in summary:
+        result["nodes"] = summary["search_stats"]["nodes"] + summary["search_stats"]["qnodes"]
+    return result
+
+
+def _gc_collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def run_scenario(name: str, scale: float = 1.0) -> dict:
+    """Timed pass and phase pass of one scenario in the current process."""
+    games, seed = SCENARIOS[name]
+    games = max(1, round(games * scale))
+
+    collections = _gc_collections()
+    t0 = time.perf_counter()
+    result = _play(name, games, seed)
+    seconds = time.perf_counter() - t0
+    result.update({
+        "seconds": seconds,
+        "games_per_sec": games / seconds,
+        "plies_per_sec": result["plies"] / seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "gc_collections": _gc_collections() - collections,
+    })
+
+    if name in KERNEL_SCENARIOS:
+        result["phase_share"] = None
+        return result
+    with PhaseTimer() as timer:
+        t0 = time.perf_counter()
+        check = _play(name, games, seed)
+        phase_seconds = time.perf_counter() - t0
+    if check["plies"] != result["plies"]:
+        raise RuntimeError(f"{name}: the phase pass played {check['plies']} plies, the timed pass {result['plies']}")
+    phases = dict(timer.times)
+    phases["other"] = max(0.0, phase_seconds - sum(phases.values()))
+    result["phase_share"] = {phase: t / phase_seconds for phase, t in phases.items()}
+    return result
+
+
+def run_macro(names=tuple(SCENARIOS), scale: float = 1.0, progress: bool = True) -> dict:
+    """Run each scenario in a fresh process. Returns {scenario: result}."""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(run_scenario, (name, scale))
+        if progress:
+            print_result(name, results[name], file=sys.stderr)
+    return results
+
+
+def print_result(name: str, result: dict, file=None):
+    if result["phase_share"] is None:
+        shares = "n/a (playout kernel)"
+    else:
+        shares = ", ".join(f"{phase} {share:.0%}" for phase, share in result["phase_share"].items())
+    nodes = f", {result['nodes']} nodes" if "nodes" in result else ""
+    print(f"{name:<20} {result['games']} games in {result['seconds']:.2f}s: {result['games_per_sec']:,.2f} games/s, "
+          f"{result['plies_per_sec']:,.0f} plies/s, peak RSS {result['peak_rss_mb']:.1f} MB, "
+          f"{result['gc_collections']} GCs{nodes}\n{'':<20} phases: {shares}", file=file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dots & Cuts end-to-end simulation benchmark.")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare with a baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative slowdown flagged as a regression")
+    parser.add_argument("--only", help="regex on scenario names")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply the number of games (plies and nodes then differ from a baseline at another scale)")
+    args = parser.parse_args()
+
+    names = [name for name in SCENARIOS if not args.only or re.search(args.only, name)]
+    results = run_macro(names, args.scale)
+    if args.save:
+        save_baseline(args.save, "macro", results)
+        print(f"Baseline written to {args.save}")
+    if args.compare:
+        base = load_baseline(args.compare)
+        base["results"] = {k: v for k, v in base["results"].items() if k in names}
+        failed = False
+        for metric, higher_is_better in (("games_per_sec", True), ("peak_rss_mb", False)):
+            report = compare(base, results, metric, args.tolerance, higher_is_better=higher_is_better,
+                             exact=("plies", "nodes") if higher_is_better else ())
+            print_report(report, metric, args.tolerance)
+            failed = failed or bool(report["regressions"] or report["changed"])
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,252 @@
+"""
+Memory-Footprint Benchmark for Dots & Cuts
+==========================================
+How many bytes the engine's objects cost, and so how many games and how
+large a cache fit on one machine. Sizes are deep sizes: the bytes
+allocated (tracemalloc) while building an object and still held once it
+is built, measured after a warm-up, so tables shared by every game of a
+board size (hash keys, shot tables, move tables) are not counted; they are
+reported separately per board size.
+
+  object/game_state        standard 9x9 game, as set up
+  object/new_map_game      game on a layout not seen before, with its shot table
+                           (shot tables are cached for the last 64 layouts)
+  object/game_state_copy   GameState.copy (shares the board and tables)
+  object/history_entry     one undo entry of GameState.history
+  object/ply               everything one ply adds (history, visited edges, caches)
+  object/action            one ai_core.Action of generate_all_actions (with its list slot)
+  object/tt_entry          one TranspositionTable entry
+  object/eval_cache_entry  one EvalCache entry
+  length/<plies>           standard game state after that many random plies
+  pieces/<n>               9x9 state with n pieces per side
+  size/<n>                 n x n state with 2 pieces per side ("shared_bytes":
+                           what the first game of that size builds once: the
+                           size's tables and its layout's shot table)
+  concurrent/<n>           n standard games at 30 plies alive in one fresh
+                           process: RSS growth per game and total RSS; each
+                           game has its own layout and keeps its shot table
+
+  python benchmarks/memory_bench.py                                  run and print
+  python benchmarks/memory_bench.py --save baselines/memory.json     store a baseline
+  python benchmarks/memory_bench.py --compare baselines/memory.json  flag growth (exit code 1)
+
+The tracemalloc sizes do not depend on the machine's speed, only on the
+Python version, so they can be compared more tightly than the timings.
+"""
+
+import positions  # noqa: F401  (puts the project on sys.path)
+from positions import play_random
+from baseline import save_baseline, load_baseline, compare, print_report, current_rss_mb
+from dotscuts import KINDS, setup_standard_game
+from ai_core import generate_all_actions, make_action
+from custom_setup import GameSetupBuilder
+from minimax_ai import TranspositionTable, EvalCache, TT_EXACT
+from contextlib import contextmanager
+import gc
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tracemalloc
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "memory.json")
+GAME_LENGTHS = (0, 10, 20, 40, 80)
+PIECE_COUNTS = (1, 2, 4, 8)
+BOARD_SIZES = (5, 7, 9, 11, 13)
+CONCURRENT_GAMES = (1, 10, 100, 1000)
+SEED = 301
+LENGTH_SEED = 398   # its random game lasts 83 plies
+
+
+@contextmanager
+def traced():
+    """Trace allocations inside the block; yields now() -> bytes currently traced (after a collection)."""
+    gc.collect()
+    tracemalloc.start()
+
+    def now():
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        yield now
+    finally:
+        tracemalloc.stop()
+
+
+def deep_size(build, count: int = 1) -> float:
+    """Bytes held per object when `count` objects are built by build() and kept."""
+    with traced() as now:
+        before = now()
+        kept = [build() for _ in range(count)]
+        size = now() - before
+    del kept
+    return size / count
+
+
+def _lined_up(size: int, per_side: int):
+    """size x size board without obstacles, per_side pieces of alternating kinds on each back row."""
+    builder = GameSetupBuilder(size)
+    for i in range(per_side):
+        kind = KINDS[i % 2]
+        for player, row, tail_row in ((1, 0, 1), (2, size - 1, size - 2)):
+            tail_x = i if kind == "orthogonal" else (i + 1 if i + 1 < size else i - 1)
+            builder.add_piece(i, row, tail_x, tail_row, kind, player)
+    return builder.build()
+
+
+def _random_actions_played(game_state, player, plies, rng):
+    """make_action `plies` random legal actions (history kept); returns the number played."""
+    played = 0
+    for _ in range(plies):
+        if game_state.is_game_over()[0]:
+            break
+        make_action(game_state, rng.choice(generate_all_actions(game_state, player)))
+        player = 3 - player
+        played += 1
+    return played
+
+
+def object_sizes() -> dict:
+    results = {}
+    setup_standard_game(rng=random.Random(SEED))  # warm-up: tables of the 9x9 board and this layout
+    results["object/game_state"] = {"bytes": deep_size(lambda: setup_standard_game(rng=random.Random(SEED)), 20)}
+    # A game on a layout not seen yet also builds its shot table (first legal_shots call)
+    seeds = iter(range(SEED + 1, SEED + 1000))
+
+    def new_map():
+        game_state = setup_standard_game(rng=random.Random(next(seeds)))
+        generate_all_actions(game_state, 1)
+        return game_state
+    results["object/new_map_game"] = {"bytes": deep_size(new_map, 10)}
+    game_state = setup_standard_game(rng=random.Random(SEED))
+    results["object/game_state_copy"] = {"bytes": deep_size(game_state.copy, 50)}
+
+    # History: the growth of 30 plies, then what clearing the history gives back
+    game_state = setup_standard_game(rng=random.Random(SEED))
+    _random_actions_played(game_state.copy(), 1, 30, random.Random(SEED))  # warm-up of the move caches
+    with traced() as now:
+        before = now()
+        plies = _random_actions_played(game_state, 1, 30, random.Random(SEED))
+        grown = now()
+        game_state.history.clear()
+        cleared = now()
+    results["object/ply"] = {"bytes": (grown - before) / plies}
+    results["object/history_entry"] = {"bytes": (grown - cleared) / plies}
+
+    game_state = setup_standard_game(rng=random.Random(SEED))
+    n_actions = len(generate_all_actions(game_state, 1))
+    results["object/action"] = {"bytes": deep_size(lambda: generate_all_actions(game_state, 1), 200) / n_actions}
+
+    rng = random.Random(SEED)
+    entries = 100_000
+    tt = TranspositionTable(max_entries=entries)
+    with traced() as now:
+        before = now()
+        for _ in range(entries):
+            tt.store(rng.getrandbits(64), rng.randint(0, 6), rng.uniform(-1, 1), TT_EXACT, rng.randrange(10_000))
+        results["object/tt_entry"] = {"bytes": (now() - before) / entries}
+    del tt
+    cache = EvalCache(maxsize=entries)
+    with traced() as now:
+        before = now()
+        for _ in range(entries):
+            cache.put(rng.getrandbits(64), rng.uniform(-1, 1))
+        results["object/eval_cache_entry"] = {"bytes": (now() - before) / entries}
+    return results
+
+
+def scaling_sizes() -> dict:
+    results = {}
+    # Game length: one game, measured as it goes (its layout's shot table built beforehand)
+    generate_all_actions(setup_standard_game(rng=random.Random(LENGTH_SEED)), 1)
+    with traced() as now:
+        before = now()
+        game_state = setup_standard_game(rng=random.Random(LENGTH_SEED))
+        rng, player, plies = random.Random(LENGTH_SEED), 1, 0
+        for length in GAME_LENGTHS:
+            played = _random_actions_played(game_state, player, length - plies, rng)
+            player = player if played % 2 == 0 else 3 - player
+            plies += played
+            results[f"length/{length}"] = {"bytes": now() - before, "plies": plies}
+
+    for n in PIECE_COUNTS:
+        _lined_up(9, n)
+        results[f"pieces/{n}"] = {"bytes": deep_size(lambda: _lined_up(9, n), 20)}
+    return results
+
+
+def board_size_sizes() -> dict:
+    """size/<n> results (run in a fresh process, so no size has its tables yet)."""
+    results = {}
+    for size in BOARD_SIZES:
+        # The first game of a size builds that size's shared tables and its layout's shot table
+        with traced() as now:
+            before = now()
+            first = _lined_up(size, 2)
+            play_random(first, 1, 2, random.Random(SEED))
+            first_bytes = now() - before
+        per_game = deep_size(lambda: _lined_up(size, 2), 20)
+        results[f"size/{size}"] = {"bytes": per_game, "shared_bytes": max(0.0, first_bytes - per_game)}
+    return results
+
+
+def concurrent_rss(n: int, plies: int = 30) -> dict:
+    """RSS of n standard games at `plies` plies kept alive (run in a fresh process)."""
+    setup_standard_game(rng=random.Random(SEED))
+    gc.collect()
+    before = current_rss_mb()
+    games = []
+    for i in range(n):
+        game_state = setup_standard_game(rng=random.Random(SEED + i))
+        _random_actions_played(game_state, 1, plies, random.Random(SEED + i))
+        games.append(game_state)
+    gc.collect()
+    rss = current_rss_mb()
+    return {"bytes": (rss - before) * 2 ** 20 / n, "rss_mb": rss}
+
+
+def run_memory(only: str = None, progress: bool = True) -> dict:
+    results = {}
+    pattern = re.compile(only) if only else None
+    results.update(object_sizes())
+    results.update(scaling_sizes())
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        results.update(pool.apply(board_size_sizes))
+    for n in CONCURRENT_GAMES:
+        if pattern is not None and not pattern.search(f"concurrent/{n}"):
+            continue
+        with context.Pool(1) as pool:
+            results[f"concurrent/{n}"] = pool.apply(concurrent_rss, (n,))
+    if pattern is not None:
+        results = {k: v for k, v in results.items() if pattern.search(k)}
+    if progress:
+        for key, result in results.items():
+            extra = "".join(f", {name} {value:,.0f}" for name, value in result.items() if name != "bytes")
+            print(f"{key:<28} {result['bytes']:>12,.0f} bytes{extra}", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dots & Cuts memory-footprint benchmark.")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare with a baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative growth flagged as a regression")
+    parser.add_argument("--only", help="regex on result keys")
+    args = parser.parse_args()
+
+    results = run_memory(args.only)
+    if args.save:
+        save_baseline(args.save, "memory", results)
+        print(f"Baseline written to {args.save}")
+    if args.compare:
+        base = load_baseline(args.compare)
+        if args.only:
+            base["results"] = {k: v for k, v in base["results"].items() if re.search(args.only, k)}
+        report = compare(base, results, "bytes", args.tolerance, exact=("plies",))
+        print_report(report, "bytes", args.tolerance)
+        sys.exit(1 if report["regressions"] or report["changed"] else 0)
@@ -0,0 +1,158 @@
+"""
+Engine Microbenchmarks for Dots & Cuts
+======================================
+Times the engine primitives on the fixed positions of positions.py:
+
+  generate_all_actions   all legal actions of the side to move
+  can_shoot              Piece.can_shoot of every piece at every enemy piece
+  is_game_over           GameState.is_game_over
+  make_unmake            make_action + undo_last_move of every legal action
+  evaluate_v1            evaluate_position_v1 with the v1 weights (no cache)
+  state_to_vector_v2     ai_core.state_to_vector_v2
+  action_to_notation     move_notation.action_to_notation of every legal action
+  minimax_d1 .. d4       minimax from the position (v1, no TT, random.seed(0))
+
+Each result is the best of `repeats` rounds, in microseconds per operation
+(one action, one can_shoot call, one search, ...); minimax results also
+record their node count, which must not change for the same search.
+
+  python benchmarks/micro_bench.py                                  run and print
+  python benchmarks/micro_bench.py --save baselines/micro.json      store a baseline
+  python benchmarks/micro_bench.py --compare baselines/micro.json   flag regressions
+                                                                    (exit code 1)
+Timings are only comparable on the same machine and Python: save a baseline
+before an engine change and compare after it.
+"""
+
+import positions  # noqa: F401  (puts the project on sys.path)
+from positions import POSITION_NAMES, build_positions
+from baseline import save_baseline, load_baseline, compare, print_report
+from ai_core import generate_all_actions, make_action, state_to_vector_v2
+from move_notation import action_to_notation
+from minimax_ai import MINIMAX_VERSIONS, SearchContext, minimax
+import os
+import random
+import re
+import sys
+import time
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro.json")
+MINIMAX_DEPTHS = (1, 2, 3, 4)
+
+
+def _time_per_call(fn, repeats: int, min_round: float = 0.05) -> float:
+    """Best time of one fn() call over `repeats` rounds of at least min_round seconds."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_round:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeats - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best
+
+
+def _benchmarks(game_state, player):
+    """{name: (function, operations per call)} for one position."""
+    actions = generate_all_actions(game_state, player)
+    pieces = list(game_state.pieces)
+    targets = [(piece, enemy.x, enemy.y) for piece in pieces for enemy in pieces if enemy.player != piece.player]
+    evaluate = MINIMAX_VERSIONS["v1"]["evaluate_position"]
+
+    def can_shoot():
+        for piece, x, y in targets:
+            piece.can_shoot(x, y, game_state)
+
+    def make_unmake():
+        for action in actions:
+            make_action(game_state, action)
+            game_state.undo_last_move()
+
+    def notation():
+        for action in actions:
+            action_to_notation(action, game_state)
+
+    return {
+        "generate_all_actions": (lambda: generate_all_actions(game_state, player), 1),
+        "can_shoot": (can_shoot, max(len(targets), 1)),
+        "is_game_over": (game_state.is_game_over, 1),
+        "make_unmake": (make_unmake, max(len(actions), 1)),
+        "evaluate_v1": (lambda: evaluate(game_state, player), 1),
+        "state_to_vector_v2": (lambda: state_to_vector_v2(game_state, player), 1),
+        "action_to_notation": (notation, max(len(actions), 1)),
+    }
+
+
+def _search(game_state, player, depth):
+    """One minimax search as the benchmark runs it; returns the node count."""
+    random.seed(0)
+    ctx = SearchContext("v1", root_depth=depth)
+    minimax(game_state, depth, float("-inf"), float("inf"), True, player, version="v1", ctx=ctx)
+    return ctx.stats.nodes + ctx.stats.qnodes
+
+
+def run_micro(names=POSITION_NAMES, only: str = None, repeats: int = 5, max_depth: int = 4,
+              progress: bool = True):
+    """
+    Run the suite. only: regex on the "benchmark/position" keys.
+    Returns (results {key: {"us_per_op", "ops", "nodes"?}}, {position: hash}).
+    """
+    states = build_positions(names)
+    pattern = re.compile(only) if only else None
+    results = {}
+    for name, (game_state, player) in states.items():
+        jobs = {bench: spec for bench, spec in _benchmarks(game_state, player).items()}
+        for depth in MINIMAX_DEPTHS[:max_depth]:
+            jobs[f"minimax_d{depth}"] = ((lambda d=depth: _search(game_state, player, d)), 1)
+        for bench, (fn, ops) in jobs.items():
+            key = f"{bench}/{name}"
+            if pattern is not None and not pattern.search(key):
+                continue
+            result = {"ops": ops}
+            if bench.startswith("minimax"):
+                result["nodes"] = fn()
+                # Searches take up to seconds: fewer, single-call rounds
+                seconds = _time_per_call(fn, max(2, repeats // 2), min_round=0.0)
+            else:
+                seconds = _time_per_call(fn, repeats)
+            result["us_per_op"] = seconds / ops * 1e6
+            results[key] = result
+            if progress:
+                nodes = f", {result['nodes']} nodes" if "nodes" in result else ""
+                print(f"{key:<36} {result['us_per_op']:>12.3f} us/op{nodes}", file=sys.stderr)
+    return results, {name: f"{gs.position_hash(player):016x}" for name, (gs, player) in states.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dots & Cuts engine microbenchmarks.")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help=f"compare with a baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative slowdown flagged as a regression")
+    parser.add_argument("--only", help="regex on benchmark/position keys")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-depth", type=int, default=4)
+    args = parser.parse_args()
+
+    results, position_keys = run_micro(only=args.only, repeats=args.repeats, max_depth=args.max_depth)
+    if args.save:
+        save_baseline(args.save, "micro", results, position_keys)
+        print(f"Baseline written to {args.save}")
+    if args.compare:
+        base = load_baseline(args.compare)
+        if args.only:
+            base["results"] = {k: v for k, v in base["results"].items() if re.search(args.only, k)}
+        report = compare(base, results, "us_per_op", args.tolerance,
+                         exact=("nodes",), positions=position_keys)
+        print_report(report, "us_per_op", args.tolerance)
+        sys.exit(1 if report["regressions"] or report["changed"] else 0)
@@ -0,0 +1,114 @@
+"""
+Fixed Benchmark Positions for Dots & Cuts
+=========================================
+Seeded positions shared by the benchmark suites. Random plies are drawn
+from the legal actions sorted by (piece x, y, kind, action type, target),
+so the positions do not change when move generation changes its order.
+
+  - opening:      standard 9x9 map, first move
+  - midgame:      standard 9x9 map after 14 random plies
+  - shoot_heavy:  the position with the most shots for the side to move in
+                  the first 60 plies of a random standard game
+  - endgame:      4 plies before the end of a random standard game
+  - skirmish:     skirmish_9x9 (4 pieces per side) after 6 random plies
+  - small_5x5:    small_5x5 after 4 random plies
+
+Importing this module also puts the project directories on sys.path.
+"""
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _sub in ("core", "minimax_approach", "mcts_approach", "pygame_ui"):
+    _path = os.path.join(ROOT, _sub)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from dotscuts import setup_standard_game
+from ai_core import generate_all_actions, execute_action
+from custom_setup import PrebuiltSetups
+
+POSITION_NAMES = ("opening", "midgame", "shoot_heavy", "endgame", "skirmish", "small_5x5")
+
+
+def canonical_actions(game_state, player):
+    """Legal actions of `player` in a fixed order (independent of move generation)."""
+    return sorted(generate_all_actions(game_state, player),
+                  key=lambda a: (a.piece.x, a.piece.y, a.piece.kind, a.action_type, a.target_x, a.target_y))
+
+
+def play_random(game_state, player: int, plies: int, rng: random.Random):
+    """Play up to `plies` random canonical actions; returns the player to move."""
+    for _ in range(plies):
+        if game_state.is_game_over()[0]:
+            break
+        execute_action(game_state, rng.choice(canonical_actions(game_state, player)))
+        player = 3 - player
+    return player
+
+
+def _random_game_length(seed: int) -> int:
+    game_state = setup_standard_game(rng=random.Random(seed))
+    rng = random.Random(seed)
+    player, plies = 1, 0
+    while not game_state.is_game_over()[0]:
+        execute_action(game_state, rng.choice(canonical_actions(game_state, player)))
+        player = 3 - player
+        plies += 1
+    return plies
+
+
+def _shoot_heavy(seed: int, max_plies: int = 60):
+    rng = random.Random(seed)
+    game_state = setup_standard_game(rng=random.Random(seed))
+    player = 1
+    best_plies, best_shots = 0, -1
+    for plies in range(max_plies):
+        if game_state.is_game_over()[0]:
+            break
+        actions = canonical_actions(game_state, player)
+        shots = sum(1 for a in actions if a.action_type == "shoot")
+        if shots > best_shots:
+            best_plies, best_shots = plies, shots
+        execute_action(game_state, rng.choice(actions))
+        player = 3 - player
+    # Replay to the chosen ply (same seed, same choices)
+    game_state = setup_standard_game(rng=random.Random(seed))
+    return game_state, play_random(game_state, 1, best_plies, random.Random(seed))
+
+
+def _prebuilt(name: str, seed: int, plies: int):
+    state = random.getstate()
+    random.seed(seed)  # skirmish_9x9 draws its obstacles from the global RNG
+    try:
+        game_state = getattr(PrebuiltSetups, name)()
+    finally:
+        random.setstate(state)
+    return game_state, play_random(game_state, 1, plies, random.Random(seed))
+
+
+def build_position(name: str):
+    """(game_state, player to move) of benchmark position `name`."""
+    if name == "opening":
+        return setup_standard_game(rng=random.Random(101)), 1
+    if name == "midgame":
+        game_state = setup_standard_game(rng=random.Random(102))
+        return game_state, play_random(game_state, 1, 14, random.Random(102))
+    if name == "shoot_heavy":
+        return _shoot_heavy(103)
+    if name == "endgame":
+        plies = max(_random_game_length(104) - 4, 0)
+        game_state = setup_standard_game(rng=random.Random(104))
+        return game_state, play_random(game_state, 1, plies, random.Random(104))
+    if name == "skirmish":
+        return _prebuilt("skirmish_9x9", 105, 6)
+    if name == "small_5x5":
+        return _prebuilt("small_5x5", 106, 4)
+    raise ValueError(f"Unknown benchmark position: {name}")
+
+
+def build_positions(names=POSITION_NAMES) -> dict:
+    """{name: (game_state, player to move)}."""
+    return {name: build_position(name) for name in names}
@@ -12,35 +12,15 @@ def generate_legal_actions(game_state: GameState, piece: Piece) -> list:
     """
     Generate legal actions for a given piece
     """
-    
-    legal_actions = []
-    enemy_pieces = [p for p in game_state.pieces if p.player != piece.player]
-
-    # Available moves
-    directions = []
-    if piece.kind == "diagonal":
-        directions = [(1, 1), (-1, -1), (-1, 1), (1, -1)]
-    elif piece.kind == "orthogonal":
-        directions = [(0, 1), (0, -1), (-1, 0), (1, 0)]
-    
-    for dx, dy in directions:
-        new_x, new_y = piece.x + dx, piece.y + dy
-        if piece.can_move(new_x, new_y, game_state):
-            legal_actions.append(Action(piece, "move", new_x, new_y))
-
-    # Available shots
-    for enemy_piece in enemy_pieces:
-        if piece.can_shoot(enemy_piece.x, enemy_piece.y, game_state):
-            new_x, new_y = enemy_piece.x, enemy_piece.y
-            legal_actions.append(Action(piece, "shoot", new_x, new_y))
-    
+    legal_actions = [Action(piece, "move", x, y) for x, y in game_state.legal_moves(piece)]
+    legal_actions.extend(Action(piece, "shoot", x, y) for x, y in game_state.legal_shots(piece))
     return legal_actions
 
 def generate_all_actions(game_state: GameState, current_player: int) -> list:
     """
     Generates all legal actions for a player
     """
-    player_pieces = [p for p in game_state.pieces if p.player == current_player]
+    player_pieces = game_state.player_pieces(current_player)
     all_actions = []
     for piece in player_pieces:
         actions = generate_legal_actions(game_state, piece)
@@ -64,6 +44,102 @@ def execute_action(game_state: GameState, action: Action):
     elif action_type == "shoot":
         piece.shoot(target_x, target_y, game_state)
 
+def make_action(game_state: GameState, action: Action):
+    """
+    Trusted execute_action for actions generated on this very position
+    (generate_legal_actions / generate_all_actions): skips the legality
+    checks. Take it back with game_state.undo_last_move().
+    """
+    if action.action_type == "move":
+        game_state.make_move(action.piece, action.target_x, action.target_y)
+    else:
+        game_state.make_shot(action.piece, action.target_x, action.target_y)
+
+def play_action(game_state: GameState, action: Action, copy_make: bool = False) -> GameState:
+    """
+    Play a generated `action` (trusted, see make_action) and return the
+    resulting state.
+    make/unmake (default): the action is played on game_state itself, which
+    is returned; take it back with game_state.undo_last_move().
+    copy_make: the action is played on game_state.copy(), game_state is left
+    untouched and nothing needs undoing.
+    """
+    if not copy_make:
+        make_action(game_state, action)
+        return game_state
+    child = game_state.copy()
+    make_action(child, Action(child.piece(action.piece.id), action.action_type,
+                                 action.target_x, action.target_y))
+    return child
+
+def perft(game_state: GameState, player: int, depth: int, copy_make: bool = False) -> int:
+    """
+    Number of leaf positions of the legal game tree `depth` plies deep
+    (finished games count as leaves). Checks and times move generation:
+    the count must not change when generation is optimised.
+    copy_make: play moves on copies instead of make/unmake (see play_action).
+    """
+    if depth == 0 or game_state.is_game_over()[0]:
+        return 1
+    nodes = 0
+    for action in generate_all_actions(game_state, player):
+        child = play_action(game_state, action, copy_make)
+        try:
+            nodes += perft(child, 3 - player, depth - 1, copy_make)
+        finally:
+            if child is game_state:
+                game_state.undo_last_move()
+    return nodes
+
+# ---------------------------------------------------------------------------
+# Compact action codes
+# ---------------------------------------------------------------------------
+# 16-bit encoding, independent of Piece object identity:
+#   bits 15..8  source vertex index (y * size + x)
+#   bit  7      1 = shoot, 0 = move
+#   bits 6..4   direction index into ACTION_DIRECTIONS
+#   bits 3..0   distance along the direction (1 for moves)
+# The piece kind is implied by action type + direction (orthogonal pieces
+# move along rows/columns and shoot along diagonals, diagonal pieces the
+# opposite), the player is the side to move.
+ACTION_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1),
+                     (1, 1), (-1, -1), (-1, 1), (1, -1)]
+_DIRECTION_INDEX = {d: i for i, d in enumerate(ACTION_DIRECTIONS)}
+
+
+def action_to_code(action: Action, board_size: int) -> int:
+    """Encode an Action as a 16-bit integer (see ACTION_DIRECTIONS)."""
+    piece = action.piece
+    dx = action.target_x - piece.x
+    dy = action.target_y - piece.y
+    dist = max(abs(dx), abs(dy))
+    direction = _DIRECTION_INDEX[(dx // dist, dy // dist)]
+    is_shoot = 1 if action.action_type == "shoot" else 0
+    return ((piece.y * board_size + piece.x) << 8) | (is_shoot << 7) | (direction << 4) | dist
+
+
+def code_to_action(game_state: GameState, code: int, player: int):
+    """
+    Decode a code produced by action_to_code into an Action on game_state.
+    Returns None if no matching piece of `player` is on the source vertex.
+    """
+    size = game_state.board.size
+    src = code >> 8
+    x, y = src % size, src // size
+    is_shoot = (code >> 7) & 1
+    dx, dy = ACTION_DIRECTIONS[(code >> 4) & 7]
+    dist = code & 15
+    diagonal_dir = dx != 0 and dy != 0
+    if is_shoot:
+        kind = "orthogonal" if diagonal_dir else "diagonal"
+    else:
+        kind = "diagonal" if diagonal_dir else "orthogonal"
+    for p in game_state.pieces:
+        if p.x == x and p.y == y and p.player == player and p.kind == kind:
+            return Action(p, "shoot" if is_shoot else "move", x + dx * dist, y + dy * dist)
+    return None
+
+
 def action_to_vector(action: Action):
     """
     Transforms an object of type Action into a numeric array for RL purposes.
@@ -240,8 +316,8 @@ def state_to_vector_v2(game_state: GameState, current_player: int):
     my_reachable = np.zeros((N, N))       # vertices I can move to
     enemy_reachable = np.zeros((N, N))    # vertices enemy can move to
 
-    my_piece_list = [p for p in game_state.pieces if p.player == current_player]
-    enemy_piece_list = [p for p in game_state.pieces if p.player == opponent]
+    my_piece_list = game_state.player_pieces(current_player)
+    enemy_piece_list = game_state.player_pieces(opponent)
     max_enemies = max(len(enemy_piece_list), 1)
 
     for piece in my_piece_list:
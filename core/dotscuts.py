@@ -1,3 +1,255 @@
+import random as _random
+import weakref
+from array import array
+from collections import OrderedDict
+
+
+# ---------------------------------------------------------------------------
+# Position hashing
+# ---------------------------------------------------------------------------
+# Zobrist keys are drawn from a fixed-seed RNG so that the same position
+# hashes to the same value in every process (opening books and shared
+# caches depend on this).
+_ZOBRIST_SEED = 0xD07C
+_ZOBRIST_TABLES = {}
+SIDE_TO_MOVE_KEY = _random.Random(_ZOBRIST_SEED).getrandbits(64)
+
+
+def zobrist_tables(size):
+    """
+    Return (edge_keys, piece_keys, cell_keys) for a board of the given size.
+    edge_keys:  {(v1, v2): key} for every orthogonal and diagonal edge (v1 < v2)
+    piece_keys: {(kind, player, x, y): key}
+    cell_keys:  {(feature, x, y): key} with feature in "tower", "bunker", "lake"
+    """
+    tables = _ZOBRIST_TABLES.get(size)
+    if tables is not None:
+        return tables
+
+    rng = _random.Random(_ZOBRIST_SEED * 1000 + size)
+    edge_keys = {}
+    for y in range(size):
+        for x in range(size):
+            for dx, dy in ((1, 0), (0, 1), (1, 1), (-1, 1)):
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < size and 0 <= ny < size:
+                    edge = tuple(sorted([(x, y), (nx, ny)]))
+                    edge_keys[edge] = rng.getrandbits(64)
+    piece_keys = {}
+    for kind in ("orthogonal", "diagonal"):
+        for player in (1, 2):
+            for y in range(size):
+                for x in range(size):
+                    piece_keys[(kind, player, x, y)] = rng.getrandbits(64)
+    cell_keys = {}
+    for feature in ("tower", "bunker", "lake"):
+        for y in range(size - 1):
+            for x in range(size - 1):
+                cell_keys[(feature, x, y)] = rng.getrandbits(64)
+
+    tables = (edge_keys, piece_keys, cell_keys)
+    _ZOBRIST_TABLES[size] = tables
+    return tables
+
+
+def board_signature(board):
+    """64-bit key identifying the board layout (size, towers, bunkers, lakes)."""
+    _, _, cell_keys = zobrist_tables(board.size)
+    key = board.size
+    for y in range(board.size - 1):
+        for x in range(board.size - 1):
+            if board.towers[y][x]:
+                key ^= cell_keys[("tower", x, y)]
+            if board.bunkers[y][x]:
+                key ^= cell_keys[("bunker", x, y)]
+            if board.lakes[y][x]:
+                key ^= cell_keys[("lake", x, y)]
+    return key
+
+
+# ---------------------------------------------------------------------------
+# Static move / shot tables
+# ---------------------------------------------------------------------------
+# Which edges a piece may step along and which vertices it may shoot at
+# depend only on the board, so they are computed once per board size /
+# layout. Per position only the visited edges and the enemy positions vary.
+MOVE_DIRECTIONS = {
+    "orthogonal": ((0, 1), (0, -1), (-1, 0), (1, 0)),
+    "diagonal": ((1, 1), (-1, -1), (-1, 1), (1, -1)),
+}
+_NEIGHBOUR_TABLES = {}
+# Shot tables of the most recent board layouts (one per map: a long batch of
+# random maps must not keep them all)
+_SHOT_TABLES = OrderedDict()
+SHOT_TABLE_CACHE_SIZE = 64
+# edge -> the two (vertex, kind) move-cache keys it affects (all sizes)
+_EDGE_CACHE_KEYS = {}
+
+
+def neighbour_table(size, kind):
+    """
+    {(x, y): (((nx, ny), edge), ...)}: one-step moves of `kind` from every
+    vertex, with the edge in the sorted form used by visited_edges.
+    """
+    table = _NEIGHBOUR_TABLES.get((size, kind))
+    if table is not None:
+        return table
+    table = {}
+    for y in range(size):
+        for x in range(size):
+            table[(x, y)] = tuple(
+                ((x + dx, y + dy), tuple(sorted([(x, y), (x + dx, y + dy)])))
+                for dx, dy in MOVE_DIRECTIONS[kind]
+                if 0 <= x + dx < size and 0 <= y + dy < size)
+    _NEIGHBOUR_TABLES[(size, kind)] = table
+    for v, moves in table.items():
+        for _, edge in moves:
+            _EDGE_CACHE_KEYS[edge] = ((edge[0], kind), (edge[1], kind))
+    return table
+
+
+def shot_table(board, board_key=None):
+    """
+    {(kind, x, y): frozenset of vertices} a piece of `kind` on (x, y) may
+    shoot at by direction and z rules (the shot still needs an enemy on
+    the target). Cached for the last SHOT_TABLE_CACHE_SIZE board layouts.
+    """
+    if board_key is None:
+        board_key = board_signature(board)
+    table = _SHOT_TABLES.get(board_key)
+    if table is not None:
+        _SHOT_TABLES.move_to_end(board_key)
+        return table
+    size = board.size
+    table = {}
+    for kind in MOVE_DIRECTIONS:
+        # Shots go along the directions the other kind moves in
+        shot_directions = MOVE_DIRECTIONS["diagonal" if kind == "orthogonal" else "orthogonal"]
+        for y in range(size):
+            for x in range(size):
+                table[(kind, x, y)] = frozenset(_shot_targets(board.z, x, y, shot_directions))
+    _SHOT_TABLES[board_key] = table
+    if len(_SHOT_TABLES) > SHOT_TABLE_CACHE_SIZE:
+        _SHOT_TABLES.popitem(last=False)
+    return table
+
+
+def _shot_targets(z, x, y, directions):
+    """
+    Targets allowed by shot_path_allowed from (x, y) along `directions`,
+    walking each ray once and tracking the z values crossed so far.
+    """
+    z_start = z[y][x]
+    size = len(z)
+    targets = []
+    for dx, dy in directions:
+        mids_low = True      # every vertex crossed so far has z in (0, -1)
+        mids_bunker = True   # every vertex crossed so far has z == -1
+        tx, ty = x + dx, y + dy
+        while 0 <= tx < size and 0 <= ty < size:
+            z_end = z[ty][tx]
+            if z_start == 1:
+                allowed = z_end == 1 or (z_end == 0 and mids_low)
+            elif z_start == -1:
+                allowed = z_end == -1 and mids_bunker
+            else:
+                allowed = z_end in (0, 1) and mids_low
+            if allowed:
+                targets.append((tx, ty))
+            mids_low = mids_low and z_end != 1
+            mids_bunker = mids_bunker and z_end == -1
+            tx, ty = tx + dx, ty + dy
+    return targets
+
+
+_RAY_EDGES = {}
+
+
+def ray_edges(x, y, target_x, target_y):
+    """
+    Edges (sorted form) crossed by a straight shot from (x, y) to
+    (target_x, target_y), in order. Cached; the same on every board.
+    """
+    key = (x, y, target_x, target_y)
+    edges = _RAY_EDGES.get(key)
+    if edges is None:
+        step_x = (target_x > x) - (target_x < x)
+        step_y = (target_y > y) - (target_y < y)
+        edges = []
+        a = (x, y)
+        while a != (target_x, target_y):
+            b = (a[0] + step_x, a[1] + step_y)
+            edges.append((a, b) if a < b else (b, a))
+            a = b
+        edges = tuple(edges)
+        _RAY_EDGES[key] = edges
+    return edges
+
+
+def shot_path_allowed(kind, x, y, target_x, target_y, board):
+    """
+    True if a piece of `kind` on (x, y) may shoot at (target_x, target_y)
+    by direction and z rules alone (Piece.can_shoot also needs an enemy there).
+    """
+    dx = target_x - x
+    dy = target_y - y
+
+    if dx == 0 and dy == 0:
+        return False  # same position
+
+    # Direction rules (OPPOSITE of movement direction)
+    # Orthogonal pieces MOVE along rows/columns but SHOOT along diagonals
+    # Diagonal pieces MOVE along diagonals but SHOOT along rows/columns
+    if kind == "orthogonal" and abs(dx) != abs(dy):
+        return False
+    if kind == "diagonal" and not (dx == 0 or dy == 0):
+        return False
+
+    # Normalize direction
+    step_x = 0 if dx == 0 else dx // abs(dx)
+    step_y = 0 if dy == 0 else dy // abs(dy)
+
+    current_x, current_y = x, y
+    z_start = board.z[y][x]
+    z_end = board.z[target_y][target_x]
+
+    # Valid z_start/z_end combinations (applies even for distance-1 shots):
+    # 1->1, 1->0, -1->-1, 0->0, 0->1  are allowed.
+    # -1->0, -1->1, 0->-1, 1->-1  are always illegal.
+    valid_combo = (
+        (z_start == 1  and z_end in (1, 0)) or
+        (z_start == -1 and z_end == -1)     or
+        (z_start == 0  and z_end in (0, 1))
+    )
+    if not valid_combo:
+        return False
+
+    while (current_x, current_y) != (target_x, target_y):
+        current_x += step_x
+        current_y += step_y
+        if (current_x, current_y) == (target_x, target_y):
+            break
+        z_mid = board.z[current_y][current_x]
+
+        # z rules (valid_combo leaves only these five combinations)
+        if z_start == 1 and z_end == 1:
+            continue
+        elif z_start == -1 and z_end == -1:
+            if z_mid != -1:
+                return False
+        elif z_start == 0 and z_end == 0:
+            if z_mid not in (0, -1):
+                return False
+        elif z_start == 1 and z_end == 0:
+            if z_mid not in (0, -1):
+                return False
+        elif z_start == 0 and z_end == 1:
+            if z_mid not in (0, -1):
+                return False
+
+    return True
+
+
 class Board:
 
     """
@@ -68,6 +320,10 @@ class Board:
         """
         self.lakes[y][x] = True
 
+    def __reduce__(self):
+        # Pickles as its compact wire form; unpickling interns it (intern_board)
+        return (_board_from_wire, (board_to_wire(self),))
+
     def print_board(self):
         """
         Print the current board state.
@@ -102,20 +358,433 @@ class Board:
                 row.append(cell)
             print(" ".join(row))
 
+# ---------------------------------------------------------------------------
+# Compact wire format (pickling / IPC)
+# ---------------------------------------------------------------------------
+# Boards are read-only during play, so a process keeps one Board per layout
+# (keyed by board_signature) and every GameState unpickled there shares it.
+# Visited edges travel as a bitmask over a fixed edge numbering.
+_BOARDS = weakref.WeakValueDictionary()
+_EDGE_IDS = {}
+
+
+def intern_board(board):
+    """The canonical Board of this process for board's layout (registers board if new)."""
+    key = board_signature(board)
+    canonical = _BOARDS.get(key)
+    if canonical is None:
+        _BOARDS[key] = canonical = board
+    return canonical
+
+
+def _bitmask(rows):
+    mask = 0
+    bit = 0
+    for row in rows:
+        for flag in row:
+            if flag:
+                mask |= 1 << bit
+            bit += 1
+    return mask
+
+
+def _unmask(mask, size):
+    return [[bool(mask >> (y * size + x) & 1) for x in range(size)] for y in range(size)]
+
+
+def board_to_wire(board):
+    """(key, size, towers, bunkers, lakes, z): cell bitmasks and z grid bytes."""
+    size = board.size
+    z = array("b", (v for row in board.z for v in row)).tobytes()
+    return (board_signature(board), size, _bitmask(board.towers), _bitmask(board.bunkers),
+            _bitmask(board.lakes), z)
+
+
+def _board_from_wire(data):
+    key, size, towers, bunkers, lakes, z = data
+    board = _BOARDS.get(key)
+    if board is not None:
+        return board
+    board = Board(size)
+    board.towers = _unmask(towers, size - 1)
+    board.bunkers = _unmask(bunkers, size - 1)
+    board.lakes = _unmask(lakes, size - 1)
+    z = array("b", z)
+    board.z = [list(z[y * size:(y + 1) * size]) for y in range(size)]
+    return intern_board(board)
+
+
+def edge_ids(size):
+    """(edges, {edge: id}): fixed numbering of every edge of a size x size board."""
+    ids = _EDGE_IDS.get(size)
+    if ids is None:
+        edges = tuple(zobrist_tables(size)[0])
+        ids = (edges, {edge: i for i, edge in enumerate(edges)})
+        _EDGE_IDS[size] = ids
+    return ids
+
+
+# ---------------------------------------------------------------------------
+# Piece storage
+# ---------------------------------------------------------------------------
+KINDS = ("orthogonal", "diagonal")
+_KIND_CODE = {kind: code for code, kind in enumerate(KINDS)}
+
+
+class PieceTable:
+    """
+    Struct-of-arrays piece storage: parallel arrays x, y, player, kind
+    (index into KINDS), arrival and alive, indexed by a stable piece id.
+    Captures and undo only flip `alive`, so ids (and the Piece views bound
+    to them) never move. The arrays support the buffer protocol, e.g.
+    np.frombuffer(table.x, dtype=np.int16) is a zero-copy view.
+    """
+
+    def __init__(self):
+        self.x = array("h")
+        self.y = array("h")
+        self.player = array("b")
+        self.kind = array("b")
+        self.arrival = array("q")
+        self.alive = array("b")
+        self.views = []          # id -> Piece view
+        self._live_ids = None    # cached ids of live pieces, in id order
+        self._live_views = None
+        self._by_player = {}     # cached live views per player
+
+    def __len__(self):
+        return len(self.views)
+
+    def add(self, kind, x, y, player, arrival=0, view=None):
+        """Append a live piece and return its id; `view` becomes its Piece view."""
+        pid = len(self.views)
+        self.x.append(x)
+        self.y.append(y)
+        self.player.append(player)
+        self.kind.append(_KIND_CODE[kind])
+        self.arrival.append(arrival)
+        self.alive.append(1)
+        if view is None:
+            view = Piece.__new__(Piece)
+        view._table, view.id = self, pid
+        self.views.append(view)
+        self._live_ids = self._live_views = None
+        self._by_player.clear()
+        return pid
+
+    def kill(self, pid):
+        self.alive[pid] = 0
+        self._live_ids = self._live_views = None
+        self._by_player.clear()
+
+    def revive(self, pid):
+        self.alive[pid] = 1
+        self._live_ids = self._live_views = None
+        self._by_player.clear()
+
+    def live_ids(self):
+        if self._live_ids is None:
+            alive = self.alive
+            self._live_ids = [i for i in range(len(alive)) if alive[i]]
+        return self._live_ids
+
+    def live(self):
+        """Live Piece views in id order (cached: do not mutate the list)."""
+        if self._live_views is None:
+            views = self.views
+            self._live_views = [views[i] for i in self.live_ids()]
+        return self._live_views
+
+    def copy(self):
+        """Independent copy with the same ids (new Piece views bound to the copy)."""
+        new = PieceTable.__new__(PieceTable)
+        new.x, new.y = self.x[:], self.y[:]
+        new.player, new.kind = self.player[:], self.kind[:]
+        new.arrival, new.alive = self.arrival[:], self.alive[:]
+        new.views = []
+        for pid in range(len(self.views)):
+            view = Piece.__new__(Piece)
+            view._table, view.id = new, pid
+            new.views.append(view)
+        new._live_ids = self._live_ids  # never mutated in place, safe to share
+        new._live_views = None
+        new._by_player = {}
+        return new
+
+    def live_of(self, player):
+        """Live Piece views of one player, in id order (cached like live())."""
+        views = self._by_player.get(player)
+        if views is None:
+            owner = self.player
+            views = [self.views[i] for i in self.live_ids() if owner[i] == player]
+            self._by_player[player] = views
+        return views
+
+
+def _encode_entry(entry):
+    """History entry -> tuple with piece ids instead of Piece views."""
+    edges = (entry["edge"],) if "edge" in entry else tuple(entry["edges"])
+    removed = tuple((p.id, x, y, arrival) for p, x, y, arrival in entry["removed"])
+    return (entry["piece"].id, entry["old_pos"], entry["old_arrival"], entry["old_counter"],
+            "edges" in entry, edges, removed)
+
+
+def _decode_entry(data, views):
+    pid, old_pos, old_arrival, old_counter, shot, edges, removed = data
+    entry = {
+        "piece": views[pid],
+        "old_pos": old_pos,
+        "old_arrival": old_arrival,
+        "old_counter": old_counter,
+        "removed": [(views[p], x, y, arrival) for p, x, y, arrival in removed],
+    }
+    if shot:
+        entry["edges"] = list(edges)
+        entry["type"] = "shoot"
+    else:
+        entry["edge"] = edges[0]
+    return entry
+
+
 class GameState:
 
     def __init__(self, board):
         self.board = board
-        self.pieces = []  # List to hold pieces
+        self._pieces = PieceTable()  # pieces on the board (see the `pieces` property)
         self.visited_edges = set()
         self.move_counter = 0  # global counter to track arrival order on vertices
         self.history = []  # stack for undo functionality
+        self._init_hash()
+        self._init_move_cache()
         self.initialize_lake_edges()
+
+    def _init_hash(self):
+        """
+        Reset the incremental position hash from scratch.
+        Edges are combined with XOR (each edge is visited at most once),
+        pieces with addition mod 2^64 so that two identical pieces stacked on
+        the same vertex do not cancel out.
+        """
+        self._edge_keys, self._piece_keys, _ = zobrist_tables(self.board.size)
+        self._board_key = board_signature(self.board)
+        self._edge_hash = 0
+        for edge in self.visited_edges:
+            self._edge_hash ^= self._edge_keys[edge]
+        self._piece_hash = 0
+        for p in self.pieces:
+            self._hash_piece(p)
+
+    def _piece_key(self, piece):
+        table, pid = piece._table, piece.id
+        return self._piece_keys[(KINDS[table.kind[pid]], table.player[pid], table.x[pid], table.y[pid])]
+
+    def _hash_piece(self, piece):
+        self._piece_hash = (self._piece_hash + self._piece_key(piece)) & 0xFFFFFFFFFFFFFFFF
+
+    def _unhash_piece(self, piece):
+        self._piece_hash = (self._piece_hash - self._piece_key(piece)) & 0xFFFFFFFFFFFFFFFF
+
+    @property
+    def pieces(self):
+        """Live pieces (Piece views over the piece table), in placement order."""
+        return self._pieces.live()
+
+    def piece(self, pid):
+        """Piece view with id `pid` (ids are stable, also across copy())."""
+        return self._pieces.views[pid]
+
+    def player_pieces(self, player):
+        """Live pieces of `player` (cached list: do not mutate it)."""
+        return self._pieces.live_of(player)
+
+    def copy(self):
+        """
+        Cheap copy for copy-make search: own piece table, visited edges and
+        move cache, shared (read-only) board and hash tables. The history
+        starts empty, so the copy cannot be undone past this point.
+        Pieces keep their ids: copy._pieces.views[piece.id] is `piece` in the copy.
+        """
+        new = type(self).__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        new._pieces = self._pieces.copy()
+        new.visited_edges = set(self.visited_edges)
+        new._move_cache = dict(self._move_cache)
+        new.history = []
+        return new
+
+    # ----- pickling / IPC -----
+
+    # History entries kept when a GameState is pickled (see to_wire)
+    PICKLE_HISTORY = 0
+
+    def to_wire(self, history: int = 0, include_board: bool = True) -> tuple:
+        """
+        Compact, picklable form of the position: piece arrays, visited edges
+        as a bitmask, move counter and the last `history` undo entries (-1:
+        all of them), pieces referenced by id. With include_board=False only
+        the board key is sent; the receiving process must already know the
+        board (intern_board, or an earlier state with the board) or be given
+        it in from_wire. A few hundred bytes for a 9x9 game.
+        """
+        table = self._pieces
+        edges, ids = edge_ids(self.board.size)
+        mask = 0
+        for edge in self.visited_edges:
+            mask |= 1 << ids[edge]
+        board = self.board if include_board else board_signature(intern_board(self.board))
+        entries = self.history if history < 0 else self.history[len(self.history) - history:] if history else []
+        return (board, self.move_counter,
+                table.x.tobytes(), table.y.tobytes(), table.player.tobytes(),
+                table.kind.tobytes(), table.arrival.tobytes(), table.alive.tobytes(),
+                mask.to_bytes((len(edges) + 7) // 8, "little"),
+                tuple(_encode_entry(entry) for entry in entries))
+
+    @classmethod
+    def from_wire(cls, data, board=None):
+        """Rebuild a GameState from to_wire() output (board: overrides / supplies the board)."""
+        state = cls.__new__(cls)
+        state._load_wire(data, board)
+        return state
+
+    def _load_wire(self, data, board=None):
+        wire_board, move_counter, xs, ys, players, kinds, arrivals, alive, mask, entries = data
+        if board is None:
+            board = wire_board
+            if isinstance(board, int):
+                board = _BOARDS.get(board)
+                if board is None:
+                    raise KeyError(f"board {wire_board:#x} is not known in this process; "
+                                   "send it once or pass board=")
+        self.board = board
+        table = PieceTable()
+        table.x.frombytes(xs)
+        table.y.frombytes(ys)
+        table.player.frombytes(players)
+        table.kind.frombytes(kinds)
+        table.arrival.frombytes(arrivals)
+        table.alive.frombytes(alive)
+        for pid in range(len(table.x)):
+            view = Piece.__new__(Piece)
+            view._table, view.id = table, pid
+            table.views.append(view)
+        self._pieces = table
+        edges, _ = edge_ids(board.size)
+        mask = int.from_bytes(mask, "little")
+        self.visited_edges = {edges[i] for i in range(len(edges)) if mask >> i & 1}
+        self.move_counter = move_counter
+        self.history = [_decode_entry(entry, table.views) for entry in entries]
+        self._init_hash()
+        self._init_move_cache()
+
+    def __getstate__(self):
+        return self.to_wire(self.PICKLE_HISTORY)
+
+    def __setstate__(self, state):
+        self._load_wire(state)
+
+    def __deepcopy__(self, memo):
+        # Unlike pickling, a deep copy keeps the whole history
+        return GameState.from_wire(self.to_wire(history=-1), self.board)
+
+    def _add_piece(self, piece):
+        """Move a free-standing Piece into this game's piece table."""
+        table = piece._table
+        pid = piece.id
+        self._pieces.add(KINDS[table.kind[pid]], table.x[pid], table.y[pid], table.player[pid],
+                         table.arrival[pid], view=piece)
+        self._hash_piece(piece)
+
+    def _init_move_cache(self):
+        """
+        Legal move targets are cached per (vertex, kind) and dropped when an
+        edge at that vertex is visited or un-visited (add_visited_edge /
+        undo_last_move). Shots use the static shot table of the board.
+        """
+        self._move_cache = {}
+        self._shot_table = None
+        for kind in MOVE_DIRECTIONS:
+            neighbour_table(self.board.size, kind)
+
+    def _invalidate_edge(self, edge):
+        cache = self._move_cache
+        if cache:
+            key1, key2 = _EDGE_CACHE_KEYS[edge]
+            cache.pop(key1, None)
+            cache.pop(key2, None)
+
+    def legal_moves(self, piece):
+        """Vertices `piece` can step to (unvisited adjacent edges of its kind)."""
+        table = piece._table
+        pid = piece.id
+        key = ((table.x[pid], table.y[pid]), KINDS[table.kind[pid]])
+        targets = self._move_cache.get(key)
+        if targets is None:
+            visited = self.visited_edges
+            targets = tuple(v for v, edge in neighbour_table(self.board.size, piece.kind)[key[0]]
+                            if edge not in visited)
+            self._move_cache[key] = targets
+        return targets
+
+    def legal_shots(self, piece):
+        """Vertices of the enemy pieces `piece` can shoot (one entry per enemy)."""
+        if self._shot_table is None:
+            self._shot_table = shot_table(self.board, self._board_key)
+        table = piece._table
+        pid = piece.id
+        xs, ys, players = table.x, table.y, table.player
+        in_range = self._shot_table[(KINDS[table.kind[pid]], xs[pid], ys[pid])]
+        player = players[pid]
+        return [(xs[i], ys[i]) for i in table.live_ids()
+                if players[i] != player and (xs[i], ys[i]) in in_range]
+
+    def position_hash(self, player=None):
+        """
+        64-bit hash of the current position: board layout, visited edges and
+        piece placement. Arrival counters are not included, only the order in
+        which the pieces of a friendly stack of mixed kinds arrived (the
+        collapse rule kills the last one, see _stack_order_hash).
+        If player is given, the side to move is mixed in as well.
+        """
+        key = self._board_key ^ self._edge_hash ^ self._piece_hash ^ self._stack_order_hash()
+        if player == 2:
+            key ^= SIDE_TO_MOVE_KEY
+        return key
+
+    def _stack_order_hash(self):
+        """
+        Key of the arrival order of stacked friendly pieces. Two positions with
+        the same placement differ when a vertex holds an orthogonal and a
+        diagonal piece of one side that arrived in another order: a collapse
+        there kills another kind. Stacks of one kind (and single pieces) add
+        nothing, so the common case is a single pass over the live pieces.
+        """
+        table = self._pieces
+        xs, ys, players, kinds = table.x, table.y, table.player, table.kind
+        first = {}
+        stacked = None
+        for i in table.live_ids():
+            cell = (xs[i], ys[i], players[i])
+            j = first.setdefault(cell, i)
+            if j != i and kinds[j] != kinds[i]:
+                if stacked is None:
+                    stacked = set()
+                stacked.add(cell)
+        if stacked is None:
+            return 0
+        arrival = table.arrival
+        key = 0
+        for cell in stacked:
+            ids = sorted((i for i in table.live_ids() if (xs[i], ys[i], players[i]) == cell),
+                         key=arrival.__getitem__)
+            for rank, i in enumerate(ids):
+                piece_key = self._piece_keys[(KINDS[kinds[i]], players[i], xs[i], ys[i])]
+                key ^= (piece_key * (2 * rank + 3)) & 0xFFFFFFFFFFFFFFFF
+        return key
         
     def undo_last_move(self):
         """
         Undo the last move (supports undo for Piece.move and Piece.shoot).
-        Restores piece position, arrival order, visited edge(s), and captured pieces.
+        Restores piece position, arrival order, move counter, visited edge(s), and captured pieces.
         """
         if not self.history:
             print("Nothing to undo.")
@@ -129,36 +798,44 @@ class GameState:
         removed_snapshot = last["removed"]
 
         # Restore moving piece
-        piece.x = old_x
-        piece.y = old_y
-        piece.arrival_order = old_arrival
-        if piece not in self.pieces:
-            self.pieces.append(piece)
+        table = self._pieces
+        pid = piece.id
+        if table.alive[pid]:
+            self._unhash_piece(piece)
+        else:
+            table.revive(pid)
+        table.x[pid] = old_x
+        table.y[pid] = old_y
+        table.arrival[pid] = old_arrival
+        self._hash_piece(piece)
 
         # Remove visited edges (move has single "edge", shoot has "edges")
         if "edge" in last:
             if last["edge"] in self.visited_edges:
                 self.visited_edges.remove(last["edge"])
+                self._edge_hash ^= self._edge_keys[last["edge"]]
+                self._invalidate_edge(last["edge"])
         if "edges" in last:
             for e in last["edges"]:
                 if e in self.visited_edges:
                     self.visited_edges.remove(e)
+                    self._edge_hash ^= self._edge_keys[e]
+                    self._invalidate_edge(e)
 
         # Restore captured pieces
         for p, x, y, arrival in removed_snapshot:
             if p is piece:
                 continue
-            p.x = x
-            p.y = y
-            p.arrival_order = arrival
-            if p not in self.pieces:
-                self.pieces.append(p)
-
-        # Roll back move counter safely
-        self.move_counter = max(
-            [p.arrival_order for p in self.pieces],
-            default=0
-        )
+            pid = p.id
+            table.x[pid] = x
+            table.y[pid] = y
+            table.arrival[pid] = arrival
+            if not table.alive[pid]:
+                table.revive(pid)
+                self._hash_piece(p)
+
+        # Roll back move counter
+        self.move_counter = last["old_counter"]
 
     def initialize_lake_edges(self):
         """
@@ -191,23 +868,84 @@ class GameState:
 
     def setup_pieces(self, piece):
         # Placeholder for initializing pieces on the board
-        self.pieces.append(piece)
-        pass
+        self._add_piece(piece)
 
     def reset(self):
         self.board = Board(self.board.size)
-        self.pieces.clear()
+        self._pieces = PieceTable()
         self.visited_edges.clear()
+        self._init_hash()
+        self._init_move_cache()
         self.setup_board()
         self.setup_pieces()
 
+    # ----- trusted make (no validation) -----
+
+    def make_move(self, piece, new_x, new_y):
+        """
+        Trusted make: play a move known to be legal (from legal_moves /
+        ai_core.generate_legal_actions) without re-validating it. Undo with
+        undo_last_move. UI input goes through Piece.move, which validates.
+        """
+        start = (piece._table.x[piece.id], piece._table.y[piece.id])
+        end = (new_x, new_y)
+        edge = (start, end) if start < end else (end, start)
+        self.add_visited_edge(start, end)
+        entry = self._relocate(piece, new_x, new_y)
+        entry["edge"] = edge
+        self.history.append(entry)
+
+    def make_shot(self, piece, target_x, target_y):
+        """
+        Trusted make for a shot known to be legal (from legal_shots). Marks
+        the precomputed ray edges (ray_edges) not visited yet, then moves the
+        piece onto the target. Undo with undo_last_move.
+        """
+        table, pid = piece._table, piece.id
+        visited = self.visited_edges
+        added_edges = []
+        for edge in ray_edges(table.x[pid], table.y[pid], target_x, target_y):
+            # Only record the edges this shot visits for the first time
+            if edge not in visited:
+                self.add_visited_edge(edge[0], edge[1])
+                added_edges.append(edge)
+        entry = self._relocate(piece, target_x, target_y)
+        entry["edges"] = added_edges
+        entry["type"] = "shoot"
+        self.history.append(entry)
+
+    def _relocate(self, piece, new_x, new_y):
+        """Move piece, bump the arrival counter and resolve the vertex. Returns the undo entry."""
+        table, pid = piece._table, piece.id
+        entry = {
+            "piece": piece,
+            "old_pos": (table.x[pid], table.y[pid]),
+            "old_arrival": table.arrival[pid],
+            "old_counter": self.move_counter,
+        }
+        self._unhash_piece(piece)
+        table.x[pid] = new_x
+        table.y[pid] = new_y
+        self._hash_piece(piece)
+        self.move_counter += 1
+        table.arrival[pid] = self.move_counter
+
+        # Resolve conflict (snapshot the removed pieces before removing them)
+        removed_pieces = self.resolve_vertex_conflict((new_x, new_y), piece)
+        entry["removed"] = [(p, p.x, p.y, p.arrival_order) for p in removed_pieces]
+        self.apply_conflict_resolution(removed_pieces)
+        return entry
+
     def add_visited_edge(self, v1, v2):
         # sort the vertices so (v1,v2) == (v2,v1)
-        edge = tuple(sorted([v1, v2]))
-        self.visited_edges.add(edge)
+        edge = (v1, v2) if v1 < v2 else (v2, v1)
+        if edge not in self.visited_edges:
+            self.visited_edges.add(edge)
+            self._edge_hash ^= self._edge_keys[edge]
+            self._invalidate_edge(edge)
 
     def edge_visited(self, v1, v2):
-        edge = tuple(sorted([v1, v2]))
+        edge = (v1, v2) if v1 < v2 else (v2, v1)
         return edge in self.visited_edges
 
     def resolve_vertex_conflict(self, vertex, attacking_piece):
@@ -222,9 +960,12 @@ class GameState:
         """
         x, y = vertex
         # Find opponent pieces on the same vertex
+        table = self._pieces
+        xs, ys, players = table.x, table.y, table.player
+        player = players[attacking_piece.id]
         opponents = [
-            p for p in self.pieces
-            if p.x == x and p.y == y and p.player != attacking_piece.player
+            table.views[i] for i in table.live_ids()
+            if xs[i] == x and ys[i] == y and players[i] != player
         ]
 
         if len(opponents) == 0:
@@ -246,9 +987,11 @@ class GameState:
         """
         Actually removes the pieces from the board and prints capture messages.
         """
+        table = self._pieces
         for piece in removed_pieces:
-            if piece in self.pieces:
-                self.pieces.remove(piece)
+            if table.alive[piece.id]:
+                table.kill(piece.id)
+                self._unhash_piece(piece)
                 #print(f"Player {piece} was captured.")
 
     def place_piece_with_tail(self, position_x, position_y, tail_x, tail_y, kind, player):
@@ -289,10 +1032,9 @@ class GameState:
             return
 
         # Create the piece at the position
-        piece = Piece(kind, position_x, position_y, player)
         self.move_counter += 1
-        piece.arrival_order = self.move_counter
-        self.pieces.append(piece)
+        piece = self._pieces.views[self._pieces.add(kind, position_x, position_y, player, self.move_counter)]
+        self._hash_piece(piece)
         # Mark edge as visited
         self.add_visited_edge((tail_x, tail_y), (position_x, position_y))
 
@@ -351,8 +1093,10 @@ class GameState:
         Game is over if a player has no pieces left or no legal move/shoot.
         Winner is the other player
         """
+        table = self._pieces
+        players, views = table.player, table.views
         for player in [1, 2]:
-            player_pieces = [p for p in self.pieces if p.player == player]
+            player_pieces = [views[i] for i in table.live_ids() if players[i] == player]
             if not player_pieces:
                 # This player has no pieces, so other player wins
                 return True, 2 if player == 1 else 1
@@ -363,13 +1107,64 @@ class GameState:
         return False, None
 
 class Piece:
+    """
+    A piece, as a view on one row of a PieceTable. A Piece built directly
+    gets a private one-row table until GameState.setup_pieces adopts it.
+    """
+    __slots__ = ("_table", "id")
 
     def __init__(self, kind, x, y, player):
-        self.kind = kind
-        self.x = x
-        self.y = y
-        self.player = player # Player 1 or Player 2
-        self.arrival_order = 0  # will be updated by GameState when placed or moved
+        # arrival_order will be updated by GameState when placed or moved
+        PieceTable().add(kind, x, y, player, 0, view=self)
+
+    @property
+    def kind(self):
+        return KINDS[self._table.kind[self.id]]
+
+    @kind.setter
+    def kind(self, value):
+        self._table.kind[self.id] = _KIND_CODE[value]
+
+    @property
+    def x(self):
+        return self._table.x[self.id]
+
+    @x.setter
+    def x(self, value):
+        self._table.x[self.id] = value
+
+    @property
+    def y(self):
+        return self._table.y[self.id]
+
+    @y.setter
+    def y(self, value):
+        self._table.y[self.id] = value
+
+    @property
+    def player(self):
+        """Player 1 or Player 2"""
+        return self._table.player[self.id]
+
+    @player.setter
+    def player(self, value):
+        self._table.player[self.id] = value
+        self._table._by_player.clear()
+
+    @property
+    def arrival_order(self):
+        return self._table.arrival[self.id]
+
+    @arrival_order.setter
+    def arrival_order(self, value):
+        self._table.arrival[self.id] = value
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._table.alive[self.id])
+
+    def __repr__(self):
+        return f"Piece({self.kind!r}, {self.x}, {self.y}, {self.player})"
 
     def can_move(self, new_x, new_y, game_state):
         """
@@ -384,8 +1179,10 @@ class Piece:
         if not (0 <= new_x < game_state.board.size and 0 <= new_y < game_state.board.size):
             return False
 
-        dx = new_x - self.x
-        dy = new_y - self.y
+        table, pid = self._table, self.id
+        x, y = table.x[pid], table.y[pid]
+        dx = new_x - x
+        dy = new_y - y
 
         # Must move exactly one step
         if abs(dx) > 1 or abs(dy) > 1:
@@ -394,62 +1191,26 @@ class Piece:
             return False
 
         # Direction rules
-        if self.kind == "orthogonal":
+        if table.kind[pid] == _KIND_CODE["orthogonal"]:
             if not ((abs(dx) == 1 and dy == 0) or (dx == 0 and abs(dy) == 1)):
                 return False
-        elif self.kind == "diagonal":
+        else:
             if not (abs(dx) == 1 and abs(dy) == 1):
                 return False
-        else:
-            return False
 
         # Edge must not be visited
-        if game_state.edge_visited((self.x, self.y), (new_x, new_y)):
+        if game_state.edge_visited((x, y), (new_x, new_y)):
             return False
 
         return True
 
     def move(self, new_x, new_y, game_state):
-        start = (self.x, self.y)
-        end = (new_x, new_y)
-
         if not self.can_move(new_x, new_y, game_state):
             print("Invalid move.")
             return
 
-        # Save state for undo
-        old_x, old_y = self.x, self.y
-        old_arrival = self.arrival_order
-        added_edge = tuple(sorted([start, end]))
-
-        # Update position and edges
-        self.x, self.y = new_x, new_y
-        game_state.add_visited_edge(start, end)
-
-        # Update arrival order
-        game_state.move_counter += 1
-        self.arrival_order = game_state.move_counter
-
-        # Resolve conflict (but capture removed pieces before applying)
-        removed_pieces = game_state.resolve_vertex_conflict((new_x, new_y), self)
-
-        # Store removed pieces state for undo
-        removed_snapshot = []
-        for p in removed_pieces:
-            removed_snapshot.append((p, p.x, p.y, p.arrival_order))
-
-        # Apply removal
-        game_state.apply_conflict_resolution(removed_pieces)
-
-        # Push to history
-        game_state.history.append({
-            "piece": self,
-            "old_pos": (old_x, old_y),
-            "old_arrival": old_arrival,
-            "edge": added_edge,
-            "removed": removed_snapshot
-        })
-    
+        game_state.make_move(self, new_x, new_y)
+
     def can_shoot(self, target_x, target_y, game_state):
         """
         Returns True if a shoot from self.x, self.y to target_x,target_y
@@ -457,77 +1218,19 @@ class Piece:
         Does NOT execute the shoot.
         """
         # First, check if an enemy piece exists at (target_x, target_y)
+        table, pid = self._table, self.id
+        pieces = game_state._pieces
+        xs, ys, players = pieces.x, pieces.y, pieces.player
+        player = table.player[pid]
         enemy_at_target = any(
-            p.x == target_x and p.y == target_y and p.player != self.player
-            for p in game_state.pieces
+            xs[i] == target_x and ys[i] == target_y and players[i] != player
+            for i in pieces.live_ids()
         )
         if not enemy_at_target:
             return False
 
-        dx = target_x - self.x
-        dy = target_y - self.y
-
-        if dx == 0 and dy == 0:
-            return False  # same position
-
-        # Direction rules (OPPOSITE of movement direction)
-        # Orthogonal pieces MOVE along rows/columns but SHOOT along diagonals
-        # Diagonal pieces MOVE along diagonals but SHOOT along rows/columns
-        if self.kind == "orthogonal" and abs(dx) != abs(dy):
-            return False
-        if self.kind == "diagonal" and not (dx == 0 or dy == 0):
-            return False
-
-        # Normalize direction
-        step_x = 0 if dx == 0 else dx // abs(dx)
-        step_y = 0 if dy == 0 else dy // abs(dy)
-
-        current_x, current_y = self.x, self.y
-        z_start = game_state.board.z[self.y][self.x]
-        z_end = game_state.board.z[target_y][target_x]
-
-        # Valid z_start/z_end combinations (applies even for distance-1 shots):
-        # 1->1, 1->0, -1->-1, 0->0, 0->1  are allowed.
-        # -1->0, -1->1, 0->-1, 1->-1  are always illegal.
-        valid_combo = (
-            (z_start == 1  and z_end in (1, 0)) or
-            (z_start == -1 and z_end == -1)     or
-            (z_start == 0  and z_end in (0, 1))
-        )
-        if not valid_combo:
-            return False
-
-        while (current_x, current_y) != (target_x, target_y):
-            current_x += step_x
-            current_y += step_y
-            if (current_x, current_y) == (target_x, target_y):
-                break
-            z_mid = game_state.board.z[current_y][current_x]
-
-            # z rules
-            if z_start == 1 and z_end == 1:
-                continue
-            elif z_start == -1 and z_end == -1:
-                if z_mid != -1:
-                    #print("Failed shooting attempt (-1->-1)")
-                    return False
-            elif z_start == 0 and z_end == 0:
-                if z_mid not in (0, -1):
-                    #print("Failed shooting attempt (0->0)")
-                    return False
-            elif z_start == 1 and z_end == 0:
-                if z_mid not in (0, -1):
-                    #print("Failed shooting attempt (1->0)")
-                    return False
-            elif z_start == 0 and z_end == 1:
-                if z_mid not in (0, -1):
-                    #print("Failed shooting attempt (0->1)")
-                    return False
-            else:
-                #print("Failed shooting attempt (-1 -> 0, 0->-1, 1->-1, -1->1)")
-                return False # ridondante ma ci sta sempre
-
-        return True
+        return shot_path_allowed(KINDS[table.kind[pid]], table.x[pid], table.y[pid],
+                                 target_x, target_y, game_state.board)
 
     def shoot(self, new_x, new_y, game_state):
         """
@@ -537,134 +1240,48 @@ class Piece:
             #print("Invalid shoot action.")
             return
 
-        start = (self.x, self.y)
-        end = (new_x, new_y)
-
-        # Save state for undo
-        old_x, old_y = self.x, self.y
-        old_arrival = self.arrival_order
-        added_edges = []
-
-        dx = new_x - self.x
-        dy = new_y - self.y
-
-        # Normalize direction
-        step_x = 0 if dx == 0 else dx // abs(dx)
-        step_y = 0 if dy == 0 else dy // abs(dy)
-
-        current_x, current_y = self.x, self.y
-        path_vertices = []
-
-        # Traverse path (excluding start, including end)
-        while (current_x, current_y) != (new_x, new_y):
-            next_x = current_x + step_x
-            next_y = current_y + step_y
-            path_vertices.append((next_x, next_y))
-            current_x, current_y = next_x, next_y
-
-        # Mark edges as visited and store ONLY newly added ones for undo
-        current_x, current_y = start
-        for vx, vy in path_vertices:
-            edge = tuple(sorted([(current_x, current_y), (vx, vy)]))
-
-            # Only record the edge if it was not already visited
-            if edge not in game_state.visited_edges:
-                game_state.add_visited_edge((current_x, current_y), (vx, vy))
-                added_edges.append(edge)
-
-            current_x, current_y = vx, vy
-
-        # Move piece
-        self.x = new_x
-        self.y = new_y
-
-        game_state.move_counter += 1
-        self.arrival_order = game_state.move_counter
-
-        # Resolve conflict (capture removed pieces before applying)
-        removed_pieces = game_state.resolve_vertex_conflict((new_x, new_y), self)
-
-        removed_snapshot = []
-        for p in removed_pieces:
-            removed_snapshot.append((p, p.x, p.y, p.arrival_order))
-
-        game_state.apply_conflict_resolution(removed_pieces)
-
-        # Push to history
-        game_state.history.append({
-            "piece": self,
-            "old_pos": (old_x, old_y),
-            "old_arrival": old_arrival,
-            "edges": added_edges,
-            "removed": removed_snapshot,
-            "type": "shoot"
-        })
+        game_state.make_shot(self, new_x, new_y)
 
     def has_legal_move_or_shoot(self, game_state):
         """
         Returns True if this piece has at least one legal move or shoot.
         Only considers shoot targets where enemy pieces are present.
         """
-        directions_orthogonal = [(1,0), (-1,0), (0,1), (0,-1)]
-        directions_diagonal = [(1,1), (1,-1), (-1,1), (-1,-1)]
-
-        # Check possible moves (one step)
-        if self.kind.lower() == "orthogonal":
-            moves = directions_orthogonal
-        elif self.kind.lower() == "diagonal":
-            moves = directions_diagonal
-        else:
-            moves = []
-
-        for dx, dy in moves:
-            new_x = self.x + dx
-            new_y = self.y + dy
-            # Check bounds
-            if 0 <= new_x < game_state.board.size and 0 <= new_y < game_state.board.size:
-                start = (self.x, self.y)
-                end = (new_x, new_y)
-                if not game_state.edge_visited(start, end):
-                    return True
-
-        # Check possible shoots (only at enemy piece locations)
-        for other in game_state.pieces:
-            if other.player == self.player:
-                continue
-            if (other.x, other.y) == (self.x, self.y):
-                continue
-            if self.can_shoot(other.x, other.y, game_state):
-                return True
-        return False
+        return bool(game_state.legal_moves(self)) or bool(game_state.legal_shots(self))
 
 
 import random
 
-def setup_standard_game(seed=None):
+def setup_standard_game(seed=None, rng=None):
     """
     Create a 9x9 board, place a random number of towers, bunkers, and lakes in unique positions,
     with lakes never in the corners. Keeps player pieces in fixed positions.
     If seed is provided, randomness will be reproducible.
+    If rng (a random.Random) is provided, the layout is drawn from it and the
+    global random module is left untouched (seed is then ignored).
     """
-    if seed is not None:
-        random.seed(seed)
+    if rng is None:
+        if seed is not None:
+            random.seed(seed)
+        rng = random
     board = Board(9)
     size = 9
     cell_coords = [(x, y) for x in range(size-1) for y in range(size-1)]
     # Corners for lakes exclusion
     corners = {(0,0), (0,size-2), (size-2,0), (size-2,size-2)}
     # Random counts
-    n_towers = random.randint(5, 10)
-    n_bunkers = random.randint(10, 15)
-    n_lakes = random.randint(0, 1)
+    n_towers = rng.randint(5, 10)
+    n_bunkers = rng.randint(10, 15)
+    n_lakes = rng.randint(0, 1)
     # First, choose lake positions (no corners)
     possible_lake_cells = [pos for pos in cell_coords if pos not in corners]
-    lake_positions = set(random.sample(possible_lake_cells, n_lakes))
+    lake_positions = set(rng.sample(possible_lake_cells, n_lakes))
     # Now, choose tower positions, avoiding lakes
     remaining_for_towers = [pos for pos in cell_coords if pos not in lake_positions]
-    tower_positions = set(random.sample(remaining_for_towers, n_towers))
+    tower_positions = set(rng.sample(remaining_for_towers, n_towers))
     # Now, choose bunker positions, avoiding both lakes and towers
     remaining_for_bunkers = [pos for pos in cell_coords if pos not in lake_positions and pos not in tower_positions]
-    bunker_positions = set(random.sample(remaining_for_bunkers, n_bunkers))
+    bunker_positions = set(rng.sample(remaining_for_bunkers, n_bunkers))
     # Place on board
     for x, y in tower_positions:
         board.place_tower(x, y)
@@ -672,7 +1289,11 @@ def setup_standard_game(seed=None):
         board.place_bunker(x, y)
     for x, y in lake_positions:
         board.place_lake(x, y)
-    # Create GameState with the board
+    return standard_game(board)
+
+
+def standard_game(board):
+    """GameState on `board` with the standard starting pieces of setup_standard_game."""
     game_state = GameState(board)
     # Place 1 orthogonal and 1 diagonal piece for each player (fixed positions)
     # Player 1:
@@ -210,9 +210,9 @@ def notation_after_execution(action, game_state):
     # Also temporarily restore captured pieces for proper disambiguation
     restored = []
     for p, px, py, pa in entry['removed']:
-        if p is not piece and p not in game_state.pieces:
+        if p is not piece and not p.alive:
             p.x, p.y, p.arrival_order = px, py, pa
-            game_state.pieces.append(p)
+            game_state._pieces.revive(p.id)
             restored.append(p)
 
     notation = action_to_notation(action, game_state, capture_result=cap, game_over=over)
@@ -221,8 +221,7 @@ def notation_after_execution(action, game_state):
     piece.x, piece.y = cur_x, cur_y
     piece.arrival_order = cur_arrival
     for p in restored:
-        if p in game_state.pieces:
-            game_state.pieces.remove(p)
+        game_state._pieces.kill(p.id)
 
     return notation
 
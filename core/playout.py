@@ -0,0 +1,289 @@
+"""
+Random Playout Kernel for Dots & Cuts
+=====================================
+Fast random playouts for MCTS rollouts, map-balance estimates and
+branching-factor statistics.
+
+The position is copied once into flat lists (vertex index y * size + x,
+edge ids from dotscuts.edge_ids, one row per live piece), and every playout
+runs on a copy of those lists. No Action objects and no history entries are
+created, and nothing needs undoing.
+
+Per vertex and kind, the number of unvisited step edges is kept up to
+date as edges get visited, so the game-over test (GameState.is_game_over)
+is one lookup per piece unless a piece has no step left.
+
+A uniformly random legal action is drawn by rejection sampling. Each piece
+of the side to move has 4 + (number of enemies) slots: the 4 step
+directions of its kind and one shot per enemy piece. A random slot is kept
+if it is legal, meaning an unvisited edge or an enemy inside the
+precomputed shot range; otherwise another slot is drawn. Every legal action
+owns exactly one slot, so the draw is uniform over the same action list
+generate_all_actions would build (one shot per enemy, like legal_shots).
+The game-over test (dotscuts.GameState.is_game_over) has already checked
+that the side to move can act, so the loop always ends.
+
+Shots follow make_shot: the edges of the precomputed ray are marked
+visited, then the piece lands on the target. Vertex conflicts are resolved
+as in resolve_vertex_conflict.
+"""
+
+from dotscuts import MOVE_DIRECTIONS, KINDS, SHOT_TABLE_CACHE_SIZE, edge_ids, ray_edges, shot_table
+from collections import OrderedDict
+import random
+import time
+
+_STEP_TABLES = {}
+_EDGE_ENDS = {}
+_RAY_TABLES = {}
+_SHOT_SETS = OrderedDict()   # same bound as dotscuts.shot_table
+
+
+def _step_table(size):
+    """[kind code][vertex] -> 4 (target vertex, edge id) slots, None off the board."""
+    table = _STEP_TABLES.get(size)
+    if table is None:
+        ids = edge_ids(size)[1]
+        table = []
+        for kind in KINDS:
+            rows = []
+            for v in range(size * size):
+                x, y = v % size, v // size
+                slots = []
+                for dx, dy in MOVE_DIRECTIONS[kind]:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < size and 0 <= ny < size:
+                        a, b = (x, y), (nx, ny)
+                        slots.append((ny * size + nx, ids[(a, b) if a < b else (b, a)]))
+                    else:
+                        slots.append(None)
+                rows.append(tuple(slots))
+            table.append(rows)
+        _STEP_TABLES[size] = table
+    return table
+
+
+def _edge_ends(size):
+    """[edge id] -> (kind code * size^2 + v1, kind code * size^2 + v2): the two step counters it belongs to."""
+    ends = _EDGE_ENDS.get(size)
+    if ends is None:
+        ends = []
+        for (x1, y1), (x2, y2) in edge_ids(size)[0]:
+            base = KINDS.index("orthogonal" if x1 == x2 or y1 == y2 else "diagonal") * size * size
+            ends.append((base + y1 * size + x1, base + y2 * size + x2))
+        _EDGE_ENDS[size] = ends
+    return ends
+
+
+def _ray_table(size):
+    """{source * size^2 + target: edge ids of the shot ray}, filled lazily."""
+    table = _RAY_TABLES.get(size)
+    if table is None:
+        table = _RAY_TABLES[size] = {}
+    return table
+
+
+def _ray(size, rays, v, t):
+    key = v * size * size + t
+    ray = rays.get(key)
+    if ray is None:
+        ids = edge_ids(size)[1]
+        ray = rays[key] = tuple(ids[e] for e in ray_edges(v % size, v // size, t % size, t // size))
+    return ray
+
+
+def _shot_sets(board, board_key):
+    """[kind code * size^2 + vertex] -> frozenset of vertices in shot range."""
+    sets = _SHOT_SETS.get(board_key)
+    if sets is not None:
+        _SHOT_SETS.move_to_end(board_key)
+    else:
+        size = board.size
+        table = shot_table(board, board_key)
+        sets = [frozenset(ty * size + tx for tx, ty in table[(kind, v % size, v // size)])
+                for kind in KINDS for v in range(size * size)]
+        _SHOT_SETS[board_key] = sets
+        if len(_SHOT_SETS) > SHOT_TABLE_CACHE_SIZE:
+            _SHOT_SETS.popitem(last=False)
+    return sets
+
+
+class PlayoutKernel:
+    """
+    Random playouts from a snapshot of game_state (taken once; later
+    changes to game_state are not seen).
+
+    rng:           random.Random to draw from (default: a new one seeded with seed)
+    greedy_epsilon: 1.0 (default) = uniformly random actions; below 1, a
+                   shot is played whenever one exists, except with this
+                   probability (the MCTS rollout policy)
+    """
+
+    def __init__(self, game_state, seed: int = None, rng: random.Random = None, greedy_epsilon: float = 1.0):
+        board = game_state.board
+        size = board.size
+        self.size = size
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.greedy_epsilon = greedy_epsilon
+        self._steps = _step_table(size)
+        self._edge_ends = _edge_ends(size)
+        self._rays = _ray_table(size)
+        self._shots = _shot_sets(board, game_state._board_key)
+
+        edge_index = edge_ids(size)[1]
+        self._visited = bytearray(len(edge_index))
+        for edge in game_state.visited_edges:
+            self._visited[edge_index[edge]] = 1
+        # [kind code * size^2 + vertex] -> unvisited step edges
+        self._free = [sum(1 for slot in slots if slot is not None and not self._visited[slot[1]])
+                      for rows in self._steps for slots in rows]
+        table = game_state._pieces
+        live = table.live_ids()
+        self._pos = [table.y[i] * size + table.x[i] for i in live]
+        self._owner = [table.player[i] for i in live]
+        self._kind = [table.kind[i] for i in live]
+        self._arrival = [table.arrival[i] for i in live]
+        self._counter = game_state.move_counter
+
+    def playout(self, player: int, max_plies: int = None, action_counts: list = None):
+        """
+        Play one random game with `player` to move. Returns (winner or None,
+        plies); a game still running after max_plies plies is a draw.
+        action_counts: optional list, the number of legal actions of every
+        ply is appended to it (branching factor; costs a full count per ply).
+        """
+        size2 = self.size * self.size
+        steps, shots, rays, size = self._steps, self._shots, self._rays, self.size
+        visited = self._visited[:]
+        free = self._free[:]
+        edge_ends = self._edge_ends
+        pos = self._pos[:]
+        # Per piece: its kind's step slots by vertex, and its kind's offset in shots
+        step_rows = [steps[k] for k in self._kind]
+        shot_base = [k * size2 for k in self._kind]
+        arrival = self._arrival[:]
+        live = {1: [], 2: []}
+        for i, p in enumerate(self._owner):
+            live[p].append(i)
+        counter = self._counter
+        rand = self.rng.random
+        epsilon = self.greedy_epsilon
+        limit = max_plies if max_plies is not None else float("inf")
+        plies = 0
+
+        while True:
+            # Game over (same order as GameState.is_game_over)
+            for p in (1, 2):
+                enemies = live[3 - p]
+                for i in live[p]:
+                    if free[shot_base[i] + pos[i]]:
+                        break
+                    in_range = shots[shot_base[i] + pos[i]]
+                    if any(pos[j] in in_range for j in enemies):
+                        break
+                else:
+                    return 3 - p, plies
+            if plies >= limit:
+                return None, plies
+
+            mine, enemies = live[player], live[3 - player]
+            if action_counts is not None:
+                n = 0
+                for i in mine:
+                    n += free[shot_base[i] + pos[i]]
+                    in_range = shots[shot_base[i] + pos[i]]
+                    n += sum(1 for j in enemies if pos[j] in in_range)
+                action_counts.append(n)
+
+            # Choose an action: piece i goes to vertex t
+            t = -1
+            if epsilon < 1.0 and rand() >= epsilon:
+                targets = [(i, pos[j]) for i in mine for j in enemies
+                           if pos[j] in shots[shot_base[i] + pos[i]]]
+                if targets:
+                    i, t = targets[int(rand() * len(targets))]
+                    shot = True
+            if t < 0:
+                slots_per_piece = 4 + len(enemies)
+                n_slots = len(mine) * slots_per_piece
+                while True:
+                    r = int(rand() * n_slots)
+                    i = mine[r // slots_per_piece]
+                    k = r % slots_per_piece
+                    if k < 4:
+                        slot = step_rows[i][pos[i]][k]
+                        if slot is not None and not visited[slot[1]]:
+                            t, e = slot
+                            visited[e] = 1
+                            a, b = edge_ends[e]
+                            free[a] -= 1
+                            free[b] -= 1
+                            shot = False
+                            break
+                    else:
+                        target = pos[enemies[k - 4]]
+                        if target in shots[shot_base[i] + pos[i]]:
+                            t = target
+                            shot = True
+                            break
+            if shot:
+                for e in _ray(size, rays, pos[i], t):
+                    if not visited[e]:
+                        visited[e] = 1
+                        a, b = edge_ends[e]
+                        free[a] -= 1
+                        free[b] -= 1
+
+            # Land on t and resolve the vertex (resolve_vertex_conflict)
+            pos[i] = t
+            counter += 1
+            arrival[i] = counter
+            hit = [j for j in enemies if pos[j] == t]
+            if hit:
+                if len(hit) == 1:
+                    enemies.remove(hit[0])
+                else:
+                    enemies.remove(max(hit, key=arrival.__getitem__))
+                    mine.remove(i)
+            plies += 1
+            player = 3 - player
+
+    def run(self, player: int, playouts: int, max_plies: int = None) -> dict:
+        """
+        `playouts` random games from the snapshot with `player` to move.
+        Returns {"playouts", "winner_counts", "draws", "average_plies",
+        "elapsed", "playouts_per_sec"}.
+        """
+        winner_counts = {1: 0, 2: 0}
+        draws = plies = 0
+        t0 = time.perf_counter()
+        for _ in range(playouts):
+            winner, n = self.playout(player, max_plies)
+            plies += n
+            if winner is None:
+                draws += 1
+            else:
+                winner_counts[winner] += 1
+        elapsed = time.perf_counter() - t0
+        return {
+            "playouts": playouts,
+            "winner_counts": winner_counts,
+            "draws": draws,
+            "average_plies": plies / playouts if playouts else 0,
+            "elapsed": elapsed,
+            "playouts_per_sec": playouts / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def random_playouts(game_state, player: int, playouts: int, seed: int = None, max_plies: int = None) -> dict:
+    """Statistics of `playouts` uniformly random games from game_state (see PlayoutKernel.run)."""
+    return PlayoutKernel(game_state, seed=seed).run(player, playouts, max_plies)
+
+
+if __name__ == "__main__":
+    from dotscuts import setup_standard_game
+
+    for seed in range(3):
+        stats = random_playouts(setup_standard_game(rng=random.Random(seed)), 1, 2000, seed=seed)
+        print(f"map {seed}: {stats['playouts_per_sec']:,.0f} playouts/s, P1 {stats['winner_counts'][1]}, "
+              f"P2 {stats['winner_counts'][2]}, draws {stats['draws']}, {stats['average_plies']:.1f} plies")
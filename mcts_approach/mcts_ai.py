@@ -0,0 +1,292 @@
+"""
+Monte Carlo Tree Search for Dots & Cuts
+=======================================
+UCT / PUCT tree search with batched rollouts.
+
+Unlike minimax, the cost of a search is set by a time or playout budget
+instead of growing exponentially with depth, which keeps the bot usable on
+large boards and big armies (skirmish_9x9, custom 13x13 setups).
+
+  - Selection:   UCT (UCB1) or PUCT (prior-weighted, shoots get a higher prior)
+  - Expansion:   all children are created at the first visit of a node
+  - Simulation:  a batch of random / epsilon-greedy rollouts from the leaf,
+                 played by a playout.PlayoutKernel built once per leaf
+  - Backprop:    the whole batch is backed up at once
+  - Tree reuse:  the subtree of the position actually reached is kept
+                 between moves (matched by position hash)
+
+Tree nodes store compact action codes (ai_core.action_to_code), not Action
+objects, so the tree stays valid when the caller hands over a different
+GameState object for the same position.
+"""
+
+from dotscuts import GameState
+from ai_core import (Action, generate_all_actions, make_action,
+                     action_to_code, code_to_action)
+from playout import PlayoutKernel
+import math
+import random
+import time
+
+
+class MCTSNode:
+    """
+    One position in the search tree.
+    value is the sum of rollout results from the point of view of the
+    player who made the move leading here (3 - to_move): 1 win, 0.5 draw, 0 loss.
+    """
+    __slots__ = ("code", "parent", "children", "to_move", "key",
+                 "visits", "value", "prior", "terminal", "winner")
+
+    def __init__(self, code, parent, to_move, prior=1.0):
+        self.code = code
+        self.parent = parent
+        self.children = None      # None = not expanded yet
+        self.to_move = to_move
+        self.key = None           # position hash, set when first reached
+        self.visits = 0
+        self.value = 0.0
+        self.prior = prior
+        self.terminal = False
+        self.winner = None
+
+    def q(self) -> float:
+        return self.value / self.visits if self.visits else 0.5
+
+
+class MCTS:
+    """
+    Reusable MCTS searcher. One instance keeps its tree between calls.
+
+    time_limit:        seconds per search (None = no time limit)
+    playouts:          max rollouts per search (None = no playout limit)
+    policy:            "uct" or "puct"
+    exploration:       UCT / PUCT exploration constant
+    rollout_batch:     rollouts played from each new leaf
+    greedy_epsilon:    rollout policy: shoot when possible, except with this
+                       probability a uniformly random action is played
+                       (1.0 = pure random rollouts)
+    max_rollout_plies: rollouts longer than this are scored as draws
+    seed:              seed for the local RNG (None = nondeterministic)
+    """
+
+    def __init__(self, time_limit: float = 2.0, playouts: int = None,
+                 policy: str = "uct", exploration: float = 1.4,
+                 rollout_batch: int = 8, greedy_epsilon: float = 0.25,
+                 max_rollout_plies: int = 150, seed: int = None):
+        if time_limit is None and playouts is None:
+            raise ValueError("MCTS needs a time_limit or a playouts budget")
+        if policy not in ("uct", "puct"):
+            raise ValueError(f"Unknown MCTS policy: {policy}")
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.policy = policy
+        self.exploration = exploration
+        self.rollout_batch = rollout_batch
+        self.greedy_epsilon = greedy_epsilon
+        self.max_rollout_plies = max_rollout_plies
+        self.rng = random.Random(seed)
+        self.root = None
+        self.last_stats = {}
+
+    # ----- public API -----
+
+    def search(self, game_state: GameState, player: int, cancel=None) -> MCTSNode:
+        """
+        Run one budgeted search from game_state with `player` to move.
+        cancel: optional threading.Event; the search stops after the current
+        iteration once it is set (the tree built so far is kept).
+        """
+        root, reused = self._find_root(game_state, player)
+        self.root = root
+
+        t0 = time.perf_counter()
+        deadline = t0 + self.time_limit if self.time_limit is not None else None
+        budget = self.playouts
+        rollouts = 0
+        iterations = 0
+        max_depth = 0
+
+        while True:
+            if budget is not None and rollouts >= budget:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if cancel is not None and cancel.is_set():
+                break
+            n, depth = self._iterate(game_state, root)
+            rollouts += n
+            iterations += 1
+            max_depth = max(max_depth, depth)
+            if root.terminal:
+                break
+
+        elapsed = time.perf_counter() - t0
+        self.last_stats = {
+            "rollouts": rollouts,
+            "iterations": iterations,
+            "elapsed": elapsed,
+            "rollouts_per_sec": rollouts / elapsed if elapsed > 0 else 0.0,
+            "reused_visits": reused,
+            "root_visits": root.visits,
+            "max_depth": max_depth,
+        }
+        return root
+
+    def best_action(self, game_state: GameState, player: int, cancel=None) -> Action:
+        top = self.top_k_actions(game_state, player, k=1, cancel=cancel)
+        return top[0][0] if top else None
+
+    def top_k_actions(self, game_state: GameState, player: int, k: int = 3, cancel=None):
+        """
+        Search, then rank root moves by visit count.
+        Returns list of (Action, score, is_best); score = 2 * win_rate - 1.
+        """
+        root = self.search(game_state, player, cancel=cancel)
+        if not root.children:
+            return []
+        ranked = sorted(root.children, key=lambda c: (c.visits, c.q()), reverse=True)
+        results = []
+        for i, child in enumerate(ranked[:k]):
+            action = code_to_action(game_state, child.code, player)
+            if action is None:
+                continue
+            results.append((action, 2.0 * child.q() - 1.0, i == 0))
+        return results
+
+    def multipv(self, game_state: GameState, player: int, cancel=None, max_len: int = 8):
+        """
+        Search once, then return every root move with its principal variation
+        (the most visited child at each level, up to max_len plies).
+        Returns list of (Action, score, pv_codes), most visited first.
+        """
+        root = self.search(game_state, player, cancel=cancel)
+        if not root.children:
+            return []
+        ranked = sorted(root.children, key=lambda c: (c.visits, c.q()), reverse=True)
+        results = []
+        for child in ranked:
+            action = code_to_action(game_state, child.code, player)
+            if action is None:
+                continue
+            line = [child.code]
+            node = child
+            while node.children and len(line) < max_len:
+                node = max(node.children, key=lambda c: c.visits)
+                if node.visits == 0:
+                    break
+                line.append(node.code)
+            results.append((action, 2.0 * child.q() - 1.0, line))
+        return results
+
+    def reset(self):
+        """Drop the stored tree."""
+        self.root = None
+
+    # ----- tree reuse -----
+
+    def _find_root(self, game_state, player):
+        key = game_state.position_hash()
+        old = self.root
+        if old is not None:
+            # Same position, our move + their reply, or their move only
+            frontier = [old]
+            for level in range(3):
+                nxt = []
+                for node in frontier:
+                    if node.key == key and node.to_move == player:
+                        node.parent = None
+                        node.code = None
+                        return node, node.visits
+                    if node.children and level < 2:
+                        nxt.extend(node.children)
+                frontier = nxt
+        root = MCTSNode(None, None, player)
+        root.key = key
+        return root, 0
+
+    # ----- one iteration -----
+
+    def _iterate(self, gs, root):
+        node = root
+        made = 0
+        try:
+            # Selection
+            while node.children and not node.terminal:
+                child = self._select(node)
+                action = code_to_action(gs, child.code, node.to_move)
+                make_action(gs, action)
+                made += 1
+                if child.key is None:
+                    child.key = gs.position_hash()
+                node = child
+
+            # Expansion
+            if node.children is None and not node.terminal:
+                self._expand(gs, node)
+
+            # Simulation
+            batch = self.rollout_batch
+            wins = {1: 0.0, 2: 0.0}
+            if node.terminal:
+                if node.winner in wins:
+                    wins[node.winner] = float(batch)
+                else:
+                    wins[1] = wins[2] = batch / 2
+            else:
+                kernel = PlayoutKernel(gs, rng=self.rng, greedy_epsilon=self.greedy_epsilon)
+                for _ in range(batch):
+                    winner, _ = kernel.playout(node.to_move, self.max_rollout_plies)
+                    if winner in wins:
+                        wins[winner] += 1.0
+                    else:
+                        wins[1] += 0.5
+                        wins[2] += 0.5
+        finally:
+            for _ in range(made):
+                gs.undo_last_move()
+
+        # Backpropagation
+        depth = made
+        while node is not None:
+            node.visits += batch
+            node.value += wins[3 - node.to_move]
+            node = node.parent
+        return batch, depth
+
+    def _expand(self, gs, node):
+        over, winner = gs.is_game_over()
+        if over:
+            node.terminal = True
+            node.winner = winner
+            node.children = []
+            return
+        actions = generate_all_actions(gs, node.to_move)
+        if not actions:
+            node.terminal = True
+            node.winner = 3 - node.to_move
+            node.children = []
+            return
+        size = gs.board.size
+        if self.policy == "puct":
+            weights = [3.0 if a.action_type == "shoot" else 1.0 for a in actions]
+        else:
+            weights = [1.0] * len(actions)
+        total = sum(weights)
+        children = [MCTSNode(action_to_code(a, size), node, 3 - node.to_move, w / total)
+                    for a, w in zip(actions, weights)]
+        self.rng.shuffle(children)
+        node.children = children
+
+    def _select(self, node):
+        c = self.exploration
+        if self.policy == "puct":
+            sqrt_n = math.sqrt(node.visits + 1)
+            return max(node.children,
+                       key=lambda ch: ch.q() + c * ch.prior * sqrt_n / (1 + ch.visits))
+        for ch in node.children:
+            if ch.visits == 0:
+                return ch
+        log_n = math.log(node.visits)
+        return max(node.children,
+                   key=lambda ch: ch.value / ch.visits + c * math.sqrt(log_n / ch.visits))
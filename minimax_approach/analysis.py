@@ -1,11 +1,15 @@
-import csv
 from dotscuts import GameState, setup_standard_game
-from ai_core import generate_legal_actions, execute_action
-from minimax_ai import minimax_best_move
+from ai_core import generate_legal_actions, generate_all_actions, execute_action, perft
+from minimax_ai import minimax_best_move, minimax_root_scores, SearchStats
+from feature_log import FeatureLogWriter
+from game_records import GameRecord, GameRecordWriter
+from playout import PlayoutKernel
 import random
 import statistics
 import sys
 import os
+import pickle
+import time
 
 # ---- Feature Extraction ----
 def compute_features(game_state, current_player):
@@ -317,11 +321,15 @@ def simulate_greedy_vs_random_game(game_state: GameState, starting_player: int):
         current_player = 2 if current_player == 1 else 1
         turn_count += 1
 
-def simulate_minimax_vs_greedy_game(game_state: GameState, starting_player: int, depth: int, feature_log_file=None, root_player=1):
+def simulate_minimax_vs_greedy_game(game_state: GameState, starting_player: int, depth: int, feature_log_file=None, root_player=1, search_stats: SearchStats = None, tt=None, record: GameRecord = None):
     """
     Simulate a game where one player uses minimax strategy (with given depth) and the other uses greedy strategy,
     alternating turns.
     If feature_log_file is given, log features for root_player at each of their turns.
+    If search_stats is given, the statistics of every minimax search are merged into it.
+    tt: optional transposition table shared by every minimax search (e.g. a
+        shared_tt.SharedTranspositionTable shared with other worker processes).
+    record: optional GameRecord (GameRecord.start on game_state) the moves are added to.
     Returns a tuple: (winner player number or None for draw, number of moves, depth (turns), list of available moves counts per turn)
     """
     current_player = starting_player
@@ -333,7 +341,7 @@ def simulate_minimax_vs_greedy_game(game_state: GameState, starting_player: int,
     def get_action(game_state, player):
         if player == 1:
             # Use minimax_best_move with single version argument, default "v1"
-            return minimax_best_move(game_state, player, depth, version="v1")
+            return minimax_best_move(game_state, player, depth, version="v1", stats=search_stats, tt=tt)
         else:
             return greedy_move(game_state, player)
 
@@ -376,6 +384,8 @@ def simulate_minimax_vs_greedy_game(game_state: GameState, starting_player: int,
                     row["winner"] = opponent
             return opponent, move_count, turn_count, available_moves_per_turn, feature_log
 
+        if record is not None:
+            record.add(game_state, current_player, action)
         execute_action(game_state, action)
 
         move_count += 1
@@ -384,10 +394,14 @@ def simulate_minimax_vs_greedy_game(game_state: GameState, starting_player: int,
 
 
 # ---- NEW: Simulate Minimax vs Minimax Game ----
-def simulate_minimax_vs_minimax_game(game_state: GameState, starting_player: int, depth: int, version_p1="v1", version_p2="v1", feature_log_file=None, root_player=1):
+def simulate_minimax_vs_minimax_game(game_state: GameState, starting_player: int, depth: int, version_p1="v1", version_p2="v1", feature_log_file=None, root_player=1, search_stats: SearchStats = None, tt=None, record: GameRecord = None):
     """
     Simulate a game where both players use minimax strategy (with given depth and version).
     If feature_log_file is given, log features for root_player at each of their turns.
+    If search_stats is given, the statistics of every minimax search are merged into it.
+    tt: optional transposition table shared by every minimax search (e.g. a
+        shared_tt.SharedTranspositionTable shared with other worker processes).
+    record: optional GameRecord (GameRecord.start on game_state) the moves are added to.
     Returns a tuple: (winner player number or None for draw, number of moves, depth (turns), list of available moves counts per turn, feature_log)
     """
     current_player = starting_player
@@ -398,9 +412,9 @@ def simulate_minimax_vs_minimax_game(game_state: GameState, starting_player: int
 
     def get_action(game_state, player):
         if player == 1:
-            return minimax_best_move(game_state, player, depth, version=version_p1)
+            return minimax_best_move(game_state, player, depth, version=version_p1, stats=search_stats, tt=tt)
         else:
-            return minimax_best_move(game_state, player, depth, version=version_p2)
+            return minimax_best_move(game_state, player, depth, version=version_p2, stats=search_stats, tt=tt)
 
     while True:
         game_over, winner = game_state.is_game_over()
@@ -441,6 +455,8 @@ def simulate_minimax_vs_minimax_game(game_state: GameState, starting_player: int
                     row["winner"] = opponent
             return opponent, move_count, turn_count, available_moves_per_turn, feature_log
 
+        if record is not None:
+            record.add(game_state, current_player, action)
         execute_action(game_state, action)
 
         move_count += 1
@@ -448,64 +464,292 @@ def simulate_minimax_vs_minimax_game(game_state: GameState, starting_player: int
         turn_count += 1
 
 
+# ---- Checkpoints for long simulation batches ----
+class SimulationCheckpoint:
+    """
+    Periodic checkpoint of a simulation batch, pickled atomically to `path`:
+    the batch config, the finished games by id (winner, moves, turns,
+    available moves per turn and the game's SearchStats; no feature logs),
+    the global RNG state to continue from and the position of each writer
+    (FeatureLogWriter / GameRecordWriter: games and bytes written).
+    Games are recorded in index order, so the run resumes at next_index.
+    Opening an existing checkpoint with the same config resumes it and
+    rewinds the writers to their saved positions: games a crashed run wrote
+    after its last save are dropped and played again. A different config,
+    or a writer without a saved position, raises ValueError. path=None keeps
+    it in memory only. Saved every `every` recorded games and on save().
+    writers: {name: writer or None}
+    """
+
+    def __init__(self, path, config: dict, every: int = 10, writers: dict = None):
+        self.path = path
+        self.config = dict(config)
+        self.every = every
+        self.writers = {name: w for name, w in (writers or {}).items() if w is not None}
+        self.games = {}
+        self.rng_state = None
+        self.next_index = 0
+        self.resumed = False
+        self._unsaved = 0
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            if data["config"] != self.config:
+                raise ValueError(f"checkpoint {path!r} was written for {data['config']}, not {self.config}")
+            self.games = data["games"]
+            self.rng_state = data["rng_state"]
+            self.next_index = data["next_index"]
+            self.resumed = True
+            for name, writer in self.writers.items():
+                if name not in data["writers"]:
+                    raise ValueError(f"checkpoint {path!r} has no position for the {name} writer")
+                writer.rewind(data["writers"][name])
+
+    def record(self, index: int, game, stats: SearchStats, rng_state=None):
+        """Store finished game `index` (a simulate_*_game result, already written to the writers) and its search statistics."""
+        if index != self.next_index:
+            raise ValueError(f"game {index} recorded out of order (expected {self.next_index})")
+        self.games[index] = (game[0], game[1], game[2], game[3], stats)
+        self.next_index = index + 1
+        if rng_state is not None:
+            self.rng_state = rng_state
+        self._unsaved += 1
+        if self._unsaved >= self.every:
+            self.save()
+
+    def save(self):
+        self._unsaved = 0
+        if self.path is None:
+            return
+        data = {"config": self.config, "games": self.games, "rng_state": self.rng_state,
+                "next_index": self.next_index,
+                "writers": {name: writer.position() for name, writer in self.writers.items()}}
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def summarize(self, feature_logs=()) -> dict:
+        """Statistics dict (see _summarize_games) over every recorded game, in id order."""
+        search_stats = SearchStats()
+        games = []
+        for index in sorted(self.games):
+            winner, moves, depth_turns, available, stats = self.games[index]
+            search_stats.merge(stats)
+            games.append((winner, moves, depth_turns, available, []))
+        summary = _summarize_games(games, search_stats)
+        summary["feature_logs"] = list(feature_logs)
+        return summary
+
+
 # ---- NEW: Run Minimax vs Minimax Simulations ----
-def run_minimax_vs_minimax_simulations(num_simulations: int, depth: int, version_p1="v1", version_p2="v1", feature_log_file=None, root_player=1):
+def run_minimax_vs_minimax_simulations(num_simulations: int, depth: int, version_p1="v1", version_p2="v1", feature_log_file=None, root_player=1, tt=None, feature_writer: FeatureLogWriter = None,
+                                       checkpoint_file: str = None, checkpoint_every: int = 10, record_writer: GameRecordWriter = None):
     """
     Run multiple simulations where both players use minimax strategy with given depth and version,
     alternating starting player each game.
     If feature_log_file is provided, log features for root_player at each of their turns.
-    Returns aggregated statistics.
+    tt: optional transposition table kept across all games (see simulate_*_game).
+    feature_writer: optional FeatureLogWriter; each game's feature rows are
+                    written to it as soon as the game ends instead of being
+                    returned in "feature_logs".
+    checkpoint_file: optional SimulationCheckpoint path, saved every
+                    checkpoint_every games. Rerunning with the same
+                    parameters skips the finished games, restores the
+                    RNG state and rewinds feature_writer and record_writer
+                    to the checkpoint, so the run continues as if never
+                    stopped. "feature_logs" only covers the games of this call.
+    record_writer: optional GameRecordWriter; the record of each game played
+                    is appended to it, so features can be regenerated later
+                    (game_records.replay_features).
+    Returns aggregated statistics (search_stats: SearchStats.as_dict() over all searches).
     """
-    results = []
-    moves_list = []
-    depths_list = []
-    draws = 0
-    all_available_moves_counts = []
+    config = {"runner": "minimax_vs_minimax", "num_simulations": num_simulations, "depth": depth,
+              "version_p1": version_p1, "version_p2": version_p2, "root_player": root_player}
+    checkpoint = SimulationCheckpoint(checkpoint_file, config, checkpoint_every,
+                                      writers={"features": feature_writer, "records": record_writer})
+    if checkpoint.rng_state is not None:
+        random.setstate(checkpoint.rng_state)
     feature_logs = []
-    for i in range(num_simulations):
+    for i in range(checkpoint.next_index, num_simulations):
         sim_state = setup_standard_game()
         starting_player = 1 if i % 2 == 0 else 2
-        winner, moves, depth_turns, available_moves_per_turn, feature_log = simulate_minimax_vs_minimax_game(
+        search_stats = SearchStats()
+        record = GameRecord.start(sim_state, starting_player, index=i) if record_writer is not None else None
+        game = simulate_minimax_vs_minimax_game(
             sim_state,
             starting_player,
             depth,
             version_p1=version_p1,
             version_p2=version_p2,
             feature_log_file=None,
-            root_player=root_player
+            root_player=root_player,
+            search_stats=search_stats,
+            tt=tt,
+            record=record
         )
-        results.append(winner)
-        moves_list.append(moves)
-        depths_list.append(depth_turns)
-        all_available_moves_counts.extend(available_moves_per_turn)
-        if feature_log:
-            feature_logs.extend(feature_log)
-        if winner is None:
-            draws += 1
+        if record is not None:
+            record.finish(game[0])
+            record_writer.write(record)
+        if feature_writer is not None:
+            feature_writer.write_game(game[4])
+        else:
+            feature_logs.extend(game[4])
+        checkpoint.record(i, game, search_stats, rng_state=random.getstate())
+    checkpoint.save()
+    return checkpoint.summarize(feature_logs)
+
+
+# ---- Parallel, seeded Minimax vs Minimax tournament ----
+def game_seed(master_seed: int, index: int) -> int:
+    """Seed of game `index` of a tournament: depends only on the master seed and the index."""
+    return random.Random(f"{master_seed}:{index}").getrandbits(63)
+
+
+_tournament_tt = None
+
+
+def _init_tournament_worker(tt):
+    global _tournament_tt
+    _tournament_tt = tt
+    block_print()  # minimax_best_move prints a debug line per move
+
+
+def _play_tournament_chunk(indices, master_seed, depth, version_p1, version_p2, root_player, collect_features,
+                           collect_records=False):
+    """
+    Worker task: play the games `indices` of a tournament.
+    Game i uses game_seed(master_seed, i) for its layout and for the search
+    (move order, tie breaks) and starts with player 1 if i is even.
+    Returns [(i, (winner, moves, depth_turns, available_moves_per_turn, feature_log), SearchStats,
+    GameRecord or None unless collect_records), ...].
+    """
+    games = []
+    for i in indices:
+        seed = game_seed(master_seed, i)
+        sim_state = setup_standard_game(rng=random.Random(seed))
+        random.seed(seed)
+        starting_player = 1 if i % 2 == 0 else 2
+        search_stats = SearchStats()
+        record = GameRecord.start(sim_state, starting_player, index=i) if collect_records else None
+        game = simulate_minimax_vs_minimax_game(
+            sim_state, starting_player, depth, version_p1=version_p1, version_p2=version_p2,
+            root_player=root_player, search_stats=search_stats, tt=_tournament_tt, record=record
+        )
+        if record is not None:
+            record.finish(game[0])
+        if not collect_features:
+            game = game[:4] + ([],)
+        games.append((i, game, search_stats, record))
+    return games
+
+
+def run_parallel_minimax_vs_minimax_simulations(num_simulations: int, depth: int, version_p1="v1", version_p2="v1", root_player=1,
+                                                master_seed: int = 0, workers: int = None, chunk_size: int = 4,
+                                                collect_features: bool = False, progress: bool = True, tt=None,
+                                                feature_writer: FeatureLogWriter = None,
+                                                checkpoint_file: str = None, checkpoint_every: int = 10,
+                                                record_writer: GameRecordWriter = None):
+    """
+    Parallel, reproducible version of run_minimax_vs_minimax_simulations.
+    Games are dealt to a ProcessPoolExecutor in chunks of chunk_size; each
+    game is seeded from master_seed and its index (game_seed), so the
+    results do not depend on the number of workers or the order in which
+    chunks finish. Progress (games done, rate, ETA) goes to stderr.
+    collect_features: also return the feature logs of root_player's turns.
+    tt: optional shared_tt.SharedTranspositionTable shared by all workers
+        (faster, but search results then depend on timing: not reproducible).
+    feature_writer: optional FeatureLogWriter; feature rows are streamed to it
+        in game order as chunks finish (not returned in "feature_logs").
+        Without a checkpoint the run resumes after the writer's games_done
+        games, so restarting an interrupted run with the same master seed
+        and log continues it (the statistics cover the new games only).
+    checkpoint_file: optional SimulationCheckpoint path, saved every
+        checkpoint_every finished games. Games are recorded (and written)
+        in index order; rerunning with the same parameters rewinds
+        feature_writer and record_writer to the checkpoint, resumes at its
+        next game and the statistics cover the whole batch.
+        "feature_logs" only covers the games of this call.
+    record_writer: optional GameRecordWriter; the records of the games played
+        by this call are appended to it in game order.
+    Returns the same statistics dict as run_minimax_vs_minimax_simulations.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    config = {"runner": "parallel_minimax_vs_minimax", "num_simulations": num_simulations, "depth": depth,
+              "version_p1": version_p1, "version_p2": version_p2, "root_player": root_player,
+              "master_seed": master_seed}
+    checkpoint = SimulationCheckpoint(checkpoint_file, config, checkpoint_every,
+                                      writers={"features": feature_writer, "records": record_writer})
+    if feature_writer is not None:
+        collect_features = True
+        if not checkpoint.resumed:
+            checkpoint.next_index = feature_writer.games_done
+    todo = list(range(checkpoint.next_index, num_simulations))
+    chunks = [todo[start:start + chunk_size] for start in range(0, len(todo), chunk_size)]
+    pending = {}      # finished games waiting for the games before them, by index
+    feature_logs = {}
+    done = 0
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_tournament_worker, initargs=(tt,)) as pool:
+        futures = [pool.submit(_play_tournament_chunk, chunk, master_seed, depth, version_p1, version_p2,
+                               root_player, collect_features, record_writer is not None)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            for i, game, stats, record in future.result():
+                pending[i] = (game, stats, record)
+                done += 1
+            # Write and checkpoint in game order, so the writers and the checkpoint agree
+            while checkpoint.next_index in pending:
+                i = checkpoint.next_index
+                game, stats, record = pending.pop(i)
+                if record_writer is not None:
+                    record_writer.write(record)
+                if feature_writer is not None:
+                    feature_writer.write_game(game[4])
+                elif collect_features:
+                    feature_logs[i] = game[4]
+                checkpoint.record(i, game, stats)
+            if progress:
+                elapsed = time.perf_counter() - t0
+                eta = elapsed / done * (len(todo) - done)
+                print(f"[tournament] {num_simulations - len(todo) + done}/{num_simulations} games, "
+                      f"{done / elapsed:.2f} games/s, ETA {eta / 60:.1f} min", file=sys.stderr)
+    checkpoint.save()
+    return checkpoint.summarize(row for i in sorted(feature_logs) for row in feature_logs[i])
+
+
+def _summarize_games(games, search_stats: SearchStats) -> dict:
+    """Statistics dict of the run_*_simulations functions from [(winner, moves, depth_turns, available_moves_per_turn, feature_log), ...]."""
+    results = [g[0] for g in games]
+    moves_list = [g[1] for g in games]
+    depths_list = [g[2] for g in games]
+    all_available_moves_counts = [n for g in games for n in g[3]]
+    feature_logs = [row for g in games for row in g[4]]
+    draws = sum(1 for w in results if w is None)
 
     winner_counts = {1: 0, 2: 0}
     for w in results:
         if w in winner_counts:
             winner_counts[w] += 1
 
-    average_moves = statistics.mean(moves_list) if moves_list else 0
-    max_moves = max(moves_list) if moves_list else 0
-    average_depth = statistics.mean(depths_list) if depths_list else 0
-    average_available_moves_per_turn = statistics.mean(all_available_moves_counts) if all_available_moves_counts else 0
-
     return {
         "winner_counts": winner_counts,
-        "average_moves": average_moves,
-        "max_moves": max_moves,
-        "average_depth": average_depth,
+        "average_moves": statistics.mean(moves_list) if moves_list else 0,
+        "max_moves": max(moves_list) if moves_list else 0,
+        "average_depth": statistics.mean(depths_list) if depths_list else 0,
         "draws": draws,
-        "average_available_moves_per_turn": average_available_moves_per_turn,
+        "average_available_moves_per_turn": statistics.mean(all_available_moves_counts) if all_available_moves_counts else 0,
+        "search_stats": search_stats.as_dict(),
         "feature_logs": feature_logs
     }
 
+
 def run_random_simulations(game_state: GameState, starting_player: int, num_simulations: int):
     """
     Run multiple random simulations and return statistics about the results.
+    Games are played by playout.PlayoutKernel (same action distribution as
+    simulate_random_game), seeded from the global RNG.
     """
     results = []
     moves_list = []
@@ -514,7 +758,10 @@ def run_random_simulations(game_state: GameState, starting_player: int, num_simu
     all_available_moves_counts = []
     for _ in range(num_simulations):
         sim_state = setup_standard_game()
-        winner, moves, depth, available_moves_per_turn = simulate_random_game(sim_state, starting_player)
+        kernel = PlayoutKernel(sim_state, seed=random.getrandbits(64))
+        available_moves_per_turn = []
+        winner, moves = kernel.playout(starting_player, action_counts=available_moves_per_turn)
+        depth = moves  # one move per turn
         results.append(winner)
         moves_list.append(moves)
         depths_list.append(depth)
@@ -627,12 +874,13 @@ def run_greedy_vs_random_simulations(num_simulations: int):
         "average_available_moves_per_turn": average_available_moves_per_turn
     }
 
-def run_minimax_vs_greedy_simulations(num_simulations: int, depth: int, feature_log_file=None, root_player=1):
+def run_minimax_vs_greedy_simulations(num_simulations: int, depth: int, feature_log_file=None, root_player=1, tt=None):
     """
     Run multiple simulations where player 1 uses minimax strategy with given depth and version, and player 2 uses greedy,
     alternating starting player each game.
     If feature_log_file is provided, log features for root_player at each of their turns.
-    Returns aggregated statistics.
+    tt: optional transposition table kept across all games (see simulate_*_game).
+    Returns aggregated statistics (search_stats: SearchStats.as_dict() over all searches).
     """
     results = []
     moves_list = []
@@ -641,11 +889,13 @@ def run_minimax_vs_greedy_simulations(num_simulations: int, depth: int, feature_
     all_available_moves_counts = []
 
     feature_logs = []
+    search_stats = SearchStats()
     for i in range(num_simulations):
         sim_state = setup_standard_game()
         starting_player = 1 if i % 2 == 0 else 2
         winner, moves, depth_turns, available_moves_per_turn, feature_log = simulate_minimax_vs_greedy_game(
-            sim_state, starting_player, depth, feature_log_file=None, root_player=root_player
+            sim_state, starting_player, depth, feature_log_file=None, root_player=root_player,
+            search_stats=search_stats, tt=tt
         )
         results.append(winner)
         moves_list.append(moves)
@@ -673,9 +923,74 @@ def run_minimax_vs_greedy_simulations(num_simulations: int, depth: int, feature_
         "average_depth": average_depth,
         "draws": draws,
         "average_available_moves_per_turn": average_available_moves_per_turn,
+        "search_stats": search_stats.as_dict(),
         "feature_logs": feature_logs
     }
 
+# ---- Make/unmake vs copy-make benchmark ----
+# Fixed benchmark positions: (setup_standard_game seed, random plies played from it)
+BENCHMARK_POSITIONS = [(1, 0), (2, 4), (3, 8), (4, 12), (5, 16), (6, 20)]
+
+
+def benchmark_positions(positions=BENCHMARK_POSITIONS):
+    """Build the fixed benchmark positions. Returns [(game_state, player to move), ...]."""
+    states = []
+    for seed, plies in positions:
+        game_state = setup_standard_game(seed)
+        rng = random.Random(seed)
+        player = 1
+        for _ in range(plies):
+            actions = generate_all_actions(game_state, player)
+            if not actions or game_state.is_game_over()[0]:
+                break
+            execute_action(game_state, rng.choice(actions))
+            player = 3 - player
+        states.append((game_state, player))
+    return states
+
+
+def benchmark_make_modes(depth: int = 4, perft_depth: int = 4, repeats: int = 3, positions=BENCHMARK_POSITIONS):
+    """
+    Head-to-head timing of make/unmake against copy-make on the fixed
+    benchmark positions: perft (move generation + make) and a full-window
+    minimax_root_scores search, best of `repeats` runs each. Both modes are
+    run with the same random seed, so they search the same tree; the node
+    counts and scores must match. The global RNG state is restored afterwards.
+    Returns {"make_unmake": {...}, "copy_make": {...}, "identical": bool}.
+    """
+    rng_state = random.getstate()  # the searches reseed the global RNG
+    try:
+        states = benchmark_positions(positions)
+        results = {}
+        outputs = {}
+        for mode, copy_make in (("make_unmake", False), ("copy_make", True)):
+            perft_time = search_time = float("inf")
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                leaves = [perft(gs, player, perft_depth, copy_make) for gs, player in states]
+                perft_time = min(perft_time, time.perf_counter() - t0)
+
+                stats = SearchStats()
+                scores = []
+                t0 = time.perf_counter()
+                for gs, player in states:
+                    random.seed(0)
+                    scored = minimax_root_scores(gs, player, depth, stats=stats, copy_make=copy_make)
+                    scores.append([round(score, 6) for _, score in scored])
+                search_time = min(search_time, time.perf_counter() - t0)
+            outputs[mode] = (leaves, scores, stats.nodes + stats.qnodes)
+            results[mode] = {
+                "perft_leaves": sum(leaves),
+                "perft_time": perft_time,
+                "search_nodes": stats.nodes + stats.qnodes,
+                "search_time": search_time,
+                "nps": (stats.nodes + stats.qnodes) / search_time if search_time else 0.0,
+            }
+        results["identical"] = outputs["make_unmake"] == outputs["copy_make"]
+    finally:
+        random.setstate(rng_state)
+    return results
+
 # if __name__ == "__main__":
 #     # Minimax vs Greedy block (commented out)
 #     game_state = setup_standard_game()
@@ -726,40 +1041,53 @@ if __name__ == "__main__":
     minimax_version_p2 = "v1"
     WRITE_RESULTS_TO_FILE = False
     RESULTS_FILE_NAME = "results.txt"
-    feature_log_file = "feature_log_v1.3.csv" 
+    feature_log_file = "feature_log_v1.3.csv"  # .csv, or a directory name for .npz shards
     log_interval = 3  
     root_player = 1
+    master_seed = 0      # same seed -> same games, whatever the number of workers
+    workers = None       # None: one process per CPU
+    checkpoint_file = f"checkpoint_{minimax_version_p1}_vs_{minimax_version_p2}_d{minimax_depth}.pkl"
+    record_file = f"games_{minimax_version_p1}_vs_{minimax_version_p2}_d{minimax_depth}.dcgr"  # game records, None to skip
+
+    # Feature rows and finished games are saved as the run goes; rerunning
+    # with the same parameters, log and checkpoint resumes an interrupted run
+    feature_writer = FeatureLogWriter(feature_log_file, log_interval=log_interval) if feature_log_file else None
+    # New features can later be computed from the records with
+    # game_records.replay_features instead of replaying the searches
+    record_writer = GameRecordWriter(record_file) if record_file else None
 
     block_print()
-    minimax_vs_minimax_results = run_minimax_vs_minimax_simulations(
-        num_simulations,
-        minimax_depth,
-        version_p1=minimax_version_p1,
-        version_p2=minimax_version_p2,
-        feature_log_file=None,
-        root_player=root_player
-    )
+    try:
+        minimax_vs_minimax_results = run_parallel_minimax_vs_minimax_simulations(
+            num_simulations,
+            minimax_depth,
+            version_p1=minimax_version_p1,
+            version_p2=minimax_version_p2,
+            root_player=root_player,
+            master_seed=master_seed,
+            workers=workers,
+            feature_writer=feature_writer,
+            checkpoint_file=checkpoint_file,
+            record_writer=record_writer
+        )
+    finally:
+        if feature_writer is not None:
+            feature_writer.close()
+        if record_writer is not None:
+            record_writer.close()
     enable_print()
 
     # Print minimax vs minimax results
-    print(f"Minimax {minimax_version_p1} vs Minimax {minimax_version_p2} (depth={minimax_depth}) results over {num_simulations} games:", {k: v for k, v in minimax_vs_minimax_results.items() if k != "feature_logs"})
-
-    # Write features to CSV for root_player, with proper header only if file does not exist
-    feature_logs = minimax_vs_minimax_results.get("feature_logs", [])
-    if feature_logs and feature_log_file:
-        header = [
-            "material_diff", "mobility_diff", "shooting_diff", "pieces_in_danger_diff",
-            "safe_pieces_diff", "avg_distance_to_enemy_diff", "clustering_diff", "board_centrality_diff", "winner"
-        ]
-        file_exists = os.path.isfile(feature_log_file)
-        with open(feature_log_file, "a", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=header)
-            if not file_exists:
-                writer.writeheader()
-            for idx, row in enumerate(feature_logs):
-                # Write only rows at multiples of log_interval (including 0)
-                if idx % log_interval == 0:
-                    writer.writerow(row)
+    print(f"Minimax {minimax_version_p1} vs Minimax {minimax_version_p2} (depth={minimax_depth}) results over {num_simulations} games:", {k: v for k, v in minimax_vs_minimax_results.items() if k not in ("feature_logs", "search_stats")})
+    search = minimax_vs_minimax_results["search_stats"]
+    print(f"Search: {search['searches']} searches, {search['nodes']} nodes (+{search['qnodes']}q), "
+          f"{search['nps']:,.0f} nps, cutoff {search['cutoff_rate']:.0%} "
+          f"(first move {search['first_move_cutoff_rate']:.0%}), "
+          f"EBF {', '.join(f'{b:.2f}' for b in search['ebf'])}, "
+          f"eval cache {search['eval_cache_hit_rate']:.0%}, phases {search['phase_time']}")
+
+    if feature_writer is not None:
+        print(f"Feature log: {feature_writer.rows_written} rows from {feature_writer.games_done} games in {feature_log_file}")
 
     if WRITE_RESULTS_TO_FILE:
         with open(RESULTS_FILE_NAME, "a") as f:
@@ -0,0 +1,202 @@
+"""
+Streaming Feature Log Writer for Dots & Cuts
+============================================
+Writes the per-turn feature rows of simulated games (analysis.compute_features
++ winner) to disk as games finish, instead of keeping every row in memory
+until the end of the run. Memory stays bounded by one shard, whatever the
+number of games.
+
+Two output formats, chosen by the path:
+  - "<name>.csv":  rows appended to one CSV file (header written once)
+  - anything else: a directory of compressed columnar shards
+                   (shard-00000.npz, ...), one float64 array per column,
+                   written every `shard_rows` rows at a game boundary
+
+Sampling: only every `log_interval`-th row is written (counted over the
+whole run, like the old end-of-run CSV writer).
+
+Resuming: after every flush a small progress file records the games and
+rows persisted so far (and, for CSV, the file size). Reopening the same
+path continues from there; anything written after the last recorded
+flush (a crash mid-write) is dropped. writer.games_done tells the runner
+which game to start from. A simulation checkpoint stores writer.position()
+and calls writer.rewind() on resume, so the log drops the games played
+after the checkpoint (they are played again).
+"""
+
+import csv
+import glob
+import json
+import os
+import numpy as np
+
+FEATURE_COLUMNS = [
+    "material_diff", "mobility_diff", "shooting_diff", "pieces_in_danger_diff",
+    "safe_pieces_diff", "avg_distance_to_enemy_diff", "clustering_diff", "board_centrality_diff", "winner"
+]
+
+
+class FeatureLogWriter:
+    """
+    Streaming writer for feature rows.
+
+    path:         "<name>.csv" for CSV, otherwise a shard directory
+    columns:      column order (rows are dicts; missing values are written empty / NaN)
+    log_interval: keep one row every log_interval rows
+    shard_rows:   rows per .npz shard (the CSV is flushed after every game)
+    resume:       continue an existing log; if False an existing log raises FileExistsError
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path: str, columns=FEATURE_COLUMNS, log_interval: int = 1,
+                 shard_rows: int = 50_000, resume: bool = True):
+        self.path = path
+        self.columns = list(columns)
+        self.log_interval = max(1, log_interval)
+        self.shard_rows = shard_rows
+        self.csv = path.endswith(".csv")
+        self._progress_path = path + ".progress.json" if self.csv else os.path.join(path, "progress.json")
+        self._buffer = []
+
+        progress = {"games": 0, "rows_seen": 0, "rows_written": 0, "shards": 0, "bytes": 0}
+        exists = os.path.exists(path)
+        if exists and not resume:
+            raise FileExistsError(f"feature log {path!r} already exists (pass resume=True to continue it)")
+        # Without a progress file an existing log is only appended to (e.g.
+        # a CSV from an older run): nothing is truncated or deleted
+        tracked = exists and os.path.exists(self._progress_path)
+        if tracked:
+            with open(self._progress_path) as f:
+                progress.update(json.load(f))
+        self.games_done = progress["games"]
+        self.rows_seen = progress["rows_seen"]
+        self.rows_written = progress["rows_written"]
+        self._shards = progress["shards"]
+
+        if self.csv:
+            new_file = not exists or (tracked and progress["bytes"] == 0)
+            self._file = open(path, "a+", newline="")
+            if tracked:
+                # Drop rows written after the last recorded flush
+                self._file.truncate(progress["bytes"])
+            self._file.seek(0, os.SEEK_END)
+            self._writer = csv.writer(self._file)
+            if new_file:
+                self._writer.writerow(self.columns)
+                self._file.flush()
+            self._bytes = self._file.tell()
+        else:
+            os.makedirs(path, exist_ok=True)
+            if tracked:
+                # Drop shards written after the last recorded flush
+                for name in glob.glob(os.path.join(path, "shard-*.npz")):
+                    if int(os.path.basename(name)[6:11]) >= self._shards:
+                        os.remove(name)
+            else:
+                self._shards = len(glob.glob(os.path.join(path, "shard-*.npz")))
+            self._bytes = 0
+
+    def write_game(self, rows):
+        """Append the feature rows of one finished game (sampled by log_interval)."""
+        for row in rows:
+            if self.rows_seen % self.log_interval == 0:
+                self._buffer.append([row.get(c) for c in self.columns])
+            self.rows_seen += 1
+        self.games_done += 1
+        if self.csv:
+            self._writer.writerows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+            self.flush()  # one flush per game: a crash loses at most the current game
+        elif len(self._buffer) >= self.shard_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows (a new shard for the columnar format) and record progress."""
+        if self.csv:
+            self._file.flush()
+            self._bytes = self._file.tell()
+        elif self._buffer:
+            data = np.array([[np.nan if v is None else v for v in r] for r in self._buffer], dtype=np.float64)
+            name = os.path.join(self.path, f"shard-{self._shards:05d}.npz")
+            tmp = os.path.join(self.path, f"tmp-shard-{self._shards:05d}.npz")
+            np.savez_compressed(tmp, **{c: data[:, i] for i, c in enumerate(self.columns)})
+            os.replace(tmp, name)
+            self._shards += 1
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._save_progress()
+
+    def position(self) -> dict:
+        """
+        Flush and return the current position (games, rows, shards, bytes), for
+        rewind(). A shard log writes its buffered rows as a shard to get one.
+        """
+        self.flush()
+        return self._progress()
+
+    def rewind(self, position: dict):
+        """Drop every game written after `position` (a position() of this log)."""
+        if position["games"] > self.games_done:
+            raise ValueError(f"feature log {self.path!r} has {self.games_done} games, "
+                             f"cannot rewind to {position['games']}")
+        self._buffer = []
+        if self.csv:
+            self._file.truncate(position["bytes"])
+            self._file.seek(0, os.SEEK_END)
+            self._bytes = self._file.tell()
+        else:
+            for name in glob.glob(os.path.join(self.path, "shard-*.npz")):
+                if int(os.path.basename(name)[6:11]) >= position["shards"]:
+                    os.remove(name)
+            self._shards = position["shards"]
+        self.games_done = position["games"]
+        self.rows_seen = position["rows_seen"]
+        self.rows_written = position["rows_written"]
+        self._save_progress()
+
+    def _progress(self) -> dict:
+        return {"games": self.games_done, "rows_seen": self.rows_seen, "rows_written": self.rows_written,
+                "shards": self._shards, "bytes": self._bytes}
+
+    def _save_progress(self):
+        tmp = self._progress_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._progress(), f)
+        os.replace(tmp, self._progress_path)
+
+    def close(self):
+        if self._buffer is None:
+            return
+        self.flush()
+        if self.csv:
+            self._file.close()
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_feature_log(path: str, columns=None) -> dict:
+    """Read a feature log written by FeatureLogWriter: {column: float64 array}."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = [[float(v) if v != "" else np.nan for v in row] for row in reader]
+        data = np.array(rows, dtype=np.float64).reshape(-1, len(header))
+        out = {c: data[:, i] for i, c in enumerate(header)}
+    else:
+        shards = sorted(glob.glob(os.path.join(path, "shard-*.npz")))
+        parts = {}
+        for name in shards:
+            with np.load(name) as shard:
+                for c in shard.files:
+                    parts.setdefault(c, []).append(shard[c])
+        out = {c: np.concatenate(v) for c, v in parts.items()}
+    if columns is not None:
+        out = {c: out[c] for c in columns}
+    return out
@@ -0,0 +1,306 @@
+"""
+Compact Game Records for Dots & Cuts
+====================================
+Stores finished games (map + moves) in an append-only file, so features can
+be regenerated later by replaying the games instead of searching them again.
+
+Record layout (all integers are LEB128 varints unless noted):
+  - length of the record in bytes
+  - game index (e.g. the tournament index of the game)
+  - board size (1 byte), then the tower, bunker and lake cell bitmasks
+    ((size - 1)^2 bits each, little endian)
+  - flags (1 byte): starting player in bits 0-1, winner in bits 2-3
+    (0 = draw, like the feature logs)
+  - number of moves, then one varint per move: its index in
+    generate_all_actions(game_state, player) of the position it was played
+    in. Fewer than 128 legal actions (always the case in practice) means one
+    byte per move, up to 16383 two bytes.
+
+A 9x9 game is about 30 bytes + 1 byte per move. Games start from the
+standard pieces of setup_standard_game (dotscuts.standard_game) on the
+recorded map. Move indices depend on the move generation order: a change to
+generate_all_actions ordering needs a new RECORD_MAGIC.
+
+The file starts with RECORD_MAGIC. A record cut short by a crash is ignored
+by the reader and dropped when the file is reopened for writing.
+"""
+
+from dotscuts import Board, board_to_wire, intern_board, standard_game
+from ai_core import generate_all_actions, make_action
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import time
+import numpy as np
+
+RECORD_MAGIC = b"DCGR\x01"
+
+
+def _write_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos: int):
+    """(value, new position); raises IndexError past the end of data."""
+    n = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _cells(mask: int, size: int):
+    cells = size - 1
+    return [(bit % cells, bit // cells) for bit in range(cells * cells) if mask >> bit & 1]
+
+
+class GameRecord:
+    """
+    One game: map, starting player, moves (action indices, see module
+    docstring), winner and game index.
+    Build it while the game is played: GameRecord.start() on the initial
+    state, add() before every action is executed, finish() at the end.
+    """
+    __slots__ = ("board", "starting_player", "moves", "winner", "index")
+
+    def __init__(self, board: Board, starting_player: int = 1, moves=None, winner=None, index: int = 0):
+        self.board = board
+        self.starting_player = starting_player
+        self.moves = moves if moves is not None else []
+        self.winner = winner
+        self.index = index
+
+    @classmethod
+    def start(cls, game_state, starting_player: int, index: int = 0):
+        """Empty record of a game about to start from game_state (the standard pieces)."""
+        if game_state.position_hash() != standard_game(game_state.board).position_hash():
+            raise ValueError("game records only store games starting from the standard pieces")
+        return cls(game_state.board, starting_player, index=index)
+
+    def add(self, game_state, player: int, action):
+        """Record `action` of `player`, about to be played on game_state."""
+        piece_id = action.piece.id
+        for i, a in enumerate(generate_all_actions(game_state, player)):
+            if (a.piece.id == piece_id and a.action_type == action.action_type
+                    and a.target_x == action.target_x and a.target_y == action.target_y):
+                self.moves.append(i)
+                return
+        raise ValueError(f"{action.action_type} to ({action.target_x}, {action.target_y}) is not a legal action")
+
+    def finish(self, winner):
+        """Set the winner (None or 0 for a draw)."""
+        self.winner = winner or 0
+
+    def initial_state(self):
+        return standard_game(self.board)
+
+    def replay(self):
+        """
+        Yield (game_state, player, action) before each recorded move, then
+        play the move; game_state is one state updated in place.
+        """
+        game_state = self.initial_state()
+        player = self.starting_player
+        for move in self.moves:
+            actions = generate_all_actions(game_state, player)
+            if move >= len(actions):
+                raise ValueError(f"corrupt game record {self.index}: move {move} of {len(actions)} actions")
+            action = actions[move]
+            yield game_state, player, action
+            make_action(game_state, action)
+            player = 3 - player
+
+    # ----- encoding -----
+
+    def to_bytes(self) -> bytes:
+        """The record framed by its length (what GameRecordWriter appends)."""
+        _, size, towers, bunkers, lakes, _ = board_to_wire(self.board)
+        mask_bytes = ((size - 1) ** 2 + 7) // 8
+        body = bytearray()
+        _write_varint(body, self.index)
+        body.append(size)
+        for mask in (towers, bunkers, lakes):
+            body += mask.to_bytes(mask_bytes, "little")
+        body.append(self.starting_player | (self.winner or 0) << 2)
+        _write_varint(body, len(self.moves))
+        for move in self.moves:
+            _write_varint(body, move)
+        out = bytearray()
+        _write_varint(out, len(body))
+        return bytes(out + body)
+
+    @classmethod
+    def from_bytes(cls, body):
+        """Decode a record body (without its length prefix)."""
+        index, pos = _read_varint(body, 0)
+        size = body[pos]
+        pos += 1
+        mask_bytes = ((size - 1) ** 2 + 7) // 8
+        masks = []
+        for _ in range(3):
+            masks.append(int.from_bytes(body[pos:pos + mask_bytes], "little"))
+            pos += mask_bytes
+        board = Board(size)
+        for place, mask in zip((board.place_tower, board.place_bunker, board.place_lake), masks):
+            for x, y in _cells(mask, size):
+                place(x, y)
+        flags = body[pos]
+        n, pos = _read_varint(body, pos + 1)
+        moves = []
+        for _ in range(n):
+            move, pos = _read_varint(body, pos)
+            moves.append(move)
+        return cls(intern_board(board), flags & 3, moves, flags >> 2 & 3, index)
+
+
+def _record_bodies(data: bytes):
+    """Yield (body, end offset) of every complete record in a file's contents."""
+    if data[:len(RECORD_MAGIC)] != RECORD_MAGIC:
+        raise ValueError("not a game record file")
+    pos = len(RECORD_MAGIC)
+    while pos < len(data):
+        try:
+            length, start = _read_varint(data, pos)
+        except IndexError:
+            return
+        if start + length > len(data):
+            return
+        yield data[start:start + length], start + length
+        pos = start + length
+
+
+class GameRecordWriter:
+    """
+    Append-only writer of GameRecords. Reopening an existing file appends
+    to it (games_done counts the records already there); a record cut short
+    by a crash is dropped first. Flushed after every game.
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.games_done = 0
+        end = len(RECORD_MAGIC)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            for _, end in _record_bodies(data):
+                self.games_done += 1
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(RECORD_MAGIC)
+            self._file.flush()
+
+    def write(self, record: GameRecord):
+        self._file.write(record.to_bytes())
+        self._file.flush()
+        self.games_done += 1
+
+    def position(self) -> dict:
+        """Current position (games, bytes), for rewind()."""
+        return {"games": self.games_done, "bytes": self._file.tell()}
+
+    def rewind(self, position: dict):
+        """Drop every record written after `position` (a position() of this file)."""
+        if position["games"] > self.games_done:
+            raise ValueError(f"record file {self.path!r} has {self.games_done} games, "
+                             f"cannot rewind to {position['games']}")
+        self._file.truncate(position["bytes"])
+        self._file.seek(position["bytes"])
+        self.games_done = position["games"]
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_game_records(path: str):
+    """Yield the GameRecords of a file in the order they were written."""
+    with open(path, "rb") as f:
+        data = f.read()
+    for body, _ in _record_bodies(data):
+        yield GameRecord.from_bytes(body)
+
+
+# ---------------------------------------------------------------------------
+# Offline feature regeneration
+# ---------------------------------------------------------------------------
+def _extractor(name: str):
+    if name == "compute_features":
+        from analysis import compute_features
+        return compute_features
+    if name in ("state_to_vector", "state_to_vector_v2"):
+        import ai_core
+        return getattr(ai_core, name)
+    raise ValueError(f"Unknown feature extractor: {name}")
+
+
+def _replay_chunk(bodies, extractor: str, root_player: int):
+    """Worker task: the feature rows of each game, as (features, winner) lists."""
+    extract = _extractor(extractor)
+    games = []
+    for body in bodies:
+        record = GameRecord.from_bytes(body)
+        rows = [(extract(game_state, player), record.winner)
+                for game_state, player, _ in record.replay() if player == root_player]
+        games.append(rows)
+    return games
+
+
+def replay_features(path: str, extractor: str = "compute_features", root_player: int = 1,
+                    workers: int = None, chunk_size: int = 32, feature_writer=None, progress: bool = True):
+    """
+    Regenerate the features of every recorded game by replaying it (no
+    search): one row per turn of root_player, before its move, labelled
+    with the game's winner (0 = draw), as in the simulation feature logs.
+    Games are replayed in a process pool, chunk_size games per task, and
+    returned in record order.
+
+    extractor: "compute_features" -> list of row dicts with a "winner" key
+               (streamed to feature_writer instead, if given: a
+               FeatureLogWriter, one write_game per game);
+               "state_to_vector_v2" / "state_to_vector" -> (X, winners):
+               float array (rows x dims) and int array.
+    Progress (games replayed, rate) goes to stderr.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    bodies = [body for body, _ in _record_bodies(data)]
+    chunks = [bodies[start:start + chunk_size] for start in range(0, len(bodies), chunk_size)]
+    rows = []
+    done = 0
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map returns the chunks in order
+        for games in pool.map(_replay_chunk, chunks, [extractor] * len(chunks), [root_player] * len(chunks)):
+            for game_rows in games:
+                if extractor == "compute_features":
+                    game_rows = [dict(features, winner=winner) for features, winner in game_rows]
+                    if feature_writer is not None:
+                        feature_writer.write_game(game_rows)
+                        continue
+                rows.extend(game_rows)
+            done += len(games)
+            if progress:
+                elapsed = time.perf_counter() - t0
+                print(f"[replay] {done}/{len(bodies)} games, {done / elapsed:.1f} games/s", file=sys.stderr)
+    if extractor == "compute_features":
+        return rows
+    X = np.array([features for features, _ in rows], dtype=np.float64)
+    winners = np.array([winner for _, winner in rows], dtype=np.int64)
+    return X, winners
@@ -1,8 +1,22 @@
 from dotscuts import GameState
-from ai_core import Action, generate_legal_actions, generate_all_actions, execute_action
+from ai_core import Action, generate_legal_actions, generate_all_actions, execute_action, play_action, action_to_code, code_to_action
+import hashlib
+import json
+import os
 import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import numpy as np
 
+# Sibling modules are imported by bare name, also when this module is
+# loaded as minimax_approach.<name> (pygame_ui)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from regions import endgame_outcome
+
 # Terminal scores: large finite values instead of inf so we can encode
 # distance-to-mate. Higher depth remaining = found sooner = prefer it.
 # Win: prefer faster (WIN_SCORE + depth). Loss: prefer slower (-WIN_SCORE - depth).
@@ -19,7 +33,7 @@ def evaluate_position_v1(game_state: GameState, current_player: int,
 
     # Helper functions
     def get_pieces(state, player):
-        return [p for p in state.pieces if p.player == player]
+        return state.player_pieces(player)
 
     def get_all_actions(state, player):
         actions = []
@@ -235,13 +249,338 @@ MINIMAX_VERSIONS = {
     },
 }
 
-def quiescence(game_state: GameState, alpha: float, beta: float, maximizing_player: bool, root_player: int, evaluate_position, depth: int = 0) -> float:
+# Versions fitted by texel_tuner (`python texel_tuner.py` fits and saves one),
+# loaded at import (see load_tuned_versions)
+TUNED_VERSIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tuned_versions.json")
+
+
+def add_linear_version(name: str, weights, means, stds, intercept):
+    """Add (or replace) MINIMAX_VERSIONS[name]: evaluate_position_v1 with these parameters."""
+    if name in ("v1", "v2"):
+        raise ValueError(f"{name} is a built-in version")
+    MINIMAX_VERSIONS[name] = {
+        "evaluate_position": lambda state, player: evaluate_position_v1(
+            state, player,
+            weights=MINIMAX_VERSIONS[name]["weights"],
+            means=MINIMAX_VERSIONS[name]["means"],
+            stds=MINIMAX_VERSIONS[name]["stds"],
+            intercept=MINIMAX_VERSIONS[name]["intercept"]
+        ),
+        "weights": np.asarray(weights, dtype=np.float64),
+        "means": np.asarray(means, dtype=np.float64),
+        "stds": np.asarray(stds, dtype=np.float64),
+        "intercept": float(intercept),
+    }
+
+
+def save_version_params(name: str, params: dict, path: str = TUNED_VERSIONS_FILE):
+    """Store the weights / means / stds / intercept of version `name` in the JSON file `path`."""
+    versions = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            versions = json.load(f)
+    versions[name] = {k: np.asarray(v).tolist() if k != "intercept" else float(v) for k, v in params.items()}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(versions, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_tuned_versions(path: str = TUNED_VERSIONS_FILE):
+    """Add the versions stored in `path` (if it exists) to MINIMAX_VERSIONS."""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        versions = json.load(f)
+    for name, params in versions.items():
+        add_linear_version(name, **params)
+
+
+load_tuned_versions()
+
+# ---------------------------------------------------------------------------
+# Evaluation cache
+# ---------------------------------------------------------------------------
+def _hash_code(digest, code):
+    """
+    Feed a code object (bytecode and constants, nested code included) to digest.
+    Frozenset constants (`x in {...}`) are fed sorted: their repr follows the
+    process-randomised string hash.
+    """
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _hash_code(digest, const)
+        elif isinstance(const, frozenset):
+            digest.update(repr(sorted(map(repr, const))).encode())
+        else:
+            digest.update(repr(const).encode())
+
+
+def evaluator_fingerprint(version: str) -> int:
+    """
+    Fingerprint of everything the static evaluation of `version` depends on:
+    the code of its evaluate function and of evaluate_position_v1, and its
+    weights/means/stds/intercept. Any change to MINIMAX_VERSIONS[version]
+    produces a new fingerprint, so cache entries computed with the old
+    evaluator are never returned again. Content only (no id(), no hash()):
+    the same evaluator has the same fingerprint in every process.
+    """
+    cfg = MINIMAX_VERSIONS[version]
+    digest = hashlib.blake2b(version.encode(), digest_size=8)
+    for fn in (cfg["evaluate_position"], evaluate_position_v1):
+        _hash_code(digest, fn.__code__)
+    for key in ("weights", "means", "stds", "intercept"):
+        value = cfg.get(key)
+        digest.update(b"-" if value is None else np.asarray(value, dtype=np.float64).tobytes())
+    return int.from_bytes(digest.digest(), "little")
+
+
+class EvalCache:
+    """
+    Bounded LRU cache of static evaluations.
+    Keys are (evaluator fingerprint, position hash, player), so the same
+    cache can safely be shared by bots of different versions and survives
+    weight changes (stale entries simply stop matching and age out).
+    Thread-safe: the UI analysis thread and the bot may share one cache.
+    """
+
+    def __init__(self, maxsize: int = 200_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def evaluator(self, version: str, stats: "SearchStats" = None):
+        """
+        Return evaluate_position(state, player) for `version`, backed by this cache.
+        stats: optional SearchStats whose eval-cache hit/miss counters are updated
+        (the cache's own counters are shared by every user of the cache).
+        """
+        evaluate_position = MINIMAX_VERSIONS[version]["evaluate_position"]
+        fingerprint = evaluator_fingerprint(version)
+
+        def cached_evaluate(game_state, player):
+            key = (fingerprint, game_state.position_hash(), player)
+            score = self.get(key)
+            if score is None:
+                score = evaluate_position(game_state, player)
+                self.put(key, score)
+                if stats is not None:
+                    stats.eval_cache_misses += 1
+            elif stats is not None:
+                stats.eval_cache_hits += 1
+            return score
+
+        return cached_evaluate
+
+
+_SHARED_EVAL_CACHES = {}
+
+
+def get_shared_eval_cache(name: str = "default", maxsize: int = 200_000) -> EvalCache:
+    """
+    Process-wide EvalCache registry. Bots asking for the same name share
+    one cache (maxsize is only used when the cache is first created).
+    """
+    cache = _SHARED_EVAL_CACHES.get(name)
+    if cache is None:
+        cache = _SHARED_EVAL_CACHES.setdefault(name, EvalCache(maxsize))
+    return cache
+
+
+def _resolve_evaluator(version: str, eval_cache=None, stats=None):
+    if eval_cache is None:
+        return MINIMAX_VERSIONS[version]["evaluate_position"]
+    return eval_cache.evaluator(version, stats)
+
+
+# ---------------------------------------------------------------------------
+# Cancellation
+# ---------------------------------------------------------------------------
+# Nodes between two checks of the cancel token / deadline. Small enough that
+# an abandoned search stops within a few milliseconds.
+POLL_INTERVAL = 64
+
+
+class SearchAborted(Exception):
+    """
+    Raised inside minimax / quiescence when the search's cancel token is set
+    or its deadline has passed. Every make is paired with an unmake in a
+    finally block, so the GameState is back at the root when it propagates.
+    """
+
+
+# ---------------------------------------------------------------------------
+# Search statistics
+# ---------------------------------------------------------------------------
+@dataclass
+class SearchStats:
+    """
+    Counters and timings for one search, or for many after merge().
+
+    nodes:        minimax nodes (root included); qnodes: quiescence nodes
+    interior:     nodes whose children were searched (cutoff rate denominator)
+    cutoffs:      beta cutoffs; first_move_cutoffs: cutoffs on the first move tried
+    endgame_hits: nodes scored exactly by the independent-region solver
+    nodes_by_ply: minimax nodes per ply from the root (effective branching factor)
+    phase_time:   seconds spent in move generation and static evaluation;
+                  the rest of `elapsed` is search overhead (make/unmake, TT, ...)
+    """
+    searches: int = 0
+    depth: int = 0
+    nodes: int = 0
+    qnodes: int = 0
+    interior: int = 0
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    tt_cutoffs: int = 0
+    evals: int = 0
+    eval_cache_hits: int = 0
+    eval_cache_misses: int = 0
+    endgame_hits: int = 0
+    nodes_by_ply: dict = field(default_factory=dict)
+    phase_time: dict = field(default_factory=lambda: {"movegen": 0.0, "eval": 0.0})
+    elapsed: float = 0.0
+
+    @property
+    def nps(self) -> float:
+        return (self.nodes + self.qnodes) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def cutoff_rate(self) -> float:
+        return self.cutoffs / self.interior if self.interior else 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def eval_cache_hit_rate(self) -> float:
+        total = self.eval_cache_hits + self.eval_cache_misses
+        return self.eval_cache_hits / total if total else 0.0
+
+    def ebf(self) -> list:
+        """Effective branching factor per ply: nodes(ply + 1) / nodes(ply)."""
+        plies = sorted(self.nodes_by_ply)
+        return [self.nodes_by_ply[p + 1] / self.nodes_by_ply[p]
+                for p in plies if p + 1 in self.nodes_by_ply and self.nodes_by_ply[p]]
+
+    def count_node(self, ply: int):
+        self.nodes += 1
+        self.nodes_by_ply[ply] = self.nodes_by_ply.get(ply, 0) + 1
+
+    def merge(self, other: "SearchStats"):
+        """Add the counters of `other` into this object (for aggregating many searches)."""
+        for name in ("searches", "nodes", "qnodes", "interior", "cutoffs",
+                     "first_move_cutoffs", "tt_probes", "tt_hits", "tt_cutoffs",
+                     "evals", "eval_cache_hits", "eval_cache_misses", "endgame_hits",
+                     "elapsed"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.depth = max(self.depth, other.depth)
+        for ply, n in other.nodes_by_ply.items():
+            self.nodes_by_ply[ply] = self.nodes_by_ply.get(ply, 0) + n
+        for phase, t in other.phase_time.items():
+            self.phase_time[phase] = self.phase_time.get(phase, 0.0) + t
+        return self
+
+    def as_dict(self) -> dict:
+        phases = dict(self.phase_time)
+        phases["search"] = max(0.0, self.elapsed - sum(self.phase_time.values()))
+        return {
+            "searches": self.searches,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "qnodes": self.qnodes,
+            "nps": self.nps,
+            "cutoff_rate": self.cutoff_rate,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "ebf": self.ebf(),
+            "tt_hit_rate": self.tt_hit_rate,
+            "tt_cutoffs": self.tt_cutoffs,
+            "eval_cache_hit_rate": self.eval_cache_hit_rate,
+            "evals": self.evals,
+            "endgame_hits": self.endgame_hits,
+            "elapsed": self.elapsed,
+            "phase_time": phases,
+        }
+
+    def summary(self) -> str:
+        """One-line human readable summary."""
+        ebf = self.ebf()
+        ebf_txt = "/".join(f"{b:.1f}" for b in ebf) if ebf else "-"
+        return (f"nodes {self.nodes} (+{self.qnodes}q), {self.nps:,.0f} nps, "
+                f"cut {self.cutoff_rate:.0%} (1st {self.first_move_cutoff_rate:.0%}), "
+                f"ebf {ebf_txt}, tt {self.tt_hit_rate:.0%}, "
+                f"eval cache {self.eval_cache_hit_rate:.0%}, endgame {self.endgame_hits}, "
+                f"{self.elapsed:.2f}s")
+
+
+def quiescence(game_state: GameState, alpha: float, beta: float, maximizing_player: bool, root_player: int, evaluate_position, depth: int = 0, stats: SearchStats = None, poll=None, copy_make: bool = False) -> float:
     """
     Quiescence search: resolve current player's shoot actions before static eval.
     If current player has no shoots, position is quiet → return eval.
     Opponent's shoots are handled when it's their turn.
     depth continues counting down (into negatives) from minimax's depth=0.
+    stats: optional SearchStats (quiescence nodes, move generation time).
+    poll:  optional callable run at every node (SearchContext.poll); it may
+           raise SearchAborted.
+    copy_make: play the shoots on copies instead of make/unmake (ai_core.play_action).
     """
+    if stats is not None:
+        stats.qnodes += 1
+    if poll is not None:
+        poll()
+
     game_over, winner = game_state.is_game_over()
     if game_over:
         if winner == root_player:
@@ -254,11 +593,14 @@ def quiescence(game_state: GameState, alpha: float, beta: float, maximizing_play
     player = root_player if maximizing_player else (2 if root_player == 1 else 1)
 
     # Get shoot actions for current player only
+    t0 = time.perf_counter()
     my_shoots = []
-    for piece in [p for p in game_state.pieces if p.player == player]:
+    for piece in game_state.player_pieces(player):
         for a in generate_legal_actions(game_state, piece):
             if hasattr(a, 'action_type') and a.action_type == "shoot":
                 my_shoots.append(a)
+    if stats is not None:
+        stats.phase_time["movegen"] += time.perf_counter() - t0
 
     # No shoots for current player → position is quiet → return eval
     if not my_shoots:
@@ -271,9 +613,12 @@ def quiescence(game_state: GameState, alpha: float, beta: float, maximizing_play
     if maximizing_player:
         max_eval = float("-inf")
         for action in my_shoots:
-            execute_action(game_state, action)
-            score = quiescence(game_state, alpha, beta, False, root_player, evaluate_position, depth - 1)
-            game_state.undo_last_move()
+            child = play_action(game_state, action, copy_make)
+            try:
+                score = quiescence(child, alpha, beta, False, root_player, evaluate_position, depth - 1, stats, poll, copy_make)
+            finally:
+                if child is game_state:
+                    game_state.undo_last_move()
             max_eval = max(max_eval, score)
             alpha = max(alpha, max_eval)
             if alpha >= beta:
@@ -282,9 +627,12 @@ def quiescence(game_state: GameState, alpha: float, beta: float, maximizing_play
     else:
         min_eval = float("inf")
         for action in my_shoots:
-            execute_action(game_state, action)
-            score = quiescence(game_state, alpha, beta, True, root_player, evaluate_position, depth - 1)
-            game_state.undo_last_move()
+            child = play_action(game_state, action, copy_make)
+            try:
+                score = quiescence(child, alpha, beta, True, root_player, evaluate_position, depth - 1, stats, poll, copy_make)
+            finally:
+                if child is game_state:
+                    game_state.undo_last_move()
             min_eval = min(min_eval, score)
             beta = min(beta, min_eval)
             if beta <= alpha:
@@ -292,11 +640,183 @@ def quiescence(game_state: GameState, alpha: float, beta: float, maximizing_play
         return min_eval
 
 
-def minimax(game_state: GameState, depth: int, alpha: float, beta: float, maximizing_player: bool, root_player: int, version: str = "v1") -> float:
+# ---------------------------------------------------------------------------
+# Transposition table
+# ---------------------------------------------------------------------------
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+# Mixed into TT keys so searches rooted at different players never share
+# entries (scores are always from the root player's point of view).
+_ROOT_PLAYER_KEY = 0x5BD1E9955BD1E995
+
+# Scores beyond this are depth-adjusted win/loss scores (WIN_SCORE + depth)
+_MATE_BOUND = WIN_SCORE / 2
+
+# Longest race counted by the endgame scoring; keeps WIN_SCORE - plies above _MATE_BOUND
+_ENDGAME_MAX_PLIES = WIN_SCORE // 2 - 1
+
+
+def _score_to_tt(score, depth):
+    # Store wins/losses relative to this node so they stay valid when the
+    # same position is reached with a different remaining depth.
+    if score > _MATE_BOUND:
+        return score - depth
+    if score < -_MATE_BOUND:
+        return score + depth
+    return score
+
+
+def _score_from_tt(score, depth):
+    if score > _MATE_BOUND:
+        return score + depth
+    if score < -_MATE_BOUND:
+        return score - depth
+    return score
+
+
+class TranspositionTable:
+    """
+    Bounded transposition table: key -> (depth, score, flag, move_code).
+    When full, the oldest inserted entry is evicted. Keeping one table
+    alive across moves (and while pondering) lets later searches start warm.
+    Thread-safe: the bot's search, its ponder thread and the UI analysis
+    thread may share one table.
+    """
+
+    def __init__(self, max_entries: int = 500_000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def probe(self, key):
+        with self._lock:
+            self.probes += 1
+            entry = self._data.get(key)
+            if entry is not None:
+                self.hits += 1
+            return entry
+
+    def peek(self, key):
+        """Look up an entry without touching the probe/hit counters."""
+        with self._lock:
+            return self._data.get(key)
+
+    def store(self, key, depth, score, flag, move_code):
+        with self._lock:
+            old = self._data.get(key)
+            if old is not None and old[0] > depth and flag != TT_EXACT:
+                return  # keep the deeper result
+            # Replacing an entry keeps its place in the insertion order
+            self._data[key] = (depth, score, flag, move_code)
+            self.stores += 1
+            if len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.probes = self.hits = self.stores = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+
+class SearchContext:
+    """
+    Per-search state threaded through minimax: version, resolved
+    evaluator (optionally cached), optional transposition table, the
+    SearchStats being filled and the cancellation state. Built once per
+    top-level search so the evaluator fingerprint is computed once, not at
+    every leaf.
+
+    cancel:   threading.Event; the search raises SearchAborted once it is set
+    deadline: time.perf_counter() value after which the search raises SearchAborted
+    track_pv: record the principal variation in a triangular PV table
+              (pv[ply] = best line, as action codes, from the node at that ply)
+    endgame:  score positions that split into independent regions exactly
+              (regions.endgame_outcome) instead of searching / evaluating them
+    copy_make: search on copies of the position (GameState.copy) instead of
+              make/unmake with undo_last_move; the root state is never modified
+    """
+
+    def __init__(self, version: str = "v1", eval_cache: EvalCache = None,
+                 tt: TranspositionTable = None, root_depth: int = 0,
+                 cancel: threading.Event = None, deadline: float = None,
+                 track_pv: bool = False, endgame: bool = True, copy_make: bool = False):
+        self.version = version
+        self.endgame = endgame
+        self.copy_make = copy_make
+        self.pv = [[] for _ in range(root_depth + 2)] if track_pv else None
+        self.eval_cache = eval_cache
+        self.tt = tt
+        self.root_depth = root_depth
+        self.cancel = cancel
+        self.deadline = deadline
+        self._poll_countdown = POLL_INTERVAL
+        self.stats = SearchStats(searches=1, depth=root_depth)
+        self._t0 = time.perf_counter()
+
+        evaluate = _resolve_evaluator(version, eval_cache, self.stats)
+        stats = self.stats
+
+        def timed_evaluate(game_state, player):
+            t = time.perf_counter()
+            score = evaluate(game_state, player)
+            stats.phase_time["eval"] += time.perf_counter() - t
+            stats.evals += 1
+            return score
+
+        self.evaluate_position = timed_evaluate
+        if tt is not None:
+            # blake2b content fingerprint: the same salt in every process, so
+            # shared_tt tables and workers agree on the keys
+            salt = evaluator_fingerprint(version)
+            self._tt_salt = {1: salt, 2: salt ^ _ROOT_PLAYER_KEY}
+
+    def tt_key(self, game_state, player, root_player):
+        return game_state.position_hash(player) ^ self._tt_salt[root_player]
+
+    def poll(self):
+        """Called at every node; checks cancel / deadline every POLL_INTERVAL nodes."""
+        self._poll_countdown -= 1
+        if self._poll_countdown > 0:
+            return
+        self._poll_countdown = POLL_INTERVAL
+        if self.cancel is not None and self.cancel.is_set():
+            raise SearchAborted("search cancelled")
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted("search deadline reached")
+
+    def finish(self) -> SearchStats:
+        """Stop the clock and return the stats of this search."""
+        self.stats.elapsed = time.perf_counter() - self._t0
+        return self.stats
+
+
+def minimax(game_state: GameState, depth: int, alpha: float, beta: float, maximizing_player: bool, root_player: int, version: str = "v1", eval_cache: EvalCache = None, tt: TranspositionTable = None, ctx: SearchContext = None) -> float:
     """
     Minimax with AB pruning, supporting multiple AI versions.
+    eval_cache: optional EvalCache used for the static evaluation at the leaves.
+    tt:         optional TranspositionTable (bounds + best move for ordering).
+    ctx:        SearchContext shared by the whole search (built from the
+                arguments above when not given).
     """
-    evaluate_position = MINIMAX_VERSIONS[version]["evaluate_position"]
+    if ctx is None:
+        ctx = SearchContext(version, eval_cache, tt, root_depth=depth)
+    stats = ctx.stats
+    ply = ctx.root_depth - depth
+    stats.count_node(ply)
+    ctx.poll()
+    pv = ctx.pv
+    if pv is not None:
+        pv[ply] = []
 
     game_over, winner = game_state.is_game_over()
 
@@ -312,142 +832,249 @@ def minimax(game_state: GameState, depth: int, alpha: float, beta: float, maximi
 
     player = root_player if maximizing_player else (2 if root_player == 1 else 1)
 
+    # Independent regions: the rest of the game is a known race, score it
+    # like the terminal it leads to (plies capped to stay a mate score)
+    if ctx.endgame:
+        outcome = endgame_outcome(game_state, player)
+        if outcome is not None:
+            stats.endgame_hits += 1
+            race_winner, plies = outcome
+            score = WIN_SCORE + depth - min(plies, _ENDGAME_MAX_PLIES)
+            return score if race_winner == root_player else -score
+
     if depth == 0:
-        return quiescence(game_state, alpha, beta, maximizing_player, root_player, evaluate_position, depth)
-    
+        return quiescence(game_state, alpha, beta, maximizing_player, root_player, ctx.evaluate_position, depth, stats, ctx.poll, ctx.copy_make)
+
+    # Transposition table probe
+    tt = ctx.tt
+    tt_move = None
+    if tt is not None:
+        key = ctx.tt_key(game_state, player, root_player)
+        entry = tt.probe(key)
+        stats.tt_probes += 1
+        if entry is not None:
+            stats.tt_hits += 1
+            e_depth, e_score, e_flag, tt_move = entry
+            if e_depth >= depth:
+                e_score = _score_from_tt(e_score, depth)
+                if e_flag == TT_EXACT:
+                    stats.tt_cutoffs += 1
+                    return e_score
+                if e_flag == TT_LOWER:
+                    alpha = max(alpha, e_score)
+                else:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    stats.tt_cutoffs += 1
+                    return e_score
+    alpha_orig, beta_orig = alpha, beta
+
+    t0 = time.perf_counter()
+    player_actions = generate_all_actions(game_state, player)
+    stats.phase_time["movegen"] += time.perf_counter() - t0
+    random.shuffle(player_actions)
+    size = game_state.board.size
+    if tt_move is not None:
+        # Search the TT best move first
+        for i, a in enumerate(player_actions):
+            if action_to_code(a, size) == tt_move:
+                player_actions[0], player_actions[i] = player_actions[i], player_actions[0]
+                break
+    best_action = None
+    if player_actions:
+        stats.interior += 1
+
     if maximizing_player:
-        player_actions = generate_all_actions(game_state, player)
-        random.shuffle(player_actions)
         max_eval = float("-inf")
 
-        for action in player_actions:
-            # print("Game state before action")
-            # game_state.print_game_state()
-            execute_action(game_state, action)
-            # print("Game state after action")
-            # game_state.print_game_state()
-            score = minimax(game_state, depth-1, alpha, beta, False, root_player, version=version)
-            game_state.undo_last_move()
-            # print("Game state after undo")
-            # game_state.print_game_state()
+        for i, action in enumerate(player_actions):
+            child = play_action(game_state, action, ctx.copy_make)
+            try:
+                score = minimax(child, depth-1, alpha, beta, False, root_player, version=version, ctx=ctx)
+            finally:
+                if child is game_state:
+                    game_state.undo_last_move()
 
-            max_eval = max(max_eval, score)
+            if score > max_eval:
+                max_eval = score
+                best_action = action
+                if pv is not None:
+                    pv[ply] = [action_to_code(action, size)] + pv[ply + 1]
             alpha = max(alpha, max_eval)
             if alpha >= beta:
+                stats.cutoffs += 1
+                if i == 0:
+                    stats.first_move_cutoffs += 1
                 break
-            
-        return max_eval
-    
-    if not maximizing_player:
-        player_actions = generate_all_actions(game_state, player)
-        random.shuffle(player_actions)
+        result = max_eval
+    else:
         min_eval = float("inf")
 
-        for action in player_actions:
-            # print("Game state before action")
-            # game_state.print_game_state()
-            execute_action(game_state, action)
-            # print("Game state after action")
-            # game_state.print_game_state()
-            score = minimax(game_state, depth-1, alpha, beta, True, root_player, version=version)
-            game_state.undo_last_move()
-            # print("Game state after undo")
-            # game_state.print_game_state()
+        for i, action in enumerate(player_actions):
+            child = play_action(game_state, action, ctx.copy_make)
+            try:
+                score = minimax(child, depth-1, alpha, beta, True, root_player, version=version, ctx=ctx)
+            finally:
+                if child is game_state:
+                    game_state.undo_last_move()
 
-            min_eval = min(min_eval, score)
+            if score < min_eval:
+                min_eval = score
+                best_action = action
+                if pv is not None:
+                    pv[ply] = [action_to_code(action, size)] + pv[ply + 1]
             beta = min(beta, min_eval)
             if beta <= alpha:
+                stats.cutoffs += 1
+                if i == 0:
+                    stats.first_move_cutoffs += 1
                 break
-        
-        return min_eval
-    
-def minimax_best_move(game_state: GameState, player: int, depth: int, version: str = "v1") -> Action:
+        result = min_eval
+
+    if tt is not None and best_action is not None:
+        if result <= alpha_orig:
+            flag = TT_UPPER
+        elif result >= beta_orig:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        tt.store(key, depth, _score_to_tt(result, depth), flag, action_to_code(best_action, size))
+
+    return result
+
+
+def _search_root(game_state: GameState, player: int, depth: int, ctx: SearchContext, root_codes=None) -> list:
     """
-    Returns the best action for the player using minimax search with specified version.
+    Full-window search of every root action (only those whose action code
+    is in root_codes, if given).
+    Returns [(action, score, pv), ...] sorted best first; pv is the line of
+    action codes starting with the root action (empty unless ctx.track_pv).
     """
+    ctx.stats.count_node(0)
+    t0 = time.perf_counter()
     actions = generate_all_actions(game_state, player)
-    best_score = float("-inf")
-    best_actions = []
-    all_scores = []
+    ctx.stats.phase_time["movegen"] += time.perf_counter() - t0
+    size = game_state.board.size
+    if root_codes is not None:
+        root_codes = set(root_codes)
+        actions = [a for a in actions if action_to_code(a, size) in root_codes]
+    if actions:
+        ctx.stats.interior += 1
+    scored = []
     for action in actions:
-        execute_action(game_state, action)
-        score = minimax(game_state, depth-1, alpha=float("-inf"), beta=float("inf"), maximizing_player=False, root_player=player, version=version)
-        all_scores.append(score)
-        game_state.undo_last_move()
-
-        if score > best_score:
-            best_score = score
-            best_actions = [action]
-        elif score == best_score:
-            best_actions.append(action)
-
-    if all_scores:
-        print(
-            f"[DEBUG] Scores -> "
-            f"min: {min(all_scores):.3f}, "
-            f"max: {max(all_scores):.3f}, "
-            f"avg: {sum(all_scores)/len(all_scores):.3f}, "
-            f"best: {best_score:.3f}"
-        )
-
-    return random.choice(best_actions) if best_actions else None
-
-
-if __name__ == "__main__":
-
-    ###### WEIGHTS ANALYSIS ##############
-    import pandas as pd
-
-    # Carica il CSV
-    df = pd.read_csv("feature_log_v2_depth2.csv")
-    print(df.columns)
-
-    # Target: 1 se vince player 1, 0 se vince player 2
-    df["y"] = (df["winner"] == 1).astype(int)
-
-    # Feature matrix
-    feature_cols = [
-        "material_diff",
-        "mobility_diff",
-        "shooting_diff",
-        "pieces_in_danger_diff",
-        "safe_pieces_diff",
-        "avg_distance_to_enemy_diff",
-        "clustering_diff",
-        "board_centrality_diff"
-    ]
-
-    X = df[feature_cols].values
-    y = df["y"].values
-
-    from sklearn.preprocessing import StandardScaler
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    print("Means:", scaler.mean_)
-    print("Stds:", scaler.scale_)
-
-    from sklearn.model_selection import train_test_split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_scaled, y, test_size=0.2, random_state=42
+        code = action_to_code(action, size)
+        child = play_action(game_state, action, ctx.copy_make)
+        try:
+            score = minimax(child, depth-1, alpha=float("-inf"), beta=float("inf"), maximizing_player=False, root_player=player, version=ctx.version, ctx=ctx)
+            line = []
+            if ctx.pv is not None:
+                line = [code] + ctx.pv[1]
+                line += _extend_pv_from_tt(child, ctx, player, 3 - player, line[1:], depth - len(line))
+        finally:
+            if child is game_state:
+                game_state.undo_last_move()
+        scored.append((action, score, line))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+
+def _extend_pv_from_tt(game_state, ctx, root_player, to_move, line, max_plies):
+    """
+    Follow TT best moves after `line` (played from game_state, to_move to
+    play first) for up to max_plies plies. Needed where the PV table was cut
+    short by a TT hit. Every move is checked for legality before it is played.
+    Returns the extra codes; game_state is left unchanged.
+    """
+    if ctx.tt is None or max_plies <= 0:
+        return []
+    size = game_state.board.size
+    extra = []
+    made = 0
+    try:
+        for code in line:
+            action = code_to_action(game_state, code, to_move)
+            if action is None:
+                return []
+            execute_action(game_state, action)
+            made += 1
+            to_move = 3 - to_move
+        while len(extra) < max_plies and not game_state.is_game_over()[0]:
+            entry = ctx.tt.peek(ctx.tt_key(game_state, to_move, root_player))
+            if entry is None:
+                break
+            code = entry[3]
+            legal = {action_to_code(a, size) for a in generate_all_actions(game_state, to_move)}
+            if code not in legal:
+                break
+            execute_action(game_state, code_to_action(game_state, code, to_move))
+            made += 1
+            extra.append(code)
+            to_move = 3 - to_move
+    finally:
+        for _ in range(made):
+            game_state.undo_last_move()
+    return extra
+
+
+def minimax_root_scores(game_state: GameState, player: int, depth: int, version: str = "v1", eval_cache: EvalCache = None, tt: TranspositionTable = None, stats: SearchStats = None, cancel: threading.Event = None, deadline: float = None, root_codes=None, copy_make: bool = False) -> list:
+    """
+    Score every legal action of `player` with a full-window minimax search.
+    Returns [(action, score), ...] sorted best first.
+    stats:      optional SearchStats; the statistics of this search are merged into it.
+    cancel:     optional threading.Event; raises SearchAborted soon after it is set.
+    deadline:   optional time.perf_counter() deadline; raises SearchAborted once passed.
+    root_codes: optional action codes; only these root actions are scored
+                (used to split the root between parallel workers).
+    copy_make:  search on copies instead of make/unmake (see SearchContext).
+    """
+    ctx = SearchContext(version, eval_cache, tt, root_depth=depth,
+                        cancel=cancel, deadline=deadline, copy_make=copy_make)
+    scored = _search_root(game_state, player, depth, ctx, root_codes)
+    if stats is not None:
+        stats.merge(ctx.finish())
+    return [(action, score) for action, score, _ in scored]
+
+
+def minimax_multipv(game_state: GameState, player: int, depth: int, version: str = "v1", eval_cache: EvalCache = None, tt: TranspositionTable = None, stats: SearchStats = None, cancel: threading.Event = None, deadline: float = None, copy_make: bool = False) -> list:
+    """
+    Multi-PV search: like minimax_root_scores, but every root action also
+    gets its principal variation, recorded while searching.
+    Returns [(action, score, pv_codes), ...] sorted best first, where
+    pv_codes (ai_core.action_to_code) starts with the root action and
+    alternates players from `player`.
+    """
+    ctx = SearchContext(version, eval_cache, tt, root_depth=depth,
+                        cancel=cancel, deadline=deadline, track_pv=True, copy_make=copy_make)
+    scored = _search_root(game_state, player, depth, ctx)
+    if stats is not None:
+        stats.merge(ctx.finish())
+    return scored
+
+
+def minimax_best_move(game_state: GameState, player: int, depth: int, version: str = "v1", eval_cache: EvalCache = None, tt: TranspositionTable = None, stats: SearchStats = None, cancel: threading.Event = None, deadline: float = None, copy_make: bool = False) -> Action:
+    """
+    Returns the best action for the player using minimax search with specified version.
+    stats: optional SearchStats the statistics of this search are merged into.
+    cancel / deadline / copy_make: see minimax_root_scores (raises SearchAborted).
+    """
+    search_stats = SearchStats()
+    scored = minimax_root_scores(game_state, player, depth, version=version, eval_cache=eval_cache, tt=tt, stats=search_stats, cancel=cancel, deadline=deadline, copy_make=copy_make)
+    if stats is not None:
+        stats.merge(search_stats)
+    if not scored:
+        return None
+
+    all_scores = [score for _, score in scored]
+    best_score = scored[0][1]
+    best_actions = [action for action, score in scored if score == best_score]
+
+    print(
+        f"[DEBUG] Scores -> "
+        f"min: {min(all_scores):.3f}, "
+        f"max: {max(all_scores):.3f}, "
+        f"avg: {sum(all_scores)/len(all_scores):.3f}, "
+        f"best: {best_score:.3f} | {search_stats.summary()}"
     )
 
-    from sklearn.linear_model import LogisticRegression
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X_train, y_train)
-
-    from sklearn.metrics import accuracy_score
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
-    print("Accuracy:", accuracy)
-
-    weights = model.coef_[0]
-    intercept = model.intercept_[0]
-    print("Weights raw:", model.coef_[0])
-    print("Feature order:", feature_cols)
-    print("Intercept:", intercept)
-
-    # To test different AI versions, change the version string below:
-    # version_to_test = "v1"
-    # You can then call minimax_best_move or minimax with version=version_to_test
-    # Example:
-    # best_action = minimax_best_move(game_state, player=1, depth=3, version=version_to_test)
\ No newline at end of file
+    return random.choice(best_actions)
+
@@ -0,0 +1,256 @@
+"""
+Opening Book for Dots & Cuts
+============================
+Precomputed move statistics for the first plies of the prebuilt maps.
+
+Building (offline):
+    python minimax_approach/opening_book.py --maps balanced_9x9 small_5x5 \
+        --plies 4 --depth 4 --width 3
+
+    Every position reached in the first `plies` plies (following the `width`
+    best moves at each ply) is searched with minimax at `depth`, and every
+    legal move is stored with its score. The minimax version and depth
+    are written into the header: a bot only plays from a book built with
+    its own version and depth (OpeningBook.matches).
+
+Lookup (at play time):
+    The book is a sorted binary file that is memory-mapped read-only, so
+    every process playing from the same book shares the same physical pages.
+    Lookups are a binary search over fixed-size records.
+
+File format (little endian):
+    header  8s magic  "DCBOOK2\\0"
+            I  record size
+            I  search depth
+            Q  record count
+            16s minimax version (ASCII, NUL padded)
+    record  Q  position key   (GameState.position_hash(player))
+            H  move code      (ai_core.action_to_code)
+            H  reserved
+            f  score          (minimax score for the side to move)
+            I  count          (how many times the entry was produced)
+    Records are sorted by key, then by descending score.
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+# Ensure core/ and pygame_ui/ (prebuilt maps) are importable
+_base = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_base, "..", "core"))
+sys.path.insert(0, os.path.join(_base, "..", "pygame_ui"))
+
+from ai_core import Action, generate_all_actions, make_action, action_to_code, code_to_action
+
+BOOK_MAGIC = b"DCBOOK2\0"
+_HEADER = struct.Struct("<8sIIQ16s")
+_RECORD = struct.Struct("<QHHfI")
+
+DEFAULT_BOOK_PATH = os.path.join(_base, "books", "opening.book")
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped opening book.
+    version, depth: the minimax version and depth the book was built with.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty opening book: {path}")
+        magic, rec_size, depth, count, version = _HEADER.unpack_from(self._mm, 0)
+        if magic != BOOK_MAGIC or rec_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"Not an opening book (or wrong format version): {path}")
+        if _HEADER.size + count * _RECORD.size > len(self._mm):
+            self.close()
+            raise ValueError(f"Truncated opening book: {path}")
+        self._count = count
+        self.depth = depth
+        self.version = version.rstrip(b"\0").decode("ascii")
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        if not self._file.closed:
+            self._file.close()
+
+    def matches(self, version: str, depth: int) -> bool:
+        """True if the book's moves were scored by minimax `version` at `depth`."""
+        return self.version == version and self.depth == depth
+
+    def _key_at(self, i):
+        return struct.unpack_from("<Q", self._mm, _HEADER.size + i * _RECORD.size)[0]
+
+    def probe(self, key: int):
+        """All (code, score, count) entries for a position key, best score first."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        entries = []
+        i = lo
+        while i < self._count:
+            k, code, _, score, count = _RECORD.unpack_from(
+                self._mm, _HEADER.size + i * _RECORD.size)
+            if k != key:
+                break
+            entries.append((code, score, count))
+            i += 1
+        return entries
+
+    def lookup(self, game_state, player: int):
+        """Book entries for game_state with `player` to move."""
+        return self.probe(game_state.position_hash(player))
+
+    def best_action(self, game_state, player: int, min_count: int = 1) -> Action:
+        """
+        Best book move for the position, or None when out of book.
+        Book moves are checked against the legal moves so a hash collision
+        can never produce an illegal action.
+        """
+        entries = self.lookup(game_state, player)
+        if not entries:
+            return None
+        size = game_state.board.size
+        legal = {action_to_code(a, size) for a in generate_all_actions(game_state, player)}
+        for code, _, count in entries:
+            if count >= min_count and code in legal:
+                return code_to_action(game_state, code, player)
+        return None
+
+
+def write_book(path: str, entries, version: str = "v1", depth: int = 4):
+    """
+    Write (key, code, score, count) entries to a book file built with
+    minimax `version` at `depth`.
+    Duplicate (key, code) pairs are merged: counts are summed and the
+    score of the deepest/latest entry is kept.
+    """
+    merged = {}
+    for key, code, score, count in entries:
+        prev = merged.get((key, code))
+        merged[(key, code)] = (score, count + (prev[1] if prev else 0))
+    rows = sorted(((k, c, s, n) for (k, c), (s, n) in merged.items()),
+                  key=lambda r: (r[0], -r[2]))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(BOOK_MAGIC, _RECORD.size, depth, len(rows), version.encode("ascii")))
+        for key, code, score, count in rows:
+            f.write(_RECORD.pack(key, code, 0, score, count))
+    os.replace(tmp, path)
+    return len(rows)
+
+
+_default_book = None
+_default_book_loaded = False
+
+
+def get_default_book():
+    """
+    The book at DEFAULT_BOOK_PATH, opened once per process.
+    Returns None if no book has been built.
+    """
+    global _default_book, _default_book_loaded
+    if not _default_book_loaded:
+        _default_book_loaded = True
+        if os.path.isfile(DEFAULT_BOOK_PATH):
+            try:
+                _default_book = OpeningBook(DEFAULT_BOOK_PATH)
+            except ValueError as e:
+                print(f"[OpeningBook] Ignoring {DEFAULT_BOOK_PATH}: {e}")
+    return _default_book
+
+
+# ---------------------------------------------------------------------------
+# Builder
+# ---------------------------------------------------------------------------
+PREBUILT_MAPS = ("balanced_9x9", "small_5x5")
+
+
+def _score_moves(game_state, player, depth, version, eval_cache):
+    from minimax_ai import minimax
+    scored = []
+    for action in generate_all_actions(game_state, player):
+        make_action(game_state, action)
+        score = minimax(game_state, depth - 1, float("-inf"), float("inf"),
+                        False, player, version=version, eval_cache=eval_cache)
+        game_state.undo_last_move()
+        scored.append((action, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+
+def build_opening_book(maps=PREBUILT_MAPS, plies: int = 4, depth: int = 4,
+                       width: int = 3, version: str = "v1", verbose: bool = True):
+    """
+    Search the opening tree of each map and return book entries
+    (key, code, score, count). Player 1 moves first, as in the UI.
+    """
+    from custom_setup import PrebuiltSetups
+    from minimax_ai import EvalCache
+
+    eval_cache = EvalCache()
+    entries = []
+
+    for map_name in maps:
+        game_state = getattr(PrebuiltSetups, map_name)()
+        size = game_state.board.size
+        searched = 0
+
+        def visit(player, ply):
+            nonlocal searched
+            over, _ = game_state.is_game_over()
+            if over or ply >= plies:
+                return
+            key = game_state.position_hash(player)
+            scored = _score_moves(game_state, player, depth, version, eval_cache)
+            searched += 1
+            for action, score in scored:
+                entries.append((key, action_to_code(action, size), float(score), 1))
+            for action, _ in scored[:width]:
+                make_action(game_state, action)
+                visit(3 - player, ply + 1)
+                game_state.undo_last_move()
+
+        visit(1, 0)
+        if verbose:
+            print(f"[OpeningBook] {map_name}: {searched} positions searched")
+
+    return entries
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the Dots & Cuts opening book.")
+    parser.add_argument("--maps", nargs="+", default=list(PREBUILT_MAPS))
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--width", type=int, default=3)
+    parser.add_argument("--version", default="v1")
+    parser.add_argument("--out", default=DEFAULT_BOOK_PATH)
+    args = parser.parse_args()
+
+    t0 = time.time()
+    book_entries = build_opening_book(args.maps, args.plies, args.depth,
+                                      args.width, args.version)
+    n = write_book(args.out, book_entries, args.version, args.depth)
+    print(f"[OpeningBook] wrote {n} records to {args.out} in {time.time() - t0:.1f}s")
@@ -0,0 +1,176 @@
+"""
+Parallel Minimax Search for Dots & Cuts
+=======================================
+Multi-process search on top of minimax_ai, with every worker sharing one
+SharedTranspositionTable (shared_tt.py) so results found by one process
+are reused by the others.
+
+  - Root splitting: the root actions are dealt out to the workers, each
+                    scores its share with a full-window search. Same scores
+                    as minimax_root_scores, in a fraction of the time.
+  - Subtree split:  the root actions are played on copies of the position
+                    (copy-make, GameState.copy) and every child position is
+                    shipped to a worker as its own search, so workers never
+                    replay moves. Same scores as root splitting.
+  - Lazy SMP:       helpers search the whole tree (odd helpers one ply
+                    deeper) in a different random move order and fill the
+                    shared table; the main search, run in this process, hits
+                    their entries. Helpers are stopped when it finishes.
+
+ParallelSearcher keeps the process pool and the table alive across searches
+(one per game / tournament), so later searches start warm.
+"""
+
+from dotscuts import GameState
+from ai_core import Action, action_to_code, code_to_action, generate_all_actions, play_action
+from minimax_ai import minimax, minimax_root_scores, SearchContext, SearchStats, SearchAborted
+from shared_tt import SharedTranspositionTable
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import random
+
+# ---- worker side ----
+_worker_tt = None
+_worker_stop = None
+
+
+def _init_worker(tt, stop):
+    global _worker_tt, _worker_stop
+    _worker_tt = tt
+    _worker_stop = stop
+
+
+def _score_root(game_state, player, depth, version, codes, seed):
+    """Worker task: score root actions (codes=None: all of them). Returns ([(code, score)], SearchStats) or None if stopped."""
+    random.seed(seed)
+    stats = SearchStats()
+    try:
+        scored = minimax_root_scores(game_state, player, depth, version=version, tt=_worker_tt,
+                                     stats=stats, cancel=_worker_stop, root_codes=codes)
+    except SearchAborted:
+        return None
+    size = game_state.board.size
+    return [(action_to_code(a, size), score) for a, score in scored], stats
+
+
+def _score_subtree(child, player, depth, version, seed):
+    """Worker task: search one child of the root (player to move at the root). Returns (score, SearchStats) or None if stopped."""
+    random.seed(seed)
+    ctx = SearchContext(version, tt=_worker_tt, root_depth=depth, cancel=_worker_stop, copy_make=True)
+    try:
+        score = minimax(child, depth - 1, float("-inf"), float("inf"), False, player, version=version, ctx=ctx)
+    except SearchAborted:
+        return None
+    return score, ctx.finish()
+
+
+class ParallelSearcher:
+    """
+    Process pool plus shared transposition table for parallel searches.
+
+    workers:    number of worker processes (default: CPU count)
+    tt_entries: capacity of the shared table (ignored if tt is given)
+    tt:         an existing SharedTranspositionTable to use
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, workers: int = None, tt_entries: int = 1_000_000, tt: SharedTranspositionTable = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._own_tt = tt is None
+        self.tt = tt if tt is not None else SharedTranspositionTable(tt_entries)
+        self._stop = multiprocessing.Event()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(self.tt, self._stop))
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._own_tt:
+            self.tt.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def root_scores(self, game_state: GameState, player: int, depth: int, version: str = "v1",
+                    stats: SearchStats = None) -> list:
+        """
+        Root-split parallel search. Returns [(action, score), ...] sorted best
+        first, like minimax_ai.minimax_root_scores.
+        """
+        self._stop.clear()
+        size = game_state.board.size
+        codes = [action_to_code(a, size) for a in generate_all_actions(game_state, player)]
+        random.shuffle(codes)
+        shares = [codes[i::self.workers] for i in range(self.workers)]
+        futures = [self._pool.submit(_score_root, game_state, player, depth, version, share, random.getrandbits(32))
+                   for share in shares if share]
+        scored = []
+        for future in futures:
+            codes_scores, worker_stats = future.result()
+            if stats is not None:
+                stats.merge(worker_stats)
+            scored.extend(codes_scores)
+        return self._to_actions(game_state, player, scored)
+
+    def subtree_scores(self, game_state: GameState, player: int, depth: int, version: str = "v1",
+                       stats: SearchStats = None) -> list:
+        """
+        Subtree-split parallel search: one task per root action, carrying
+        the child position itself. Returns [(action, score), ...] sorted
+        best first, like root_scores.
+        """
+        self._stop.clear()
+        actions = generate_all_actions(game_state, player)
+        futures = [self._pool.submit(_score_subtree, play_action(game_state, action, copy_make=True),
+                                     player, depth, version, random.getrandbits(32))
+                   for action in actions]
+        scored = []
+        for action, future in zip(actions, futures):
+            score, worker_stats = future.result()
+            if stats is not None:
+                stats.merge(worker_stats)
+            scored.append((action, score))
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored
+
+    def lazy_smp_scores(self, game_state: GameState, player: int, depth: int, version: str = "v1",
+                        helpers: int = None, stats: SearchStats = None) -> list:
+        """
+        Lazy-SMP search: `helpers` worker processes (default: all workers)
+        search alongside the main search, which runs in this process.
+        Returns the main search's [(action, score), ...] sorted best first.
+        """
+        self._stop.clear()
+        helpers = self.workers if helpers is None else min(helpers, self.workers)
+        futures = [self._pool.submit(_score_root, game_state, player, depth + (i % 2), version, None,
+                                     random.getrandbits(32))
+                   for i in range(helpers)]
+        try:
+            scored = minimax_root_scores(game_state, player, depth, version=version, tt=self.tt, stats=stats)
+        finally:
+            self._stop.set()
+            for future in futures:
+                result = future.result()
+                if result is not None and stats is not None:
+                    stats.merge(result[1])
+        return scored
+
+    def best_move(self, game_state: GameState, player: int, depth: int, version: str = "v1",
+                  lazy_smp: bool = False, stats: SearchStats = None) -> Action:
+        """Best action (ties broken at random) from root_scores or lazy_smp_scores."""
+        search = self.lazy_smp_scores if lazy_smp else self.root_scores
+        scored = search(game_state, player, depth, version=version, stats=stats)
+        if not scored:
+            return None
+        best_score = scored[0][1]
+        return random.choice([action for action, score in scored if score == best_score])
+
+    @staticmethod
+    def _to_actions(game_state, player, code_scores):
+        scored = [(code_to_action(game_state, code, player), score) for code, score in code_scores]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored
@@ -0,0 +1,301 @@
+"""
+Proof-Number Solver for Dots & Cuts
+===================================
+Depth-first proof-number search (df-pn) for forced wins.
+
+Minimax only sees wins inside its fixed horizon. Proof-number search has no
+horizon: it grows the tree where the proof is cheapest (few replies, forcing
+shots), so narrow tactical wins many plies deep are found quickly.
+
+  - OR nodes:  attacker to move, proven if ANY child is proven
+  - AND nodes: defender to move, proven if ALL children are proven
+  - pn / dn:   proof / disproof numbers, kept in a transposition table keyed
+               by GameState.position_hash(side to move)
+  - df-pn:     depth-first with thresholds (Nagai), make/unmake on one state
+
+Every move uses up an edge and every shot removes a piece, so the game graph
+is acyclic and transpositions need no special handling.
+
+A draw (no winner) counts as a failure for the attacker. Positions that split
+into independent regions (see regions.py) are solved exactly as terminals.
+
+Budgets: max_nodes (expanded nodes) and max_entries (TT size; unsolved
+entries are garbage-collected first). When a budget runs out, or the cancel
+event is set / the deadline passes, the result is UNKNOWN.
+"""
+
+from dotscuts import GameState
+from ai_core import Action, generate_all_actions, execute_action, make_action, action_to_code, code_to_action
+from dataclasses import dataclass, field
+import os
+import sys
+import time
+
+# Sibling modules are imported by bare name, also when this module is
+# loaded as minimax_approach.<name> (pygame_ui)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from regions import endgame_outcome
+
+INF = 1 << 30
+
+PROVEN = "proven"
+DISPROVEN = "disproven"
+UNKNOWN = "unknown"
+
+# Nodes between two checks of cancel / deadline
+_POLL_INTERVAL = 64
+
+
+class _Stop(Exception):
+    """Internal: node/memory budget exhausted or search cancelled."""
+
+
+@dataclass
+class SolverResult:
+    """
+    Outcome of a df-pn solve.
+
+    status:   PROVEN (attacker forces a win), DISPROVEN (it cannot) or UNKNOWN
+    attacker: the player the proof is about
+    plies:    length of the proof / disproof (plies until the game ends);
+              an upper bound on the shortest forced win, not always the minimum
+    line:     action codes of the proof line from the root (stops early where
+              the rest is an independent-region race, so it can be shorter than plies)
+    nodes:    nodes expanded
+    """
+    status: str
+    attacker: int
+    to_move: int
+    plies: int = None
+    line: list = field(default_factory=list)
+    nodes: int = 0
+    tt_entries: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def proven(self) -> bool:
+        return self.status == PROVEN
+
+    @property
+    def moves(self) -> int:
+        """Proof length in attacker moves ("forced win in N")."""
+        if self.plies is None:
+            return None
+        first = 1 if self.to_move == self.attacker else 0
+        return (self.plies + first) // 2
+
+    def best_action(self, game_state: GameState) -> Action:
+        """First move of the proof line for game_state (None if not proven / not attacker's move)."""
+        if not self.proven or not self.line or self.to_move != self.attacker:
+            return None
+        return code_to_action(game_state, self.line[0], self.attacker)
+
+    def describe(self) -> str:
+        if self.status == PROVEN:
+            return f"P{self.attacker} forced win in {self.moves}"
+        if self.status == DISPROVEN:
+            return f"P{self.attacker} has no forced win"
+        return "unknown"
+
+
+class DfpnSolver:
+    """
+    df-pn solver with node and memory budgets.
+
+    max_nodes:   maximum number of expanded nodes per solve
+    max_entries: maximum transposition table entries per solve
+    cancel:      optional threading.Event, checked every few nodes
+    deadline:    optional time.perf_counter() deadline
+    """
+
+    def __init__(self, max_nodes: int = 100_000, max_entries: int = 500_000,
+                 cancel=None, deadline: float = None):
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.cancel = cancel
+        self.deadline = deadline
+        self._tt = {}
+        self._nodes = 0
+        self._attacker = None
+
+    # ----- public API -----
+
+    def solve(self, game_state: GameState, to_move: int, attacker: int = None) -> SolverResult:
+        """
+        Try to prove that `attacker` (default: the side to move) forces a win
+        from game_state with `to_move` to play. game_state is left unchanged.
+        """
+        attacker = to_move if attacker is None else attacker
+        self._attacker = attacker
+        self._tt = {}
+        self._nodes = 0
+        t0 = time.perf_counter()
+
+        root_key = game_state.position_hash(to_move)
+        try:
+            self._mid(game_state, to_move, INF - 1, INF - 1)
+        except _Stop:
+            pass
+
+        pn, dn, plies, _ = self._tt.get(root_key, (1, 1, None, None))
+        if pn == 0:
+            status = PROVEN
+        elif dn == 0:
+            status = DISPROVEN
+        else:
+            status, plies = UNKNOWN, None
+        line = self._proof_line(game_state, to_move) if status != UNKNOWN else []
+        return SolverResult(status, attacker, to_move, plies, line,
+                            self._nodes, len(self._tt), time.perf_counter() - t0)
+
+    # ----- df-pn -----
+
+    def _mid(self, gs, to_move, th_pn, th_dn):
+        key = gs.position_hash(to_move)
+        pn, dn, _, _ = self._tt.get(key, (1, 1, None, None))
+        if pn >= th_pn or dn >= th_dn:
+            return
+        self._count_node()
+
+        over, winner = gs.is_game_over()
+        if over:
+            self._store_terminal(key, winner == self._attacker)
+            return
+        actions = generate_all_actions(gs, to_move)
+        if not actions:
+            self._store_terminal(key, to_move != self._attacker)
+            return
+        outcome = endgame_outcome(gs, to_move)
+        if outcome is not None:
+            self._store_terminal(key, outcome[0] == self._attacker, outcome[1])
+            return
+
+        # Child keys are computed once; the loop below only reads the TT
+        size = gs.board.size
+        children = []
+        for action in actions:
+            code = action_to_code(action, size)
+            make_action(gs, action)
+            try:
+                children.append((code, gs.position_hash(3 - to_move)))
+            finally:
+                gs.undo_last_move()
+
+        or_node = to_move == self._attacker
+        tt = self._tt  # pruned in place by _collect_garbage, never replaced during a solve
+        while True:
+            self._poll()
+            values = [tt.get(k, (1, 1, None, None)) for _, k in children]
+            if or_node:
+                pn = min(v[0] for v in values)
+                dn = min(INF, sum(v[1] for v in values))
+            else:
+                pn = min(INF, sum(v[0] for v in values))
+                dn = min(v[1] for v in values)
+
+            if pn == 0 or dn == 0:
+                self._store_solved(key, pn, dn, or_node, children, values)
+                return
+            self._store(key, pn, dn, None, None)
+            if pn >= th_pn or dn >= th_dn:
+                return
+
+            # Most-proving child and the thresholds it gets
+            if or_node:
+                order = sorted(range(len(values)), key=lambda i: values[i][0])
+                best = order[0]
+                second = values[order[1]][0] if len(order) > 1 else INF
+                c_th_pn = min(th_pn, second + 1)
+                c_th_dn = min(INF - 1, th_dn - dn + values[best][1])
+            else:
+                order = sorted(range(len(values)), key=lambda i: values[i][1])
+                best = order[0]
+                second = values[order[1]][1] if len(order) > 1 else INF
+                c_th_dn = min(th_dn, second + 1)
+                c_th_pn = min(INF - 1, th_pn - pn + values[best][0])
+
+            action = code_to_action(gs, children[best][0], to_move)
+            make_action(gs, action)
+            try:
+                self._mid(gs, 3 - to_move, c_th_pn, c_th_dn)
+            finally:
+                gs.undo_last_move()
+
+    # ----- transposition table -----
+
+    def _store(self, key, pn, dn, plies, best):
+        self._tt[key] = (pn, dn, plies, best)
+        if len(self._tt) > self.max_entries:
+            self._collect_garbage()
+
+    def _store_terminal(self, key, attacker_wins, plies=0):
+        if attacker_wins:
+            self._store(key, 0, INF, plies, None)
+        else:
+            self._store(key, INF, 0, plies, None)
+
+    def _store_solved(self, key, pn, dn, or_node, children, values):
+        """Store a solved node with its proof length and proof move."""
+        solved = [(v[2], code) for (code, _), v in zip(children, values)
+                  if (v[0] == 0 if pn == 0 else v[1] == 0)]
+        # The side that decides picks the shortest line, the other the longest
+        if (pn == 0) == or_node:
+            plies, best = min(solved)
+        else:
+            plies, best = max(solved)
+        self._store(key, pn, dn, plies + 1, best)
+
+    def _collect_garbage(self):
+        """Drop unsolved entries (in place); stop if solved entries alone exceed the budget."""
+        tt = self._tt
+        for key in [k for k, v in tt.items() if v[0] != 0 and v[1] != 0]:
+            del tt[key]
+        if len(tt) > self.max_entries * 3 // 4:
+            raise _Stop()
+
+    def _count_node(self):
+        self._nodes += 1
+        if self._nodes > self.max_nodes:
+            raise _Stop()
+        if self._nodes % _POLL_INTERVAL == 0:
+            self._poll()
+
+    def _poll(self):
+        """Stop on cancel or deadline; also called by the loop of _mid, which can
+        spin without expanding new nodes once garbage collection drops its children."""
+        if self.cancel is not None and self.cancel.is_set():
+            raise _Stop()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise _Stop()
+
+    # ----- proof line -----
+
+    def _proof_line(self, gs, to_move):
+        line = []
+        made = 0
+        try:
+            while True:
+                entry = self._tt.get(gs.position_hash(to_move))
+                if entry is None or entry[3] is None:
+                    break
+                action = code_to_action(gs, entry[3], to_move)
+                if action is None:
+                    break
+                line.append(entry[3])
+                execute_action(gs, action)
+                made += 1
+                to_move = 3 - to_move
+        finally:
+            for _ in range(made):
+                gs.undo_last_move()
+        return line
+
+
+def solve_forced_win(game_state: GameState, to_move: int, attacker: int = None,
+                     max_nodes: int = 100_000, max_entries: int = 500_000,
+                     cancel=None, deadline: float = None) -> SolverResult:
+    """Convenience wrapper: one DfpnSolver.solve() call."""
+    solver = DfpnSolver(max_nodes=max_nodes, max_entries=max_entries,
+                        cancel=cancel, deadline=deadline)
+    return solver.solve(game_state, to_move, attacker)
@@ -0,0 +1,291 @@
+"""
+Independent-Region Endgame Analysis for Dots & Cuts
+===================================================
+Late in the game the visited-edge trails often cut the board into regions
+whose pieces can no longer reach or shoot each other. From then on the game
+is a race: whoever runs out of legal actions first loses.
+
+This module detects that situation and solves the race exactly.
+
+  - Reach sets:     vertices each piece can still walk to, over the unvisited
+                    edges of its own kind (orthogonal / diagonal)
+  - Line of fire:   the board's static shot table (dotscuts.shot_table): the
+                    vertices a piece standing on v could shoot at
+  - Independence:   no enemy reach sets overlap (no capture by moving) and
+                    no piece can ever shoot into an enemy reach set. No shot
+                    can ever happen, so pieces stay inside their reach sets.
+  - Quick reject:   a piece that can walk to an enemy piece's vertex, or
+                    shoot at it from a vertex it can walk to, rules out
+                    independence; search nodes check this first
+  - Budgets:        each player's maximum number of remaining moves, the
+                    longest edge-disjoint trails of its pieces in every region
+                    (exact depth-first search with a node budget)
+
+With budgets Bs (side to move) and Bo (opponent), and a player losing as soon
+as it has no legal action left, the side to move makes its last move at ply
+2*Bs - 1 and the opponent at ply 2*Bo. So the side to move wins iff Bs > Bo,
+in 2*Bo plies, and otherwise loses in 2*Bs - 1 plies.
+"""
+
+from dotscuts import GameState, Piece, neighbour_table, shot_table
+from collections import OrderedDict, deque
+
+# Positions with more pieces than this are not analysed (mid-game positions
+# are almost never independent and the check is not free)
+ENDGAME_MAX_PIECES = 8
+
+# Search steps allowed per region when computing exact move budgets
+TRAIL_NODE_BUDGET = 20_000
+
+
+# ---------------------------------------------------------------------------
+# Reach sets and regions
+# ---------------------------------------------------------------------------
+def _free_neighbours(game_state, vertex, kind):
+    visited = game_state.visited_edges
+    for w, edge in neighbour_table(game_state.board.size, kind)[vertex]:
+        if edge not in visited:
+            yield w
+
+
+def reach_set(game_state: GameState, piece: Piece, forbidden=()) -> frozenset:
+    """
+    Vertices the piece can walk to over unvisited edges of its kind (start
+    included). Returns None as soon as a vertex in `forbidden` is reached.
+    """
+    start = (piece.x, piece.y)
+    if start in forbidden:
+        return None
+    table = neighbour_table(game_state.board.size, piece.kind)
+    visited = game_state.visited_edges
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        v = queue.popleft()
+        for w, edge in table[v]:
+            if w not in seen and edge not in visited:
+                if w in forbidden:
+                    return None
+                seen.add(w)
+                queue.append(w)
+    return frozenset(seen)
+
+
+class Region:
+    """
+    One player's pieces of one kind sharing a connected component of
+    unvisited edges. budget = max moves they can still make (None = unknown).
+    """
+    __slots__ = ("player", "kind", "vertices", "pieces", "edges", "budget")
+
+    def __init__(self, player, kind, vertices, pieces):
+        self.player = player
+        self.kind = kind
+        self.vertices = vertices
+        self.pieces = pieces
+        self.edges = 0
+        self.budget = None
+
+    def __repr__(self):
+        return (f"Region(P{self.player} {self.kind}, {len(self.pieces)} pieces, "
+                f"{len(self.vertices)} vertices, {self.edges} edges, budget={self.budget})")
+
+
+class RegionAnalysis:
+    """
+    Result of analyse_regions().
+    independent: no piece can ever capture or shoot an enemy piece
+                 (regions is empty when it is False)
+    budgets:     {player: total move budget} when independent and every
+                 region budget is exact, else None
+    """
+
+    def __init__(self, regions, independent, budgets):
+        self.regions = regions
+        self.independent = independent
+        self.budgets = budgets
+
+    @property
+    def exact(self) -> bool:
+        return self.budgets is not None
+
+    def outcome(self, to_move: int):
+        """(winner, plies until the game ends) with `to_move` to play, or None if not exact."""
+        if self.budgets is None:
+            return None
+        mine, theirs = self.budgets[to_move], self.budgets[3 - to_move]
+        if mine > theirs:
+            return to_move, 2 * theirs
+        return 3 - to_move, max(0, 2 * mine - 1)
+
+
+def analyse_regions(game_state: GameState, node_budget: int = TRAIL_NODE_BUDGET) -> RegionAnalysis:
+    """Decompose the position into regions and, if they are independent, solve the race."""
+    lof = shot_table(game_state.board, game_state._board_key)
+    reach = {}
+    threats = {1: set(), 2: set()}
+    occupied = {1: set(), 2: set()}
+
+    def add(p, vertices):
+        reach[id(p)] = vertices
+        occupied[p.player] |= vertices
+        for x, y in vertices:
+            threats[p.player] |= lof[(p.kind, x, y)]
+
+    # Independence: no overlapping enemy reach sets, no line of fire into
+    # one. Player 2's walks stop early on the first vertex player 1 can
+    # reach or shoot at, which rejects most positions cheaply.
+    for p in game_state.player_pieces(1):
+        add(p, reach_set(game_state, p))
+    forbidden = occupied[1] | threats[1]
+    independent = True
+    for p in game_state.player_pieces(2):
+        vertices = reach_set(game_state, p, forbidden)
+        if vertices is None:
+            independent = False
+            break
+        add(p, vertices)
+    if independent:
+        independent = threats[2].isdisjoint(occupied[1])
+    if not independent:
+        return RegionAnalysis([], False, None)
+
+    # Group each player's same-kind pieces by shared component
+    regions = []
+    for player in (1, 2):
+        for kind in ("orthogonal", "diagonal"):
+            for p in game_state.pieces:
+                if p.player != player or p.kind != kind:
+                    continue
+                region = next((r for r in regions if r.player == player and r.kind == kind
+                               and (p.x, p.y) in r.vertices), None)
+                if region is None:
+                    regions.append(Region(player, kind, reach[id(p)], [p]))
+                else:
+                    region.pieces.append(p)
+
+    budgets = {1: 0, 2: 0}
+    for region in regions:
+        region.budget = _region_budget(game_state, region, node_budget)
+        if region.budget is None:
+            return RegionAnalysis(regions, True, None)
+        budgets[region.player] += region.budget
+    return RegionAnalysis(regions, True, budgets)
+
+
+# ---------------------------------------------------------------------------
+# Exact move budgets (longest edge-disjoint trails)
+# ---------------------------------------------------------------------------
+def _region_budget(game_state, region, node_budget):
+    """Max total moves of the region's pieces, or None if the search budget runs out."""
+    adj = {}
+    edges = set()
+    for v in region.vertices:
+        nbrs = list(_free_neighbours(game_state, v, region.kind))
+        adj[v] = nbrs
+        for w in nbrs:
+            edges.add((v, w) if v < w else (w, v))
+    region.edges = len(edges)
+    if not edges:
+        return 0
+
+    total = len(edges)
+    used = set()
+    positions = [(p.x, p.y) for p in region.pieces]
+    best = 0
+    steps = 0
+
+    class _OutOfBudget(Exception):
+        pass
+
+    def dfs(count):
+        nonlocal best, steps
+        steps += 1
+        if steps > node_budget:
+            raise _OutOfBudget()
+        if count > best:
+            best = count
+        if best == total:  # every edge used: cannot do better
+            return True
+        for i, v in enumerate(positions):
+            for w in adj[v]:
+                e = (v, w) if v < w else (w, v)
+                if e in used:
+                    continue
+                used.add(e)
+                positions[i] = w
+                done = dfs(count + 1)
+                positions[i] = v
+                used.discard(e)
+                if done:
+                    return True
+        return False
+
+    try:
+        dfs(0)
+    except _OutOfBudget:
+        return None
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Cached entry point for search
+# ---------------------------------------------------------------------------
+def pieces_interact(game_state: GameState) -> bool:
+    """
+    Quick reject for endgame_outcome: True if some piece can walk to, or
+    shoot from a vertex it can walk to, the current vertex of an enemy piece.
+    Such a position is never independent (each reach set holds its piece's
+    own vertex). Each walk stops at the first contact, which in a mid-game
+    position comes after a few vertices.
+    """
+    lof = shot_table(game_state.board, game_state._board_key)
+    pieces = [(p.player, p.kind, (p.x, p.y)) for p in game_state.pieces]
+    at = {1: set(), 2: set()}
+    for player, _, start in pieces:
+        at[player].add(start)
+    # Shots from the current vertices first: no walk needed
+    for player, kind, (x, y) in pieces:
+        if not lof[(kind, x, y)].isdisjoint(at[3 - player]):
+            return True
+    visited = game_state.visited_edges
+    size = game_state.board.size
+    for player, kind, start in pieces:
+        enemies = at[3 - player]
+        table = neighbour_table(size, kind)
+        seen = {start}
+        queue = [start]
+        for v in queue:
+            for w, edge in table[v]:
+                if w not in seen and edge not in visited:
+                    if w in enemies or not lof[(kind, w[0], w[1])].isdisjoint(enemies):
+                        return True
+                    seen.add(w)
+                    queue.append(w)
+    return False
+
+
+_OUTCOME_CACHE = OrderedDict()
+_OUTCOME_CACHE_SIZE = 100_000
+
+
+def endgame_outcome(game_state: GameState, to_move: int):
+    """
+    Exact (winner, plies) for a position that has decomposed into
+    independent regions, else None. Positions with many pieces and
+    positions where pieces still interact (pieces_interact, about 20 us)
+    are rejected before the full analysis, whose results are cached by
+    position hash.
+    """
+    if len(game_state.pieces) > ENDGAME_MAX_PIECES or pieces_interact(game_state):
+        return None
+    key = game_state.position_hash()
+    budgets = _OUTCOME_CACHE.get(key, False)
+    if budgets is False:
+        budgets = analyse_regions(game_state).budgets
+        _OUTCOME_CACHE[key] = budgets
+        if len(_OUTCOME_CACHE) > _OUTCOME_CACHE_SIZE:
+            _OUTCOME_CACHE.popitem(last=False)
+    if budgets is None:
+        return None
+    return RegionAnalysis((), True, budgets).outcome(to_move)
@@ -0,0 +1,184 @@
+"""
+Shared-Memory Transposition Table for Dots & Cuts
+=================================================
+A fixed-size transposition table living in multiprocessing.shared_memory,
+so search / simulation worker processes share what they found instead of
+each filling a private dict.
+
+Drop-in replacement for minimax_ai.TranspositionTable (probe / peek /
+store / clear / len / hit_rate), usable by minimax_best_move and friends,
+parallel root search, Lazy-SMP (parallel_search.py) and the analysis.py runners.
+
+Layout (all little endian, 24 bytes per entry):
+  check : u64   key ^ score_bits ^ meta
+  score : f64   score as stored by minimax (mate scores already normalised)
+  meta  : u64   depth (16 bits) | flag << 16 | move << 24 | 1 << 40 (occupied)
+
+Lock-free (Hyatt's XOR trick): the key is not stored directly but folded
+into `check`. A reader recomputes key ^ score_bits ^ meta and ignores the
+entry unless it matches, so an entry torn by two processes writing at once
+reads as a miss instead of a wrong result.
+
+Entries are grouped in buckets of two slots: a depth-preferred slot and an
+always-replace slot. Memory is fixed at creation (entries * 24 bytes),
+whatever the number of workers.
+
+Sharing: the table pickles as its shared-memory name, so passing it to a
+worker (Process args, ProcessPoolExecutor initargs, ...) attaches the worker
+to the same memory. The creating process owns the block and unlinks it in
+close().
+"""
+
+from multiprocessing import shared_memory
+import os
+import struct
+import numpy as np
+
+# Same constants as minimax_ai (not imported so workers can load this cheaply)
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+ENTRY_SIZE = 24
+_ENTRY = struct.Struct("<QQQ")
+_F64 = struct.Struct("<d")
+_U64 = struct.Struct("<Q")
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_OCCUPIED = 1 << 40
+_NO_MOVE = 0xFFFF
+
+
+def _pack_meta(depth, flag, move_code):
+    move = _NO_MOVE if move_code is None else move_code
+    return (depth & 0xFFFF) | (flag << 16) | (move << 24) | _OCCUPIED
+
+
+def _unpack_meta(meta):
+    move = (meta >> 24) & 0xFFFF
+    return meta & 0xFFFF, (meta >> 16) & 0xFF, None if move == _NO_MOVE else move
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in shared memory: key -> (depth, score, flag, move_code).
+
+    max_entries: table capacity (rounded up to an even number of slots)
+    name:        attach to an existing table instead of creating one
+    probes / hits / stores are counted per process.
+    """
+
+    def __init__(self, max_entries: int = 500_000, name: str = None):
+        if name is None:
+            n_buckets = max(1, (max_entries + 1) // 2)
+            self._shm = shared_memory.SharedMemory(create=True, size=n_buckets * 2 * ENTRY_SIZE)
+            self._owner_pid = os.getpid()
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner_pid = None
+        self._buckets = self._shm.size // (2 * ENTRY_SIZE)
+        self.max_entries = self._buckets * 2
+        self._buf = self._shm.buf
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        if self._owner_pid is not None:
+            self._table()[:] = 0
+
+    # ----- sharing -----
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __getstate__(self):
+        return {"name": self._shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(name=state["name"])
+
+    def close(self):
+        """Detach from the shared block; the creating process also frees it."""
+        if self._shm is None:
+            return
+        self._buf = None
+        self._shm.close()
+        # Forked children inherit the object but must not free the block
+        if self._owner_pid == os.getpid():
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # ----- table -----
+
+    def _table(self):
+        """NumPy view of the raw slots: shape (slots, 3) of uint64."""
+        return np.ndarray((self.max_entries, 3), dtype=np.uint64, buffer=self._shm.buf)
+
+    def __len__(self):
+        meta = self._table()[:, 2]
+        return int(np.count_nonzero(meta & np.uint64(_OCCUPIED)))
+
+    def _read(self, offset, key):
+        check, score_bits, meta = _ENTRY.unpack_from(self._buf, offset)
+        if not meta & _OCCUPIED or check ^ score_bits ^ meta != key:
+            return None
+        depth, flag, move = _unpack_meta(meta)
+        return depth, _F64.unpack(_U64.pack(score_bits))[0], flag, move
+
+    def peek(self, key):
+        """Look up an entry without touching the probe/hit counters."""
+        key &= _MASK64
+        offset = (key % self._buckets) * 2 * ENTRY_SIZE
+        entry = self._read(offset, key)
+        if entry is None:
+            entry = self._read(offset + ENTRY_SIZE, key)
+        return entry
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.peek(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def store(self, key, depth, score, flag, move_code):
+        key &= _MASK64
+        base = (key % self._buckets) * 2 * ENTRY_SIZE
+        deep = self._read(base, key)
+        if deep is not None:
+            offset, old = base, deep
+        else:
+            offset, old = base + ENTRY_SIZE, self._read(base + ENTRY_SIZE, key)
+        if old is not None and old[0] > depth and flag != TT_EXACT:
+            return  # keep the deeper result
+        if old is None:
+            # New position: the depth-preferred slot if it is empty or
+            # shallower, the always-replace slot otherwise
+            meta0 = _ENTRY.unpack_from(self._buf, base)[2]
+            if not meta0 & _OCCUPIED or (meta0 & 0xFFFF) <= depth:
+                offset = base
+        score_bits = _U64.unpack(_F64.pack(score))[0]
+        meta = _pack_meta(depth, flag, move_code)
+        _ENTRY.pack_into(self._buf, offset, key ^ score_bits ^ meta, score_bits, meta)
+        self.stores += 1
+
+    def clear(self):
+        self._table()[:] = 0
+        self.probes = self.hits = self.stores = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
@@ -0,0 +1,231 @@
+"""
+Texel Tuner for the Minimax Evaluation Weights
+==============================================
+Fits the logistic evaluation of evaluate_position_v1 (standardised features
+-> weights . x + intercept) to game results, NumPy only, on feature logs of
+any size.
+
+  1. build_training_matrix: streams a feature log (FeatureLogWriter CSV or
+     .npz shard directory) into an on-disk .npy matrix, one row per
+     position: the 8 features and the result of the game for the logged
+     player (1 win, 0.5 draw, 0 loss). Only one CSV chunk / shard is in
+     memory at a time.
+  2. tune: opens the matrix as a memmap and minimises the logistic loss
+     (cross-entropy against the game result, the Texel method with the
+     scale folded into the weights) with mini-batch gradient descent
+     (Adam). Means and stds come from a streaming pass over the training
+     rows; the last val_fraction of the rows (the latest games) are held
+     out for validation. Each epoch visits the chunks in a new random
+     order and shuffles rows within a chunk, so memory stays bounded by
+     chunk_rows.
+  3. save_tuned_version: adds the result to MINIMAX_VERSIONS and to
+     tuned_versions.json, which minimax_ai loads at import, so the new
+     version can be played right away (minimax_best_move(version=...),
+     tournament.EngineSpec).
+"""
+
+from feature_log import FEATURE_COLUMNS
+from minimax_ai import add_linear_version, save_version_params, TUNED_VERSIONS_FILE
+import csv
+import glob
+import os
+import time
+import numpy as np
+
+FEATURES = FEATURE_COLUMNS[:-1]   # evaluate_position_v1 order
+_EPS = 1e-7
+
+
+def _result(winner, root_player: int):
+    """Game result for root_player: 1 win, 0.5 draw (winner 0), 0 loss."""
+    return np.where(winner == root_player, 1.0, np.where(winner == 0, 0.5, 0.0))
+
+
+def _log_chunks(path: str, chunk_rows: int):
+    """Yield {column: float64 array} chunks of a feature log."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = []
+            for row in reader:
+                rows.append([float(v) if v != "" else np.nan for v in row])
+                if len(rows) == chunk_rows:
+                    data = np.array(rows, dtype=np.float64)
+                    yield {c: data[:, i] for i, c in enumerate(header)}
+                    rows = []
+            if rows:
+                data = np.array(rows, dtype=np.float64)
+                yield {c: data[:, i] for i, c in enumerate(header)}
+    else:
+        for name in sorted(glob.glob(os.path.join(path, "shard-*.npz"))):
+            with np.load(name) as shard:
+                yield {c: shard[c] for c in shard.files}
+
+
+def build_training_matrix(log_paths, out_path: str, root_player: int = 1, chunk_rows: int = 200_000) -> int:
+    """
+    Write the positions of one or more feature logs to out_path (.npy,
+    float32, columns FEATURES + result). Rows with a missing value are
+    skipped. Returns the number of rows.
+    """
+    if isinstance(log_paths, str):
+        log_paths = [log_paths]
+    # First pass: count the usable rows, so the file can be allocated at its final size
+    n = 0
+    for path in log_paths:
+        for chunk in _log_chunks(path, chunk_rows):
+            data = np.column_stack([chunk[c] for c in FEATURE_COLUMNS])
+            n += int((~np.isnan(data).any(axis=1)).sum())
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(n, len(FEATURES) + 1))
+    row = 0
+    for path in log_paths:
+        for chunk in _log_chunks(path, chunk_rows):
+            data = np.column_stack([chunk[c] for c in FEATURE_COLUMNS])
+            data = data[~np.isnan(data).any(axis=1)]
+            data[:, -1] = _result(data[:, -1], root_player)
+            out[row:row + len(data)] = data
+            row += len(data)
+    out.flush()
+    del out
+    return n
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -40, 40)))
+
+
+def _loss(X, y, weights, intercept):
+    """(mean logistic loss, accuracy of the predicted winner) on one block."""
+    p = np.clip(_sigmoid(X @ weights + intercept), _EPS, 1 - _EPS)
+    loss = -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+    decided = y != 0.5
+    accuracy = np.mean((p[decided] > 0.5) == (y[decided] > 0.5)) if decided.any() else float("nan")
+    return float(loss), float(accuracy)
+
+
+def tune(matrix_path: str, epochs: int = 10, batch_size: int = 4096, learning_rate: float = 0.01,
+         l2: float = 1e-4, val_fraction: float = 0.1, chunk_rows: int = 1_000_000, seed: int = 0,
+         init=None, progress: bool = True) -> dict:
+    """
+    Fit weights / intercept on the matrix written by build_training_matrix.
+    init: optional MINIMAX_VERSIONS entry (or dict with "weights", "means",
+          "stds", "intercept") to start from instead of zeros; its weights
+          are rescaled to the new means / stds.
+    Returns {"weights", "means", "stds", "intercept", "train_loss",
+    "val_loss", "val_accuracy", "rows", "elapsed"}. Progress goes to stdout.
+    """
+    t0 = time.perf_counter()
+    data = np.load(matrix_path, mmap_mode="r")
+    n = len(data)
+    n_val = int(n * val_fraction)
+    n_train = n - n_val
+    if n_train == 0:
+        raise ValueError(f"{matrix_path} has no training rows")
+    d = data.shape[1] - 1
+    starts = list(range(0, n_train, chunk_rows))
+
+    # Standardisation statistics of the training rows (streaming)
+    total = np.zeros(d)
+    total_sq = np.zeros(d)
+    for start in starts:
+        block = np.asarray(data[start:min(start + chunk_rows, n_train), :d], dtype=np.float64)
+        total += block.sum(axis=0)
+        total_sq += (block ** 2).sum(axis=0)
+    means = total / n_train
+    stds = np.sqrt(np.maximum(total_sq / n_train - means ** 2, 0.0))
+    stds[stds == 0] = 1.0
+
+    weights = np.zeros(d)
+    intercept = 0.0
+    if init is not None:
+        # Same linear score on raw features: w' / s' = w / s, b' = b + sum(w (m' - m) / s)
+        old_w, old_m, old_s = (np.asarray(init[k], dtype=np.float64) for k in ("weights", "means", "stds"))
+        weights = old_w / old_s * stds
+        intercept = float(init["intercept"] + np.sum(old_w * (means - old_m) / old_s))
+
+    rng = np.random.default_rng(seed)
+    # Adam state for (weights, intercept)
+    m_w, v_w = np.zeros(d), np.zeros(d)
+    m_b = v_b = 0.0
+    beta1, beta2, step = 0.9, 0.999, 0
+
+    def evaluate(lo, hi):
+        losses, accs, sizes = [], [], []
+        for start in range(lo, hi, chunk_rows):
+            block = np.asarray(data[start:min(start + chunk_rows, hi)], dtype=np.float64)
+            loss, acc = _loss((block[:, :d] - means) / stds, block[:, d], weights, intercept)
+            losses.append(loss)
+            accs.append(acc)
+            sizes.append(len(block))
+        if not sizes:
+            return float("nan"), float("nan")
+        return float(np.average(losses, weights=sizes)), float(np.nanmean(accs))
+
+    for epoch in range(epochs):
+        for start in rng.permutation(starts):
+            block = np.asarray(data[start:min(start + chunk_rows, n_train)], dtype=np.float64)
+            block = block[rng.permutation(len(block))]
+            X = (block[:, :d] - means) / stds
+            y = block[:, d]
+            for b in range(0, len(block), batch_size):
+                xb, yb = X[b:b + batch_size], y[b:b + batch_size]
+                err = _sigmoid(xb @ weights + intercept) - yb
+                g_w = xb.T @ err / len(yb) + l2 * weights
+                g_b = float(err.mean())
+                step += 1
+                m_w = beta1 * m_w + (1 - beta1) * g_w
+                v_w = beta2 * v_w + (1 - beta2) * g_w ** 2
+                m_b = beta1 * m_b + (1 - beta1) * g_b
+                v_b = beta2 * v_b + (1 - beta2) * g_b ** 2
+                correction = np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                weights -= learning_rate * correction * m_w / (np.sqrt(v_w) + 1e-8)
+                intercept -= learning_rate * correction * m_b / (np.sqrt(v_b) + 1e-8)
+        if progress:
+            train_loss, _ = evaluate(0, n_train)
+            val_loss, val_acc = evaluate(n_train, n)
+            print(f"[texel] epoch {epoch + 1}/{epochs}: train loss {train_loss:.5f}, "
+                  f"val loss {val_loss:.5f}, val accuracy {val_acc:.3f}")
+
+    train_loss, _ = evaluate(0, n_train)
+    val_loss, val_acc = evaluate(n_train, n)
+    return {
+        "weights": weights,
+        "means": means,
+        "stds": stds,
+        "intercept": intercept,
+        "train_loss": train_loss,
+        "val_loss": val_loss,
+        "val_accuracy": val_acc,
+        "rows": n,
+        "elapsed": time.perf_counter() - t0,
+    }
+
+
+def save_tuned_version(name: str, result: dict, path: str = TUNED_VERSIONS_FILE):
+    """Register `result` (from tune) as MINIMAX_VERSIONS[name] and store it in `path`."""
+    params = {k: result[k] for k in ("weights", "means", "stds", "intercept")}
+    add_linear_version(name, **params)
+    save_version_params(name, params, path)
+
+
+if __name__ == "__main__":
+    # Tune a new version on every logged game, starting from v2
+    from minimax_ai import MINIMAX_VERSIONS
+
+    feature_logs = ["feature_log_v1.3.csv"]
+    matrix_file = "texel_positions.npy"
+    root_player = 1
+    new_version = "v3"
+
+    rows = build_training_matrix(feature_logs, matrix_file, root_player=root_player)
+    print(f"{rows} positions written to {matrix_file}")
+    result = tune(matrix_file, epochs=10, init=MINIMAX_VERSIONS["v2"])
+    print("Means:", result["means"])
+    print("Stds:", result["stds"])
+    print("Weights:", result["weights"])
+    print("Feature order:", FEATURES)
+    print("Intercept:", result["intercept"])
+    print(f"Validation: loss {result['val_loss']:.5f}, accuracy {result['val_accuracy']:.3f}")
+    save_tuned_version(new_version, result)
+    print(f"Saved as MINIMAX_VERSIONS[{new_version!r}] in {TUNED_VERSIONS_FILE}")
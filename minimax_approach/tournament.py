@@ -0,0 +1,264 @@
+"""
+Match Harness with Elo and SPRT for Dots & Cuts
+===============================================
+Plays two engines against each other in game pairs: both games of a pair
+use the same seeded map (analysis.game_seed), with colors swapped, so map
+and first-move advantages cancel out.
+
+  - Engines:  EngineSpec("minimax", version, depth), EngineSpec("mcts",
+              playouts=...) or EngineSpec("greedy")
+  - Elo:      difference of engine A over engine B from the mean score, with
+              a confidence interval from the variance of the pair scores
+              (pentanomial: the two games of a pair are not independent)
+  - SPRT:     sequential probability ratio test of H0: elo = elo0 against
+              H1: elo = elo1 (normal approximation of the generalised
+              SPRT on pair scores). The match stops as soon as the
+              log-likelihood ratio leaves [log(beta / (1 - alpha)),
+              log((1 - beta) / alpha)], so clear-cut comparisons end after
+              a fraction of max_pairs.
+
+Pairs are played in a process pool but counted in pair order, so a match
+with the same seed stops at the same pair with the same result whatever the
+number of workers.
+"""
+
+from dotscuts import setup_standard_game
+from ai_core import generate_all_actions, execute_action
+from minimax_ai import minimax_best_move
+from analysis import game_seed, greedy_move, block_print
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+import math
+import os
+import random
+import sys
+import time
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    """
+    A player of a match (picklable, so it can be sent to worker processes).
+    kind:     "minimax", "mcts" or "greedy"
+    version:  minimax evaluation version (MINIMAX_VERSIONS key)
+    depth:    minimax search depth
+    playouts: MCTS rollouts per move
+    name:     label used in reports (default: built from the fields above)
+    """
+    kind: str = "minimax"
+    version: str = "v1"
+    depth: int = 4
+    playouts: int = 2000
+    name: str = None
+
+    @property
+    def label(self) -> str:
+        if self.name:
+            return self.name
+        if self.kind == "minimax":
+            return f"minimax-{self.version}-d{self.depth}"
+        if self.kind == "mcts":
+            return f"mcts-{self.playouts}"
+        return self.kind
+
+
+def _make_player(spec: EngineSpec, seed: int):
+    """A function (game_state, player) -> action for one game."""
+    if spec.kind == "minimax":
+        return lambda gs, player: minimax_best_move(gs, player, spec.depth, version=spec.version)
+    if spec.kind == "greedy":
+        return greedy_move
+    if spec.kind == "mcts":
+        mcts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mcts_approach")
+        if mcts_dir not in sys.path:
+            sys.path.insert(0, mcts_dir)
+        from mcts_ai import MCTS
+        searcher = MCTS(time_limit=None, playouts=spec.playouts, seed=seed)
+        return searcher.best_action
+    raise ValueError(f"Unknown engine kind: {spec.kind}")
+
+
+def play_game(engine_p1: EngineSpec, engine_p2: EngineSpec, seed: int, max_plies: int = 400):
+    """
+    Play one game on the standard map drawn from `seed`, player 1 moving
+    first. Returns (winner or None for a draw, plies played); a game still
+    running after max_plies plies is a draw.
+    """
+    game_state = setup_standard_game(rng=random.Random(seed))
+    random.seed(seed)
+    players = {1: _make_player(engine_p1, seed), 2: _make_player(engine_p2, seed + 1)}
+    current = 1
+    for plies in range(max_plies):
+        game_over, winner = game_state.is_game_over()
+        if game_over:
+            return winner, plies
+        if not generate_all_actions(game_state, current):
+            return 3 - current, plies
+        action = players[current](game_state, current)
+        if action is None:
+            return 3 - current, plies
+        execute_action(game_state, action)
+        current = 3 - current
+    return None, max_plies
+
+
+def _score(winner, engine_a_player):
+    if winner is None:
+        return 0.5
+    return 1.0 if winner == engine_a_player else 0.0
+
+
+def _play_pair(engine_a, engine_b, master_seed, index, max_plies):
+    """Worker task: game pair `index`. Returns (index, score of A as player 1, score of A as player 2, plies)."""
+    seed = game_seed(master_seed, index)
+    w1, plies1 = play_game(engine_a, engine_b, seed, max_plies)
+    w2, plies2 = play_game(engine_b, engine_a, seed, max_plies)
+    return index, _score(w1, 1), _score(w2, 2), plies1 + plies2
+
+
+# ---------------------------------------------------------------------------
+# Elo and SPRT
+# ---------------------------------------------------------------------------
+def expected_score(elo: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def elo_from_score(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def _mean_var(pair_scores):
+    """Mean and variance of the per-game score of each pair."""
+    n = len(pair_scores)
+    mean = sum(pair_scores) / n
+    var = sum((s - mean) ** 2 for s in pair_scores) / n
+    return mean, var
+
+
+def elo_interval(pair_scores, z: float = 1.96):
+    """(elo, low, high): Elo difference and its ~95% (z=1.96) confidence interval."""
+    mean, var = _mean_var(pair_scores)
+    margin = z * math.sqrt(var / len(pair_scores))
+    return elo_from_score(mean), elo_from_score(mean - margin), elo_from_score(mean + margin)
+
+
+# Floor on the pair-score variance: a short run of identical pairs would
+# otherwise make the LLR explode
+_MIN_VARIANCE = 0.01
+
+
+def sprt_llr(pair_scores, elo0: float, elo1: float) -> float:
+    """Log-likelihood ratio of H1 (elo1) over H0 (elo0), normal approximation."""
+    mean, var = _mean_var(pair_scores)
+    var = max(var, _MIN_VARIANCE)
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return len(pair_scores) * ((mean - s0) ** 2 - (mean - s1) ** 2) / (2 * var)
+
+
+def sprt_bounds(alpha: float, beta: float):
+    """(lower, upper) LLR bounds: below lower accept H0, above upper accept H1."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+@dataclass
+class MatchResult:
+    """Outcome of run_match, from engine A's point of view."""
+    engine_a: str
+    engine_b: str
+    pairs: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    elo: float = 0.0
+    elo_low: float = 0.0
+    elo_high: float = 0.0
+    llr: float = 0.0
+    lower_bound: float = 0.0
+    upper_bound: float = 0.0
+    decision: str = None    # "H1" (A is elo1 stronger), "H0" (not elo1 stronger) or None (max_pairs reached)
+    average_plies: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def summary(self) -> str:
+        verdict = {"H1": "H1 accepted", "H0": "H0 accepted", None: "undecided"}[self.decision]
+        return (f"{self.engine_a} vs {self.engine_b}: +{self.wins} ={self.draws} -{self.losses} "
+                f"({self.games} games), Elo {self.elo:+.1f} [{self.elo_low:+.1f}, {self.elo_high:+.1f}], "
+                f"LLR {self.llr:.2f} ({self.lower_bound:.2f}, {self.upper_bound:.2f}) {verdict}, "
+                f"{self.elapsed:.0f}s")
+
+
+def run_match(engine_a: EngineSpec, engine_b: EngineSpec, max_pairs: int = 750, master_seed: int = 0,
+              elo0: float = 0.0, elo1: float = 20.0, alpha: float = 0.05, beta: float = 0.05,
+              workers: int = None, max_plies: int = 400, min_pairs: int = 10, progress: bool = True) -> MatchResult:
+    """
+    Play up to max_pairs game pairs of engine_a against engine_b and stop
+    early once the SPRT (elo0 / elo1, error rates alpha / beta) decides,
+    but not before min_pairs pairs. Progress (pairs, score, Elo, LLR) goes to stderr.
+    """
+    workers = workers or os.cpu_count() or 1
+    lower, upper = sprt_bounds(alpha, beta)
+    result = MatchResult(engine_a.label, engine_b.label, lower_bound=lower, upper_bound=upper)
+    pair_scores = []
+    plies = 0
+    finished = {}
+    t0 = time.perf_counter()
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=block_print)
+    try:
+        next_submit = 0
+        in_flight = set()
+        while len(pair_scores) < max_pairs and result.decision is None:
+            # Keep every worker busy with a couple of pairs
+            while next_submit < max_pairs and len(in_flight) < 2 * workers:
+                in_flight.add(pool.submit(_play_pair, engine_a, engine_b, master_seed, next_submit, max_plies))
+                next_submit += 1
+            done = next(iter(wait(in_flight, return_when=FIRST_COMPLETED)[0]))
+            in_flight.discard(done)
+            index, s1, s2, pair_plies = done.result()
+            finished[index] = (s1, s2, pair_plies)
+
+            # Count pairs in order so the stopping point does not depend on timing
+            while len(pair_scores) in finished and result.decision is None:
+                s1, s2, pair_plies = finished.pop(len(pair_scores))
+                pair_scores.append((s1 + s2) / 2)
+                plies += pair_plies
+                for s in (s1, s2):
+                    if s == 1.0:
+                        result.wins += 1
+                    elif s == 0.0:
+                        result.losses += 1
+                    else:
+                        result.draws += 1
+                result.llr = sprt_llr(pair_scores, elo0, elo1)
+                if len(pair_scores) < min_pairs:
+                    continue
+                if result.llr >= upper:
+                    result.decision = "H1"
+                elif result.llr <= lower:
+                    result.decision = "H0"
+            if progress and pair_scores:
+                elo = elo_from_score(sum(pair_scores) / len(pair_scores))
+                print(f"[match] {len(pair_scores)}/{max_pairs} pairs, +{result.wins} ={result.draws} "
+                      f"-{result.losses}, Elo {elo:+.1f}, LLR {result.llr:.2f} ({lower:.2f}, {upper:.2f})",
+                      file=sys.stderr)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    result.pairs = len(pair_scores)
+    if pair_scores:
+        result.elo, result.elo_low, result.elo_high = elo_interval(pair_scores)
+        result.average_plies = plies / (2 * len(pair_scores))
+    result.elapsed = time.perf_counter() - t0
+    return result
+
+
+if __name__ == "__main__":
+    # v2 against v1 at depth 2: does v2 gain at least 20 Elo?
+    result = run_match(EngineSpec("minimax", "v2", 2), EngineSpec("minimax", "v1", 2),
+                       max_pairs=750, master_seed=0, elo0=0, elo1=20)
+    print(result.summary())
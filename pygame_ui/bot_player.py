@@ -4,9 +4,10 @@ Bot Player Module
 Unified interface for AI opponents.
 Supports:
   - Minimax v1 / v2 (with configurable search depth)
+  - MCTS (UCT with batched rollouts, time budget)
   - RL Deep Q-Learning (from saved checkpoints)
 
-Both bot types expose the same public API:
+All bot types expose the same public API:
   - get_best_action(game_state, player) -> Action
   - get_top_k_actions(game_state, player, k) -> [(Action, score, is_best)]
   - action_to_readable_string(action) -> str
@@ -15,6 +16,8 @@ Both bot types expose the same public API:
 
 import sys
 import os
+import threading
+import time
 
 # Ensure core/ and minimax_approach/ are importable
 _base = os.path.dirname(os.path.abspath(__file__))
@@ -22,7 +25,7 @@ sys.path.insert(0, os.path.join(_base, "..", "core"))
 sys.path.insert(0, os.path.join(_base, ".."))
 
 from dotscuts import GameState
-from ai_core import (Action, generate_all_actions, execute_action,
+from ai_core import (Action, generate_all_actions,
                      action_to_vector, state_to_vector, state_to_vector_v2)
 from move_notation import action_to_notation
 
@@ -34,53 +37,156 @@ class MinimaxBot:
     """
     Wraps minimax_approach/minimax_ai.py with a clean interface.
     Supports versions 'v1' and 'v2'.
+
+    eval_cache: EvalCache to use for leaf evaluations. Defaults to the
+    process-wide shared cache, so the opponent bot and the analysis bot
+    reuse each other's evaluations.
+    use_book: play from the opening book before searching, if one has been
+    built with this bot's version and depth.
+    tt: TranspositionTable kept across searches (a fresh one by default), so
+    consecutive moves and pondering reuse earlier work.
+    last_stats: SearchStats of the most recent search (None after a book move).
+    cancel (threading.Event) aborts a running search with minimax_ai.SearchAborted.
+    solver_nodes: node budget of the proof-number check run after each
+    search; a proven forced win replaces the searched move (0 disables it).
+    solver_time: the check may take at most solver_time times as long as
+    the search before it (the default at most doubles the move time).
     """
 
-    def __init__(self, version: str = "v1", depth: int = 2):
+    def __init__(self, version: str = "v1", depth: int = 2, eval_cache=None,
+                 use_book: bool = True, tt=None, solver_nodes: int = 2000,
+                 solver_time: float = 1.0):
         self.version = version
         self.depth = depth
         self.label = f"Minimax {version} (depth {depth})"
 
         # Import lazily so the rest of pygame_ui doesn't depend on pandas/sklearn
-        from minimax_approach.minimax_ai import minimax, minimax_best_move, generate_all_actions as _gen
-        self._minimax = minimax
+        from minimax_approach.minimax_ai import (minimax_root_scores, minimax_multipv,
+                                                 minimax_best_move, get_shared_eval_cache,
+                                                 TranspositionTable, SearchStats)
+        self._minimax_root_scores = minimax_root_scores
+        self._minimax_multipv = minimax_multipv
         self._minimax_best_move = minimax_best_move
-
-    def get_best_action(self, game_state: GameState, player: int) -> Action:
-        return self._minimax_best_move(game_state, player, self.depth, version=self.version)
+        from minimax_approach.pn_solver import solve_forced_win
+        self._solve_forced_win = solve_forced_win
+        self._SearchStats = SearchStats
+        self.solver_nodes = solver_nodes
+        self.solver_time = solver_time
+        self.last_stats = None
+        self.eval_cache = eval_cache if eval_cache is not None else get_shared_eval_cache()
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.book = _load_book(version, depth) if use_book else None
+
+    def get_best_action(self, game_state: GameState, player: int, cancel=None) -> Action:
+        if self.book is not None:
+            action = self.book.best_action(game_state, player)
+            if action is not None:
+                self.last_stats = None
+                return action
+        stats = self._SearchStats()
+        t0 = time.perf_counter()
+        action = self._minimax_best_move(game_state, player, self.depth, version=self.version,
+                                         eval_cache=self.eval_cache, tt=self.tt, stats=stats,
+                                         cancel=cancel)
+        self.last_stats = stats
+        if self.solver_nodes and action is not None:
+            # Proof budget tied to the move time: a fixed node budget costs
+            # several searches in open positions, where it rarely proves anything
+            now = time.perf_counter()
+            proof = self._solve_forced_win(game_state, player, max_nodes=self.solver_nodes,
+                                           cancel=cancel, deadline=now + (now - t0) * self.solver_time)
+            proven = proof.best_action(game_state)
+            if proven is not None:
+                return proven
+        return action
 
     def get_top_k_actions(self, game_state: GameState, player: int, k: int = 3,
-                          depth: int = None):
+                          depth: int = None, cancel=None):
         """
         Evaluate every legal action with minimax and return the top k.
         Returns list of (Action, score, is_best).
         depth: override search depth (None = use self.depth).
         """
-        from minimax_approach.minimax_ai import minimax as _mm
-
         d = depth if depth is not None else self.depth
-        actions = generate_all_actions(game_state, player)
-        if not actions:
+        stats = self._SearchStats()
+        scored = self._minimax_root_scores(game_state, player, d, version=self.version,
+                                           eval_cache=self.eval_cache, tt=self.tt,
+                                           stats=stats, cancel=cancel)
+        self.last_stats = stats
+        if not scored:
             return []
 
-        scored = []
-        for action in actions:
-            execute_action(game_state, action)
-            score = _mm(game_state, d - 1,
-                        alpha=float("-inf"), beta=float("inf"),
-                        maximizing_player=False,
-                        root_player=player,
-                        version=self.version)
-            game_state.undo_last_move()
-            scored.append((action, score))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
-        best_score = scored[0][1] if scored else 0
+        best_score = scored[0][1]
         results = []
         for action, score in scored[:k]:
             results.append((action, score, score == best_score))
         return results
 
+    def get_multipv(self, game_state: GameState, player: int, depth: int = None,
+                    cancel=None):
+        """
+        One search returning every legal action with its principal variation.
+        Returns list of (Action, score, pv_codes) best first; pv_codes are
+        ai_core action codes starting with the action itself.
+        """
+        d = depth if depth is not None else self.depth
+        stats = self._SearchStats()
+        scored = self._minimax_multipv(game_state, player, d, version=self.version,
+                                       eval_cache=self.eval_cache, tt=self.tt,
+                                       stats=stats, cancel=cancel)
+        self.last_stats = stats
+        return scored
+
+    @staticmethod
+    def action_to_readable_string(action: Action) -> str:
+        return _format_action(action)
+
+
+# ---------------------------------------------------------------------------
+# MCTS bot
+# ---------------------------------------------------------------------------
+class MCTSBot:
+    """
+    Wraps mcts_approach/mcts_ai.py. Strength scales with the time budget
+    (time_limit seconds per move) instead of a search depth.
+    The search tree is kept between moves; a lock serialises searches when
+    the same bot is also used by the analysis thread.
+    """
+
+    def __init__(self, time_limit: float = 2.0, playouts: int = None,
+                 policy: str = "uct", seed: int = None):
+        from mcts_approach.mcts_ai import MCTS
+        self.time_limit = time_limit
+        self.mcts = MCTS(time_limit=time_limit, playouts=playouts,
+                         policy=policy, seed=seed)
+        self._lock = threading.Lock()
+        self.label = f"MCTS {policy.upper()} ({time_limit:g}s)"
+
+    def get_best_action(self, game_state: GameState, player: int, cancel=None) -> Action:
+        with self._lock:
+            return self.mcts.best_action(game_state, player, cancel=cancel)
+
+    def get_top_k_actions(self, game_state: GameState, player: int, k: int = 3,
+                          depth: int = None, cancel=None):
+        """
+        Rank moves by MCTS visit count. depth is accepted for API
+        compatibility and ignored (the budget is time / playouts).
+        cancel stops the search early; the moves found so far are returned.
+        """
+        with self._lock:
+            return self.mcts.top_k_actions(game_state, player, k=k, cancel=cancel)
+
+    def get_multipv(self, game_state: GameState, player: int, depth: int = None,
+                    cancel=None):
+        """One search; every root move with its most-visited line (see MCTS.multipv)."""
+        with self._lock:
+            return self.mcts.multipv(game_state, player, cancel=cancel)
+
+    @property
+    def last_stats(self) -> dict:
+        """Statistics of the most recent MCTS search."""
+        return dict(self.mcts.last_stats)
+
     @staticmethod
     def action_to_readable_string(action: Action) -> str:
         return _format_action(action)
@@ -211,12 +317,15 @@ class RLBot:
         ep = checkpoint.get("episode", "?")
         self.label = f"RL {self.version} ep{ep}"
 
-    def get_best_action(self, game_state: GameState, player: int) -> Action:
+    def get_best_action(self, game_state: GameState, player: int, cancel=None) -> Action:
+        # No opening book: its moves are minimax choices, not this network's
         top = self.get_top_k_actions(game_state, player, k=1)
         return top[0][0] if top else None
 
     def get_top_k_actions(self, game_state: GameState, player: int, k: int = 3,
-                          depth: int = None):
+                          depth: int = None, cancel=None):
+        # cancel is accepted for API compatibility: one batch of forward passes
+        # is too short to be worth interrupting.
         import torch
 
         # RL models are trained on 9x9 boards — reject mismatched sizes
@@ -259,13 +368,15 @@ class RLBot:
 # ---------------------------------------------------------------------------
 # Factory
 # ---------------------------------------------------------------------------
-def create_bot(config) -> "MinimaxBot | RLBot":
+def create_bot(config) -> "MinimaxBot | MCTSBot | RLBot":
     """
     Build the right bot from a GameConfig (mode_selection.GameConfig).
     """
     if config.bot_type in ("minimax_v1", "minimax_v2"):
         version = config.bot_type.split("_")[1]  # "v1" or "v2"
         return MinimaxBot(version=version, depth=config.minimax_depth)
+    elif config.bot_type == "mcts":
+        return MCTSBot(time_limit=config.mcts_time)
     elif config.bot_type in ("rl", "rl_v1", "rl_v2"):
         return RLBot(checkpoint_path=config.rl_checkpoint)
     else:
@@ -275,6 +386,35 @@ def create_bot(config) -> "MinimaxBot | RLBot":
 # ---------------------------------------------------------------------------
 # Shared helpers
 # ---------------------------------------------------------------------------
+def _load_book(version: str, depth: int):
+    """
+    Memory-mapped opening book shared by all bots, or None if none has been
+    built with minimax `version` at `depth`.
+    """
+    from minimax_approach.opening_book import get_default_book
+    book = get_default_book()
+    return book if book is not None and book.matches(version, depth) else None
+
+
+def format_search_stats(stats) -> str:
+    """
+    Short one-line summary of a bot's last_stats for the UI panel:
+    a minimax SearchStats or an MCTS stats dict. Empty string if unknown.
+    """
+    if not stats:
+        return ""
+    if isinstance(stats, dict):
+        if "rollouts" not in stats:
+            return ""
+        return (f"{stats['rollouts']} rollouts  "
+                f"{stats['rollouts_per_sec'] / 1000:.1f}k/s  "
+                f"depth {stats['max_depth']}")
+    return (f"{(stats.nodes + stats.qnodes) / 1000:.1f}k nodes  "
+            f"{stats.nps / 1000:.1f}k nps  "
+            f"1st-cut {stats.first_move_cutoff_rate:.0%}  "
+            f"TT {stats.tt_hit_rate:.0%}")
+
+
 def _format_action(action: Action, game_state=None) -> str:
     """Format action using algebraic notation if game_state is available."""
     if game_state is not None:
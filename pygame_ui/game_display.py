@@ -104,12 +104,13 @@ class GameDisplay:
     def draw_frame(self, game_state, current_player, *,
                    selected_piece=None, legal_moves=None, legal_shoots=None,
                    pv_lines=None, bot_label="", analysis_label="", message="",
-                   game_over=False, winner=None,
+                   bot_stats="", game_over=False, winner=None,
                    show_grid=False, show_z_hints=False,
                    timeline_items=None, timeline_scroll=0,
                    eval_data=None, my_best_move=None, opp_best_move=None,
-                   show_eval=False, show_my_best=False, show_opp_best=False):
-        """Draw one complete frame. Toggles passed from GameUI."""
+                   show_eval=False, show_my_best=False, show_opp_best=False,
+                   ponder=None):
+        """Draw one complete frame. Toggles passed from GameUI (ponder=None hides the toggle)."""
         self.screen.fill(self.COLORS["bg"])
 
         self._draw_edges(game_state, show_grid)
@@ -123,7 +124,7 @@ class GameDisplay:
                          message, game_over, winner, game_state,
                          show_grid, show_z_hints,
                          timeline_items, timeline_scroll,
-                         show_eval, show_my_best, show_opp_best)
+                         show_eval, show_my_best, show_opp_best, ponder, bot_stats)
 
         pygame.display.flip()
         self.clock.tick(60)
@@ -371,7 +372,8 @@ class GameDisplay:
     def _draw_panel(self, cur_player, pv_lines, bot_label, analysis_label,
                     msg, game_over, winner, gs, show_grid, show_z,
                     timeline_items, timeline_scroll,
-                    show_eval=False, show_my_best=False, show_opp_best=False):
+                    show_eval=False, show_my_best=False, show_opp_best=False,
+                    ponder=None, bot_stats=""):
         px = self.width - self.PANEL_WIDTH
         pygame.draw.rect(self.screen, self.COLORS["panel_bg"],
                          (px, 0, self.PANEL_WIDTH, self.height))
@@ -405,6 +407,10 @@ class GameDisplay:
             self.screen.blit(self.font_md.render(
                 f"Bot: {bot_label}", True, self.COLORS["text_dim"]), (x, y))
             y += 20
+            if bot_stats:
+                self.screen.blit(self.font_tiny.render(
+                    bot_stats, True, self.COLORS["text_dim"]), (x + 12, y))
+                y += 15
         if analysis_label:
             self.screen.blit(self.font_md.render(
                 f"Analysis: {analysis_label}", True, self.COLORS["text_dim"]), (x, y))
@@ -421,6 +427,14 @@ class GameDisplay:
                 hdr += "..."
             self.screen.blit(self.font_lg.render(hdr, True, self.COLORS["accent"]), (x, y))
             y += 26
+            if pv_lines.get('stats'):
+                self.screen.blit(self.font_tiny.render(
+                    pv_lines['stats'], True, self.COLORS["text_dim"]), (x, y))
+                y += 15
+            if pv_lines.get('forced'):
+                self.screen.blit(self.font_md.render(
+                    pv_lines['forced'], True, self.COLORS["accent"]), (x, y))
+                y += 20
             dot_colors = {
                 '1st':   self.COLORS["p1"],
                 '2nd':   (180, 180, 60),
@@ -453,8 +467,11 @@ class GameDisplay:
 
         grid_st = "ON" if show_grid else "OFF"
         z_st    = "ON" if show_z    else "OFF"
+        toggles = f"G=Grid:{grid_st}  Z=Hints:{z_st}"
+        if ponder is not None:
+            toggles += f"  P=Ponder:{'ON' if ponder else 'OFF'}"
         self.screen.blit(self.font_sm.render(
-            f"G=Grid:{grid_st}  Z=Hints:{z_st}", True, self.COLORS["text_dim"]), (x, y2))
+            toggles, True, self.COLORS["text_dim"]), (x, y2))
         y2 += 16
 
         eval_st = "ON" if show_eval else "OFF"
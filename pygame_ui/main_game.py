@@ -25,10 +25,11 @@ sys.path.insert(0, os.path.join(_base, "..", "core"))
 sys.path.insert(0, os.path.join(_base, ".."))
 
 from dotscuts import setup_standard_game
-from ai_core import Action, execute_action
+from ai_core import Action, execute_action, action_to_code, code_to_action, generate_all_actions
 from move_notation import action_to_notation, notation_after_execution
 from game_display import GameDisplay
-from bot_player import create_bot, MinimaxBot
+from bot_player import create_bot, MinimaxBot, format_search_stats
+from minimax_approach.pn_solver import solve_forced_win, PROVEN
 from custom_setup import PrebuiltSetups
 from mode_selection import ModeSelector, GameConfig
 
@@ -234,10 +235,24 @@ class GameUI:
         self._pv_thread = None
         self._pv_cancel = threading.Event()
         self._pv_timeout = 10          # seconds, adjustable with T/Shift+T
+        self._solver_nodes = 20_000    # proof-number budget for "forced win in N"
         self._pv_computing = False
 
         # Bot turn pending (render one frame before bot thinks)
         self._bot_pending = False
+        self._bot_stats = ""            # search stats of the bot's last move
+
+        # Pondering: during the human's turn the bot searches its reply to
+        # the human's most likely moves. Results are keyed by the position
+        # hash after the human's move: {key: {'event': Event, 'code': int}}
+        self.ponder = config.ponder and self.bot is not None
+        self._ponder_cancel = threading.Event()
+        self._ponder_thread = None
+        self._ponder_results = {}
+        # Held while checking the cancel event and registering / aborting
+        # slots, so no slot can be registered after the turn ended
+        self._ponder_lock = threading.Lock()
+        self._ponder_width = 3
 
         # Move tree
         MoveNode._next_id = 0
@@ -324,6 +339,7 @@ class GameUI:
         """Navigate game state to the given tree node."""
         if target is self.current_node:
             return
+        self._stop_ponder()
 
         current_path = _path_from_root(self.current_node)
         target_path = _path_from_root(target)
@@ -363,6 +379,7 @@ class GameUI:
         self.legal_moves = set()
         self.legal_shoots = set()
         self._refresh_analysis()
+        self._start_ponder()
 
     # ----- turn logic -----
 
@@ -400,6 +417,16 @@ class GameUI:
         self.legal_moves = set()
         self.legal_shoots = set()
 
+        # No new predictions once the human has moved. A reply that is being
+        # searched for the position actually reached is left to finish for
+        # _do_bot_turn; searches for other positions are aborted.
+        key = self.game_state.position_hash(self.bot_player) if self.bot else None
+        with self._ponder_lock:
+            self._ponder_cancel.set()
+            for slot_key, slot in list(self._ponder_results.items()):
+                if slot_key != key:
+                    slot['abort'].set()
+
         over, winner = self.game_state.is_game_over()
         if over:
             self.game_over = True
@@ -409,21 +436,105 @@ class GameUI:
 
         self.current_player = 2 if self.current_player == 1 else 1
         self._refresh_analysis()
+        self._start_ponder()
 
     def _do_bot_turn(self):
         if not self.bot or not self._is_bot_turn() or self.game_over:
             return
 
-        action = self.bot.get_best_action(self.game_state, self.current_player)
+        action = self._pondered_action()
+        pondered = action is not None
+        if pondered:
+            self._bot_stats = "pondered"
+        else:
+            action = self.bot.get_best_action(self.game_state, self.current_player)
+            self._bot_stats = format_search_stats(getattr(self.bot, 'last_stats', None))
         if action:
             replay = self._capture_replay(action)
             execute_action(self.game_state, action)
             notation = self._record_move(action, replay)
-            self._show(f"Bot: {notation}")
+            self._show(f"Bot: {notation}" + (" (pondered)" if pondered else ""))
         else:
             self._show("Bot has no legal moves!")
         self._end_turn()
 
+    # ----- pondering -----
+
+    def _start_ponder(self):
+        """Start pondering if it is the human's turn in a PvBot game."""
+        if not self.ponder or self.game_over or self._is_bot_turn():
+            return
+        self._stop_ponder()
+
+        self._ponder_cancel = threading.Event()
+        self._ponder_results = {}
+        self._ponder_thread = threading.Thread(
+            target=self._ponder_worker,
+            args=(copy.deepcopy(self.game_state), self.current_player,
+                  self._ponder_cancel, self._ponder_results),
+            daemon=True,
+        )
+        self._ponder_thread.start()
+
+    def _stop_ponder(self):
+        """Abort pondering and discard its results (position changed outside normal play)."""
+        with self._ponder_lock:
+            self._ponder_cancel.set()
+            for slot in list(self._ponder_results.values()):
+                slot['abort'].set()
+            self._ponder_results = {}
+
+    def _ponder_worker(self, gs, human, cancel, results):
+        """Background thread: search the bot's reply to the likely human moves."""
+        try:
+            predicted = self.bot.get_top_k_actions(gs, human, k=self._ponder_width,
+                                                   cancel=cancel)
+        except Exception:
+            return
+        size = gs.board.size
+        for action, _, _ in predicted:
+            execute_action(gs, action)
+            slot = {'event': threading.Event(), 'abort': threading.Event(), 'code': None}
+            with self._ponder_lock:
+                if cancel.is_set():
+                    return
+                results[gs.position_hash(self.bot_player)] = slot
+            try:
+                over, _ = gs.is_game_over()
+                if not over:
+                    reply = self.bot.get_best_action(gs, self.bot_player,
+                                                     cancel=slot['abort'])
+                    if reply is not None:
+                        slot['code'] = action_to_code(reply, size)
+            except Exception:
+                pass
+            finally:
+                slot['event'].set()
+                gs.undo_last_move()
+
+    def _pondered_action(self):
+        """
+        The pondered reply for the current position, or None if the human
+        played a move that was not predicted. Waits for a reply that is
+        still being searched.
+        """
+        slot = self._ponder_results.get(self.game_state.position_hash(self.bot_player))
+        self._ponder_results = {}
+        if slot is None:
+            return None
+        slot['event'].wait()
+        if slot['abort'].is_set():
+            return None
+        code = slot['code']
+        if code is None:
+            return None
+        size = self.game_state.board.size
+        legal = {action_to_code(a, size)
+                 for a in generate_all_actions(self.game_state, self.bot_player)}
+        if code not in legal:
+            return None
+        return code_to_action(self.game_state, code, self.bot_player)
+
     def _refresh_analysis(self):
         """Cancel running analysis and start fresh for the current position."""
         self._eval_cache = None
@@ -460,20 +571,31 @@ class GameUI:
         result = {}
 
         # --- All actions for current player (used for eval + PV ranking) ---
+        # Bots with get_multipv record every line during this one search;
+        # entries are then (action, score, pv_codes).
+        multipv = hasattr(self.analysis_bot, 'get_multipv')
         try:
-            all_scored = self.analysis_bot.get_top_k_actions(gs, player, k=200)
+            if multipv:
+                all_scored = self.analysis_bot.get_multipv(gs, player, cancel=cancel)
+            else:
+                all_scored = self.analysis_bot.get_top_k_actions(gs, player, k=200,
+                                                                 cancel=cancel)
         except Exception:
             all_scored = []
+        result['stats'] = format_search_stats(getattr(self.analysis_bot, 'last_stats', None))
         if cancel.is_set():
-            self._pv_computing = False; return
-
-        # --- Opponent's best (for eval bar + arrow) ---
-        try:
-            top_opp = self.analysis_bot.get_top_k_actions(gs, 3 - player, k=1)
-        except Exception:
-            top_opp = []
-        if cancel.is_set():
-            self._pv_computing = False; return
+            self._analysis_done(gen); return
+
+        # --- Opponent's best (arrow only; it's a different side to move, so a second search) ---
+        top_opp = []
+        if self.show_opp_best:
+            try:
+                top_opp = self.analysis_bot.get_top_k_actions(gs, 3 - player, k=1,
+                                                              cancel=cancel)
+            except Exception:
+                top_opp = []
+            if cancel.is_set():
+                self._analysis_done(gen); return
 
         # --- Eval bar ---
         # Use current player's Q-value as position evaluation.
@@ -513,18 +635,19 @@ class GameUI:
 
         # --- PV lines ---
         if not self.show_bot_thinking or not all_scored:
-            self._pv_computing = False; return
+            self._analysis_done(gen); return
 
         pv_depth = 5
         candidates = []
         labels = ['1st', '2nd', '3rd']
         for i in range(min(3, len(all_scored))):
-            candidates.append((labels[i], all_scored[i][0], all_scored[i][1]))
+            candidates.append((labels[i], all_scored[i]))
         if len(all_scored) > 3:
-            candidates.append(('worst', all_scored[-1][0], all_scored[-1][1]))
+            candidates.append(('worst', all_scored[-1]))
 
         lines = []
-        for label, first_action, first_score in candidates:
+        for label, entry in candidates:
+            first_action, first_score = entry[0], entry[1]
             if cancel.is_set() or time.time() - t0 > timeout:
                 break
 
@@ -538,11 +661,26 @@ class GameUI:
 
             over, _ = gs.is_game_over()
             cur_p = 3 - player
-            while not over and len(mvs) < pv_depth:
+
+            # Recorded PV: just replay it
+            for code in (entry[2][1:] if multipv else []):
+                act = code_to_action(gs, code, cur_p)
+                if over or act is None:
+                    break
+                n = action_to_notation(act, gs)
+                execute_action(gs, act)
+                undos += 1
+                mvs.append({'notation': n, 'player': cur_p})
+                over, _ = gs.is_game_over()
+                cur_p = 3 - cur_p
+
+            # No recorded PV: one search per ply
+            while not multipv and not over and len(mvs) < pv_depth:
                 if cancel.is_set() or time.time() - t0 > timeout:
                     break
                 try:
-                    top = self.analysis_bot.get_top_k_actions(gs, cur_p, k=1)
+                    top = self.analysis_bot.get_top_k_actions(gs, cur_p, k=1,
+                                                              cancel=cancel)
                 except Exception:
                     break
                 if not top:
@@ -565,10 +703,27 @@ class GameUI:
             })
 
         result['pv_lines'] = lines
+        if gen == self._pv_generation and not cancel.is_set():
+            self._eval_cache = result.copy()
+
+        # --- Forced win / loss (proof-number search, no horizon) ---
+        for attacker in (player, 3 - player):
+            if cancel.is_set():
+                break
+            proof = solve_forced_win(gs, player, attacker=attacker,
+                                     max_nodes=self._solver_nodes, cancel=cancel)
+            if proof.status == PROVEN:
+                result['forced'] = proof.describe()
+                break
         if gen == self._pv_generation and not cancel.is_set():
             self._eval_cache = result
 
-        self._pv_computing = False
+        self._analysis_done(gen)
+
+    def _analysis_done(self, gen):
+        # An aborted, stale worker must not clear the flag of the current one
+        if gen == self._pv_generation:
+            self._pv_computing = False
 
     # ----- undo -----
 
@@ -631,11 +786,13 @@ class GameUI:
 
     def run(self) -> str:
         self._refresh_analysis()
+        self._start_ponder()
 
         running = True
         while running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self._stop_ponder()
                     return "quit"
 
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -649,9 +806,12 @@ class GameUI:
 
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_q:
+                        self._stop_ponder()
                         return "menu"
                     elif event.key == pygame.K_r:
+                        self._stop_ponder()
                         self.__init__(self.config)
+                        self._start_ponder()
                         self._show("Game restarted!")
                     elif event.key == pygame.K_u:
                         self._handle_undo()
@@ -701,6 +861,14 @@ class GameUI:
                             self.analysis_bot.label = f"Minimax {self.analysis_bot.version} (depth {self.analysis_bot.depth})"
                             self._refresh_analysis()
                             self._show(f"Analysis depth: {self.analysis_bot.depth}")
+                    elif event.key == pygame.K_p:
+                        if self.bot:
+                            self.ponder = not self.ponder
+                            if self.ponder:
+                                self._start_ponder()
+                            else:
+                                self._stop_ponder()
+                            self._show(f"Ponder: {'ON' if self.ponder else 'OFF'}")
                     elif event.key == pygame.K_t:
                         mods = pygame.key.get_mods()
                         if mods & pygame.KMOD_SHIFT:
@@ -751,6 +919,8 @@ class GameUI:
                 pv_data = {
                     'lines': raw_lines,
                     'computing': self._pv_computing,
+                    'stats': ec.get('stats', ''),
+                    'forced': ec.get('forced', ''),
                 }
             self.display.draw_frame(
                 self.game_state,
@@ -760,6 +930,7 @@ class GameUI:
                 legal_shoots=self.legal_shoots,
                 pv_lines=pv_data,
                 bot_label=self.bot.label if self.bot else "",
+                bot_stats=self._bot_stats,
                 analysis_label=self.analysis_bot.label if self.analysis_bot else "",
                 message=self.message,
                 game_over=self.game_over,
@@ -774,6 +945,7 @@ class GameUI:
                 show_eval=self.show_eval,
                 show_my_best=self.show_my_best,
                 show_opp_best=self.show_opp_best,
+                ponder=self.ponder if self.bot else None,
             )
 
         return "quit"
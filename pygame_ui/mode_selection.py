@@ -5,7 +5,7 @@ Multi-screen menu for configuring a Dots & Cuts game.
 
 Flow:
   1. Game Mode   -> 1v1 or 1 vs Bot
-  2. Bot Type    -> Minimax v1, Minimax v2, RL v1, RL v2
+  2. Bot Type    -> Minimax v1, Minimax v2, MCTS, RL v1, RL v2
   3. Bot Config  -> Depth (minimax) or Strength tier (RL)
   4. Player Side -> Human plays as Player 1 or Player 2
   5. Map Select  -> Standard, Balanced, Empty, Small 5x5
@@ -24,8 +24,10 @@ from typing import Optional
 class GameConfig:
     """All settings chosen in the menu."""
     mode: str = "pvp"                  # "pvp" or "pvbot"
-    bot_type: Optional[str] = None     # "minimax_v1", "minimax_v2", "rl_v1", "rl_v2"
+    bot_type: Optional[str] = None     # "minimax_v1", "minimax_v2", "mcts", "rl_v1", "rl_v2"
     minimax_depth: int = 2
+    mcts_time: float = 2.0             # seconds per move for the MCTS bot
+    ponder: bool = True                # bot searches likely replies during the human's turn
     rl_checkpoint: Optional[str] = None
     human_player: int = 1              # 1 or 2
     map_name: str = "standard"         # "standard", "balanced", "skirmish", "mid_7x7", "small_5x5", "custom"
@@ -172,7 +174,7 @@ class _ModeScreen(_Menu):
 
 
 class _BotTypeScreen(_Menu):
-    """Select AI type: Minimax v1/v2 or RL v1/v2."""
+    """Select AI type: Minimax v1/v2, MCTS or RL v1/v2."""
 
     def __init__(self, screen, clock, has_rl_v1, has_rl_v2):
         super().__init__(screen, clock)
@@ -184,6 +186,7 @@ class _BotTypeScreen(_Menu):
         items = [
             ("Minimax v1", "Logistic regression evaluation", "minimax_v1", True),
             ("Minimax v2", "Improved weights from 100k games", "minimax_v2", True),
+            ("MCTS", "Tree search with rollouts, best on big boards", "mcts", True),
             ("RL v1", "Deep Q-Learning (basic)",
              "rl_v1", self.has_v1),
             ("RL v2", "Double DQN + reward shaping",
@@ -446,6 +449,9 @@ class ModeSelector:
                     config.minimax_depth = 3
                     state = "side"
                     continue
+                elif config.bot_type == "mcts":
+                    state = "side"
+                    continue
                 else:
                     cks = ck_v1 if config.bot_type == "rl_v1" else ck_v2
                     r = _RLTierScreen(screen, clock, cks).run()